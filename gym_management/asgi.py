@@ -14,3 +14,12 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gym_management.settings')
 
 application = get_asgi_application()
+
+# Long-lived responses such as the live alert stream (inventory alerts/<gym>/stream/)
+# are only served under ASGI, e.g. `uvicorn gym_management.asgi:application`.
+# WSGI deployments answer that endpoint with 204 and the alerts page polls instead.
+
+# Warm the point-of-sale barcode index before the first scan
+from inventory_management.barcode_index import warm_barcode_index  # noqa: E402
+
+warm_barcode_index()
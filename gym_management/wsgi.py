@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gym_management.settings')
 
 application = get_wsgi_application()
+
+# Warm the point-of-sale barcode index before the first scan
+from inventory_management.barcode_index import warm_barcode_index  # noqa: E402
+
+warm_barcode_index()
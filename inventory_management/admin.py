@@ -8,7 +8,8 @@ from django.utils import timezone
 from datetime import date
 from .models import (
     EquipmentCategory, Vendor, Equipment, MaintenanceRecord,
-    InventoryCategory, InventoryItem, StockTransaction, StockAlert
+    InventoryCategory, InventoryItem, StockTransaction, StockAlert,
+    InventoryForecast, PurchaseOrder, PurchaseOrderLine, StockAlertArchive
 )
 
 @admin.register(EquipmentCategory)
@@ -335,6 +336,7 @@ class StockTransactionAdmin(admin.ModelAdmin):
             'damage': 'red',
             'return': 'purple',
             'transfer': 'brown',
+            'transfer_in': 'teal',
             'expired': 'gray'
         }
         color = colors.get(obj.transaction_type, 'black')
@@ -346,28 +348,28 @@ class StockTransactionAdmin(admin.ModelAdmin):
 @admin.register(StockAlert)
 class StockAlertAdmin(admin.ModelAdmin):
     list_display = [
-        'alert_type_display', 'title', 'priority_display', 'equipment', 
+        'alert_type_display', 'title', 'priority_display', 'gym', 'equipment', 
         'inventory_item', 'is_read', 'is_resolved', 'created_at'
     ]
     list_filter = [
-        'alert_type', 'priority', 'is_read', 'is_resolved', 'created_at'
+        'alert_type', 'priority', 'gym', 'is_read', 'is_resolved', 'created_at'
     ]
     search_fields = ['title', 'message']
     ordering = ['-created_at']
-    readonly_fields = ['created_at']
+    readonly_fields = ['created_at', 'updated_at']
     
     fieldsets = (
         ('Alert Information', {
             'fields': ('alert_type', 'priority', 'title', 'message')
         }),
         ('Related Objects', {
-            'fields': ('equipment', 'inventory_item')
+            'fields': ('gym', 'equipment', 'inventory_item')
         }),
         ('Status', {
             'fields': ('is_read', 'is_resolved', 'resolved_by', 'resolved_at')
         }),
         ('System Information', {
-            'fields': ('created_at',)
+            'fields': ('created_at', 'updated_at')
         })
     )
     
@@ -402,20 +404,63 @@ class StockAlertAdmin(admin.ModelAdmin):
     actions = ['mark_as_read', 'mark_as_resolved']
     
     def mark_as_read(self, request, queryset):
-        updated = queryset.update(is_read=True)
+        updated = queryset.update(is_read=True, updated_at=timezone.now())
         self.message_user(request, f'{updated} alerts marked as read.')
     mark_as_read.short_description = 'Mark selected alerts as read'
     
     def mark_as_resolved(self, request, queryset):
-        from django.utils import timezone
+        now = timezone.now()
         updated = queryset.update(
             is_resolved=True,
             resolved_by=request.user,
-            resolved_at=timezone.now()
+            resolved_at=now,
+            updated_at=now
         )
         self.message_user(request, f'{updated} alerts marked as resolved.')
     mark_as_resolved.short_description = 'Mark selected alerts as resolved'
 
+@admin.register(InventoryForecast)
+class InventoryForecastAdmin(admin.ModelAdmin):
+    list_display = [
+        'item', 'gym', 'daily_consumption', 'days_of_cover',
+        'stockout_date', 'transactions_analyzed', 'computed_at'
+    ]
+    list_filter = ['gym', 'computed_at']
+    search_fields = ['item__name', 'item__sku']
+    ordering = ['days_of_cover']
+    readonly_fields = [
+        'item', 'gym', 'daily_consumption', 'days_of_cover', 'stockout_date',
+        'window_days', 'transactions_analyzed', 'computed_at'
+    ]
+
+class PurchaseOrderLineInline(admin.TabularInline):
+    model = PurchaseOrderLine
+    extra = 0
+    raw_id_fields = ['item']
+
+
+@admin.register(PurchaseOrder)
+class PurchaseOrderAdmin(admin.ModelAdmin):
+    list_display = ['po_number', 'gym', 'vendor', 'status', 'total_amount', 'created_at', 'received_at']
+    list_filter = ['status', 'gym', 'vendor', 'created_at']
+    search_fields = ['vendor__name', 'notes']
+    ordering = ['-created_at']
+    readonly_fields = ['created_at', 'updated_at', 'received_at', 'received_by']
+    inlines = [PurchaseOrderLineInline]
+
+@admin.register(StockAlertArchive)
+class StockAlertArchiveAdmin(admin.ModelAdmin):
+    list_display = ['title', 'alert_type', 'priority', 'gym_id', 'created_at', 'resolved_at', 'archived_at']
+    list_filter = ['alert_type', 'priority', 'resolved_at']
+    search_fields = ['title', 'message']
+    ordering = ['-resolved_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 # Custom admin site configuration
 admin.site.site_header = "Gym Inventory Management"
 admin.site.site_title = "Gym Admin"
@@ -0,0 +1,152 @@
+# inventory_management/alert_stream.py
+"""
+Live StockAlert events per gym.
+
+The StockAlert signals publish `created`, `resolved`, `updated` and
+`removed` events (and `refresh` after bulk updates) once the transaction
+commits. Subscribers are asyncio queues owned by the server-sent event
+responses of this process; publish() hands events to their event loops
+thread-safely, so sync views and signals can feed async streams.
+
+The pub/sub is in-process only. Alerts written by other worker processes
+are picked up from the database with events_since(), which the stream
+runs on every heartbeat and the polling endpoint runs on every request:
+changes come from StockAlert.updated_at (bulk updates set it too) and
+deletions of open alerts from the StockAlertRemoval rows the post_delete
+signal records. Cursors are POSIX timestamps with microseconds.
+"""
+import asyncio
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+HEARTBEAT_SECONDS = 15
+
+# Re-read a little before the cursor so rows committed late are not missed;
+# clients ignore events they have already applied
+CURSOR_OVERLAP = timedelta(seconds=2)
+
+MAX_EVENTS = 100
+
+_lock = threading.Lock()
+_subscribers = {}  # gym_id -> set of (event loop, asyncio.Queue)
+
+
+def cursor_for(moment):
+    return f"{moment.timestamp():.6f}"
+
+
+def parse_cursor(value):
+    """datetime for a cursor string, None if missing or malformed"""
+    try:
+        return datetime.fromtimestamp(float(value), tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def serialize_alert(alert):
+    return {
+        "id": alert.id,
+        "alert_type": alert.alert_type,
+        "priority": alert.priority,
+        "title": alert.title,
+        "message": alert.message,
+        "equipment_id": alert.equipment_id,
+        "inventory_item_id": alert.inventory_item_id,
+        "is_read": alert.is_read,
+        "is_resolved": alert.is_resolved,
+        "created_at": alert.created_at.isoformat() if alert.created_at else None,
+    }
+
+
+def build_event(event, alert_data=None, moment=None):
+    return {
+        "event": event,
+        "cursor": cursor_for(moment or timezone.now()),
+        "alert": alert_data,
+    }
+
+
+def publish(gym_id, event, alert_data=None):
+    """Send an event (with a serialize_alert() dict) to every subscriber of the gym in this process"""
+    if gym_id is None:
+        return
+
+    with _lock:
+        subscribers = list(_subscribers.get(gym_id, ()))
+    if not subscribers:
+        return
+
+    payload = build_event(event, alert_data)
+    for loop, queue in subscribers:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, payload)
+        except RuntimeError:
+            # The subscriber's event loop has shut down
+            pass
+
+
+@contextmanager
+def subscribe(gym_id):
+    """Register a queue for the gym's events on the running event loop"""
+    subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+    with _lock:
+        _subscribers.setdefault(gym_id, set()).add(subscriber)
+    try:
+        yield subscriber[1]
+    finally:
+        with _lock:
+            gym_subscribers = _subscribers.get(gym_id, set())
+            gym_subscribers.discard(subscriber)
+            if not gym_subscribers:
+                _subscribers.pop(gym_id, None)
+
+
+def events_since(gym_id, since):
+    """
+    Events for the gym's alerts changed after `since`, oldest first:
+    created, updated and resolved from StockAlert.updated_at, removed from
+    StockAlertRemoval. More changes than MAX_EVENTS come back as a single
+    `refresh`, so a burst can neither be cut short nor replayed forever.
+    """
+    from .models import StockAlert, StockAlertRemoval
+
+    since = since - CURSOR_OVERLAP
+    alerts = list(
+        StockAlert.objects.filter(gym_id=gym_id, updated_at__gt=since).order_by("updated_at")[:MAX_EVENTS + 1]
+    )
+    removals = list(
+        StockAlertRemoval.objects.filter(gym_id=gym_id, removed_at__gt=since)
+        .order_by("removed_at")
+        .values_list("alert_id", "removed_at")[:MAX_EVENTS + 1]
+    )
+    if len(alerts) + len(removals) > MAX_EVENTS:
+        return [build_event("refresh")]
+
+    events = []
+    for alert in alerts:
+        if alert.is_resolved and alert.resolved_at and alert.resolved_at > since:
+            event = "resolved"
+        elif alert.created_at > since:
+            event = "created"
+        else:
+            event = "updated"
+        events.append(build_event(event, serialize_alert(alert), alert.updated_at))
+    for alert_id, removed_at in removals:
+        events.append(build_event("removed", {"id": alert_id}, removed_at))
+    return sorted(events, key=lambda event: float(event["cursor"]))
+
+
+def alert_counts(gym_id):
+    """Open alert counts shown on the alerts page, in one query"""
+    from .models import StockAlert
+
+    return StockAlert.objects.filter(gym_id=gym_id, is_resolved=False).aggregate(
+        total_count=Count("id"),
+        critical_count=Count("id", filter=Q(priority="critical")),
+        high_count=Count("id", filter=Q(priority="high")),
+    )
@@ -0,0 +1,145 @@
+# inventory_management/barcode_index.py
+"""
+In-process barcode/SKU index for point-of-sale scanning.
+
+Each worker keeps a per-gym dictionary of barcode/SKU -> item snapshot
+(name, price, stock), so a scan resolves without touching the database.
+The index is warmed when the WSGI/ASGI application starts, kept fresh by
+the InventoryItem signals, and reloaded per gym after BARCODE_INDEX_TTL
+seconds so that writes made by other worker processes are picked up.
+Misses fall back to the (gym, barcode) / sku indexed database lookup.
+"""
+import threading
+import time
+
+from django.db.models import Q
+
+
+BARCODE_INDEX_TTL = 300
+
+INDEX_FIELDS = (
+    "id",
+    "gym_id",
+    "name",
+    "sku",
+    "barcode",
+    "unit",
+    "cost_price",
+    "selling_price",
+    "current_stock",
+    "minimum_stock",
+)
+
+_lock = threading.RLock()
+_gym_codes = {}  # gym_id -> {code: entry}
+_gym_loaded_at = {}  # gym_id -> time.monotonic() of last load
+_item_codes = {}  # item_id -> (gym_id, codes)
+
+
+def _codes_for(entry):
+    return {code for code in (entry["barcode"], entry["sku"]) if code}
+
+
+def _add_entry(entry):
+    codes = _codes_for(entry)
+    gym_codes = _gym_codes.setdefault(entry["gym_id"], {})
+    for code in codes:
+        gym_codes[code] = entry
+    _item_codes[entry["id"]] = (entry["gym_id"], codes)
+
+
+def _remove_entry(item_id):
+    gym_id, codes = _item_codes.pop(item_id, (None, ()))
+    gym_codes = _gym_codes.get(gym_id, {})
+    for code in codes:
+        if gym_codes.get(code, {}).get("id") == item_id:
+            del gym_codes[code]
+
+
+def _indexed_items():
+    from .models import InventoryItem
+
+    return InventoryItem.objects.filter(is_active=True).exclude(Q(barcode="") & Q(sku=""))
+
+
+def load_gym(gym_id):
+    """(Re)build the index for one gym with a single query"""
+    rows = list(_indexed_items().filter(gym_id=gym_id).values(*INDEX_FIELDS))
+
+    with _lock:
+        for item_id in [i for i, (g, _) in _item_codes.items() if g == gym_id]:
+            del _item_codes[item_id]
+        _gym_codes[gym_id] = {}
+        for row in rows:
+            _add_entry(row)
+        _gym_loaded_at[gym_id] = time.monotonic()
+
+    return len(rows)
+
+
+def warm_barcode_index():
+    """Load every gym's codes in one query - called at application startup"""
+    try:
+        rows = list(_indexed_items().values(*INDEX_FIELDS))
+    except Exception as e:
+        # Database not migrated yet (fresh checkout, collectstatic, ...)
+        print(f"❌ Error warming barcode index: {str(e)}")
+        return 0
+
+    now = time.monotonic()
+    with _lock:
+        _gym_codes.clear()
+        _item_codes.clear()
+        _gym_loaded_at.clear()
+        for row in rows:
+            _add_entry(row)
+            _gym_loaded_at[row["gym_id"]] = now
+
+    print(f"✅ Barcode index warmed with {len(rows)} items")
+    return len(rows)
+
+
+def lookup(gym_id, code):
+    """Resolve a scanned barcode or SKU to an item snapshot dict, or None"""
+    code = (code or "").strip()
+    if not code:
+        return None
+
+    loaded_at = _gym_loaded_at.get(gym_id)
+    if loaded_at is None or time.monotonic() - loaded_at > BARCODE_INDEX_TTL:
+        load_gym(gym_id)
+
+    with _lock:
+        entry = _gym_codes.get(gym_id, {}).get(code)
+        if entry is not None:
+            return dict(entry)
+
+    # Not in the index (e.g. created by another worker since the last load)
+    row = (
+        _indexed_items()
+        .filter(gym_id=gym_id)
+        .filter(Q(barcode=code) | Q(sku=code))
+        .values(*INDEX_FIELDS)
+        .first()
+    )
+    if row is not None:
+        with _lock:
+            _remove_entry(row["id"])
+            _add_entry(row)
+    return row
+
+
+def update_item(item):
+    """Refresh one item's entry after it was saved"""
+    with _lock:
+        _remove_entry(item.id)
+        # Gyms that were never loaded are built lazily on their first scan
+        if item.gym_id not in _gym_loaded_at:
+            return
+        if item.is_active and (item.barcode or item.sku):
+            _add_entry({field: getattr(item, field) for field in INDEX_FIELDS})
+
+
+def remove_item(item_id):
+    with _lock:
+        _remove_entry(item_id)
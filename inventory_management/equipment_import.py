@@ -0,0 +1,302 @@
+# inventory_management/equipment_import.py
+"""
+Bulk equipment onboarding from CSV.
+
+A new branch's equipment list is validated and created in chunks of
+IMPORT_CHUNK_SIZE rows instead of one add_equipment save per machine:
+
+- categories (of the gym) and vendors are read once and matched by name,
+  case-insensitively; serial numbers are checked against the database
+  with one query per chunk and against earlier rows of the file
+- warranty end and next maintenance dates are computed here with the same
+  rules as Equipment.save(), and each chunk is written with one bulk_create
+- bulk_create skips the Equipment signals, so the new rows are added to
+  the search index and their maintenance/warranty alerts are built and
+  bulk-created once, after the last chunk
+
+A dry run validates everything and writes nothing; either way the result
+is a report with the row errors. Rows with errors are skipped, the rest
+is imported in one transaction.
+"""
+import csv
+from datetime import timedelta
+from itertools import islice
+
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.utils import timezone
+
+from . import alert_stream, reliability, search
+from .forms import EquipmentImportRowForm
+from .models import Equipment, EquipmentCategory, StockAlert, Vendor
+from .signals import build_equipment_alerts
+
+
+IMPORT_CHUNK_SIZE = 500
+
+# Errors listed in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 200
+
+REQUIRED_COLUMNS = [
+    "name",
+    "category",
+    "brand",
+    "serial_number",
+    "purchase_date",
+    "purchase_price",
+    "location",
+]
+
+# Header of the downloadable template, in this order
+IMPORT_COLUMNS = REQUIRED_COLUMNS + [
+    "model_number",
+    "vendor",
+    "invoice_number",
+    "warranty_period_months",
+    "warranty_start_date",
+    "status",
+    "condition",
+    "last_maintenance_date",
+    "next_maintenance_date",
+    "maintenance_frequency_days",
+    "depreciation_rate",
+    "specifications",
+    "notes",
+]
+
+# Columns copied as they are onto Equipment; blank optional ones take the model default
+_DEFAULTED_FIELDS = [
+    "warranty_period_months",
+    "status",
+    "condition",
+    "maintenance_frequency_days",
+    "depreciation_rate",
+]
+_PLAIN_FIELDS = [
+    "name",
+    "brand",
+    "model_number",
+    "serial_number",
+    "purchase_date",
+    "purchase_price",
+    "invoice_number",
+    "location",
+    "last_maintenance_date",
+    "specifications",
+    "notes",
+]
+
+
+def _key(name):
+    return (name or "").strip().casefold()
+
+
+def warranty_end_date(start_date, period_months):
+    """Same as Equipment.save(): start + months, clamped to the last day of a shorter month"""
+    if not start_date or not period_months:
+        return None
+    return start_date + relativedelta(months=period_months)
+
+
+def next_maintenance_date(purchase_date, last_maintenance_date, frequency_days):
+    """Same as Equipment.save(): a frequency after the last maintenance, or after purchase"""
+    return (last_maintenance_date or purchase_date) + timedelta(days=frequency_days)
+
+
+def _new_report(dry_run):
+    return {
+        "dry_run": dry_run,
+        "total_rows": 0,
+        "valid_rows": 0,
+        "created": 0,
+        "alerts_created": 0,
+        "error_count": 0,
+        "errors": [],
+        "file_errors": [],
+        "new_categories": [],
+    }
+
+
+def _add_error(report, line, serial_number, messages):
+    report["error_count"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"line": line, "serial_number": serial_number, "messages": messages})
+
+
+def _form_messages(form):
+    return [
+        f"{field}: {message}" if field != "__all__" else message
+        for field, messages in form.errors.items()
+        for message in messages
+    ]
+
+
+def _read_header(reader):
+    """Normalized header of the file, or None when it's empty"""
+    fieldnames = reader.fieldnames
+    if not fieldnames:
+        return None
+    reader.fieldnames = [_key(name).replace(" ", "_") for name in fieldnames]
+    return reader.fieldnames
+
+
+def _validate_chunk(chunk, gym, categories, vendors, create_categories, seen_serials, report):
+    """Equipment instances (unsaved) for the valid rows of the chunk, errors go to the report"""
+    forms = []
+    for line, row in chunk:
+        data = {column: (value or "").strip() for column, value in row.items() if column}
+        forms.append((line, EquipmentImportRowForm(data)))
+
+    serials = [form.data.get("serial_number") for _, form in forms]
+    existing = set(
+        Equipment.objects.filter(serial_number__in=[serial for serial in serials if serial])
+        .values_list("serial_number", flat=True)
+    )
+
+    equipment = []
+    for line, form in forms:
+        serial_number = form.data.get("serial_number", "")
+        if not form.is_valid():
+            _add_error(report, line, serial_number, _form_messages(form))
+            continue
+
+        row = form.cleaned_data
+        messages = []
+
+        if serial_number in existing:
+            messages.append(f"serial_number: {serial_number} already exists")
+        elif serial_number in seen_serials:
+            messages.append(f"serial_number: {serial_number} is repeated on line {seen_serials[serial_number]}")
+        else:
+            seen_serials[serial_number] = line
+
+        category = categories.get(_key(row["category"]))
+        if category is None and not create_categories:
+            messages.append(f"category: {row['category']} does not exist in {gym.name}")
+
+        vendor = None
+        if row["vendor"]:
+            vendor = vendors.get(_key(row["vendor"]))
+            if vendor is None:
+                messages.append(f"vendor: {row['vendor']} is not an active vendor")
+
+        if messages:
+            _add_error(report, line, serial_number, messages)
+            continue
+
+        if category is None:
+            category = EquipmentCategory(gym=gym, name=row["category"])
+            categories[_key(category.name)] = category
+            report["new_categories"].append(category.name)
+
+        fields = {name: row[name] for name in _PLAIN_FIELDS}
+        for name in _DEFAULTED_FIELDS:
+            value = row[name]
+            fields[name] = value if value not in (None, "") else Equipment._meta.get_field(name).get_default()
+
+        warranty_start = row["warranty_start_date"] or row["purchase_date"]
+        equipment.append(Equipment(
+            gym=gym,
+            category=category,
+            vendor=vendor,
+            warranty_start_date=warranty_start,
+            warranty_end_date=warranty_end_date(warranty_start, fields["warranty_period_months"]),
+            next_maintenance_date=row["next_maintenance_date"] or next_maintenance_date(
+                row["purchase_date"], row["last_maintenance_date"], fields["maintenance_frequency_days"]
+            ),
+            **fields,
+        ))
+
+    report["valid_rows"] += len(equipment)
+    return equipment
+
+
+def import_equipment(gym, lines, user=None, dry_run=True, create_categories=False):
+    """
+    Validate (and unless `dry_run`, create) the equipment in the CSV text
+    `lines` for `gym`. Returns the report dict.
+    """
+    report = _new_report(dry_run)
+
+    try:
+        reader = csv.DictReader(lines)
+        header = _read_header(reader)
+        if header is None:
+            report["file_errors"].append("The file is empty.")
+            return report
+
+        missing = [column for column in REQUIRED_COLUMNS if column not in header]
+        if missing:
+            report["file_errors"].append(f"Missing columns: {', '.join(missing)}")
+            return report
+
+        categories = {}
+        for category in EquipmentCategory.objects.filter(gym=gym):
+            categories.setdefault(_key(category.name), category)
+
+        vendors = {}
+        for vendor in Vendor.objects.filter(is_active=True).order_by("id"):
+            vendors.setdefault(_key(vendor.name), vendor)
+
+        seen_serials = {}
+        created = []
+        numbered = ((reader.line_num, row) for row in reader)
+
+        with transaction.atomic():
+            while True:
+                chunk = list(islice(numbered, IMPORT_CHUNK_SIZE))
+                if not chunk:
+                    break
+                report["total_rows"] += len(chunk)
+
+                equipment = _validate_chunk(
+                    chunk, gym, categories, vendors, create_categories, seen_serials, report
+                )
+                if dry_run or not equipment:
+                    continue
+
+                new_categories = [category for category in categories.values() if category.pk is None]
+                for category in new_categories:
+                    category.created_by = user
+                EquipmentCategory.objects.bulk_create(new_categories)
+
+                for item in equipment:
+                    item.created_by = user
+                created.extend(Equipment.objects.bulk_create(equipment))
+
+            if created:
+                search.index_equipment(created)
+
+                today = timezone.localdate()
+                alerts = [alert for item in created for alert in build_equipment_alerts(item, today)]
+                StockAlert.objects.bulk_create(alerts, batch_size=IMPORT_CHUNK_SIZE)
+                report["alerts_created"] = len(alerts)
+
+                transaction.on_commit(lambda: alert_stream.publish(gym.id, "refresh"))
+                transaction.on_commit(lambda: reliability.invalidate_reliability(gym.id))
+    except (csv.Error, UnicodeDecodeError) as e:
+        # Raised while reading rows; the transaction above was rolled back
+        report["file_errors"].append(f"Could not read the file: {str(e)}")
+        report["alerts_created"] = 0
+        return report
+
+    report["created"] = len(created)
+    return report
+
+
+def template_rows():
+    """Header and one example row for the downloadable CSV template"""
+    today = timezone.localdate()
+    example = {
+        "name": "Treadmill",
+        "category": "Cardio",
+        "brand": "Life Fitness",
+        "serial_number": "LF-000123",
+        "purchase_date": today.isoformat(),
+        "purchase_price": "150000.00",
+        "location": "Floor 1",
+        "warranty_period_months": "12",
+        "status": "working",
+        "condition": "excellent",
+    }
+    return [IMPORT_COLUMNS, [example.get(column, "") for column in IMPORT_COLUMNS]]
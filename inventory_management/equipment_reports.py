@@ -0,0 +1,171 @@
+# inventory_management/equipment_reports.py
+"""
+Equipment report data.
+
+monthly_maintenance_costs() reads completed maintenance with one
+TruncMonth group-by query on the (status, actual_date) index. Months
+before the current one are closed: their rows are cached per gym and
+month, so a warm report only queries the current month. Saving or
+deleting a completed record drops the cached month of its actual_date
+(see signals.py); closed months also expire after a day, which covers
+records whose actual_date was moved to another month.
+
+maintenance_by_equipment() ranks equipment by maintenance cost over the
+same range from one group-by on MaintenanceRecord, instead of annotating
+every Equipment row with its whole maintenance history.
+"""
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Max, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Equipment, MaintenanceRecord
+
+
+DEFAULT_REPORT_MONTHS = 12
+MAX_REPORT_MONTHS = 36
+MONTH_PRESETS = [3, 6, 12, 24]
+
+CLOSED_MONTH_CACHE_TTL = 60 * 60 * 24
+TOP_EQUIPMENT = 10
+
+WARRANTY_ALERT_DAYS = 30
+
+
+def parse_report_months(value):
+    """Number of months to report on, from a request parameter"""
+    try:
+        months = int(value or DEFAULT_REPORT_MONTHS)
+    except ValueError:
+        months = DEFAULT_REPORT_MONTHS
+    return min(max(months, 1), MAX_REPORT_MONTHS)
+
+
+def report_months(months, today=None):
+    """First days of the last `months` months, oldest first, ending with the current month"""
+    current = (today or timezone.localdate()).replace(day=1)
+    return [current - relativedelta(months=offset) for offset in reversed(range(months))]
+
+
+def _month_key(gym_id, month):
+    return f"maintenance_costs:{gym_id}:{month:%Y-%m}"
+
+
+def invalidate_maintenance_month(gym_id, day):
+    """Drop the cached costs of the month containing `day`"""
+    cache.delete(_month_key(gym_id, day.replace(day=1)))
+
+
+def _completed(gym_id, start_date, end_date):
+    """Completed maintenance of the gym with actual_date in [start_date, end_date)"""
+    return MaintenanceRecord.objects.filter(
+        status="completed",
+        actual_date__gte=start_date,
+        actual_date__lt=end_date,
+        equipment__gym_id=gym_id,
+    )
+
+
+def monthly_maintenance_costs(gym_id, months=DEFAULT_REPORT_MONTHS, today=None):
+    """Count, cost and average cost of completed maintenance per month, oldest first"""
+    month_starts = report_months(months, today)
+    current = month_starts[-1]
+    range_end = current + relativedelta(months=1)
+
+    closed_keys = {month: _month_key(gym_id, month) for month in month_starts[:-1]}
+    cached = cache.get_many(closed_keys.values())
+
+    missing = [month for month in month_starts if closed_keys.get(month) not in cached]
+    computed = {}
+    if missing:
+        for row in (
+            _completed(gym_id, missing[0], range_end)
+            .annotate(month=TruncMonth("actual_date"))
+            .values("month")
+            .annotate(count=Count("id"), cost=Sum("total_cost"))
+            .order_by()
+        ):
+            computed[row["month"]] = {"count": row["count"], "cost": float(row["cost"] or 0)}
+
+        cache.set_many(
+            {
+                closed_keys[month]: computed.get(month, {"count": 0, "cost": 0.0})
+                for month in missing
+                if month in closed_keys
+            },
+            CLOSED_MONTH_CACHE_TTL,
+        )
+
+    costs = []
+    for month in month_starts:
+        totals = cached.get(closed_keys.get(month)) or computed.get(month) or {"count": 0, "cost": 0.0}
+        costs.append({
+            "month": month.strftime("%b %Y"),
+            "month_start": month,
+            "count": totals["count"],
+            "cost": totals["cost"],
+            "avg_cost": totals["cost"] / totals["count"] if totals["count"] else 0.0,
+        })
+    return costs
+
+
+def maintenance_by_equipment(gym_id, start_date, end_date):
+    """Per-equipment maintenance totals over [start_date, end_date), highest cost first"""
+    rows = list(
+        _completed(gym_id, start_date, end_date)
+        .values("equipment_id", name=F("equipment__name"), brand=F("equipment__brand"),
+                serial_number=F("equipment__serial_number"))
+        .annotate(
+            maintenance_count=Count("id"),
+            cost=Sum("total_cost"),
+            avg_cost=Avg("total_cost"),
+            last_maintenance_date=Max("actual_date"),
+        )
+        .order_by("-cost", "equipment_id")
+    )
+    for row in rows:
+        row["total_cost"] = row.pop("cost")
+    return rows
+
+
+def equipment_status_summary(gym_id, today=None):
+    """Status and condition breakdowns plus overdue/warranty counts of active equipment, in two queries"""
+    today = today or timezone.localdate()
+    equipment = Equipment.objects.filter(gym_id=gym_id, is_active=True)
+
+    by_status, by_condition = {}, {}
+    total = 0
+    for row in equipment.values("status", "condition").annotate(count=Count("id")).order_by():
+        by_status[row["status"]] = by_status.get(row["status"], 0) + row["count"]
+        by_condition[row["condition"]] = by_condition.get(row["condition"], 0) + row["count"]
+        total += row["count"]
+
+    counts = equipment.aggregate(
+        overdue=Count("id", filter=Q(next_maintenance_date__lt=today)),
+        warranty_expiring=Count(
+            "id",
+            filter=Q(
+                warranty_end_date__gte=today,
+                warranty_end_date__lte=today + timedelta(days=WARRANTY_ALERT_DAYS),
+            ),
+        ),
+    )
+
+    def breakdown(counts_by_key, key, choices):
+        return [
+            {key: value, "count": counts_by_key[value], "percentage": counts_by_key[value] / total * 100}
+            for value, _ in choices
+            if counts_by_key.get(value)
+        ]
+
+    return {
+        "total": total,
+        "equipment_by_status": breakdown(by_status, "status", Equipment.EQUIPMENT_STATUS_CHOICES),
+        "equipment_by_condition": breakdown(by_condition, "condition", Equipment.CONDITION_CHOICES),
+        "working_percentage": by_status.get("working", 0) / total * 100 if total else 0,
+        "overdue_maintenance": counts["overdue"],
+        "warranty_expiring": counts["warranty_expiring"],
+    }
@@ -0,0 +1,152 @@
+# inventory_management/forecasting.py
+"""
+Consumption-rate forecasting from the stock ledger.
+
+For every active item the job works out how many units leave the shelf per
+day (sales, damage and expiry - transfers are not consumption) and how many
+days the current stock will last. History is pulled per gym with one grouped
+query, turned into an (items x days) matrix and reduced with NumPy, so the
+cost is a handful of queries per gym no matter how many items it has.
+
+Results are stored in InventoryForecast, which the dashboard and the reorder
+alerts read directly. Run it nightly with `manage.py forecast_inventory`.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from multiple_gym.models import Gym
+from .models import InventoryForecast, InventoryItem, StockTransaction
+
+
+CONSUMPTION_TYPES = ["sale", "damage", "expired"]
+
+DEFAULT_WINDOW_DAYS = 90
+
+# Recent days weigh more: a day HALF_LIFE_DAYS ago counts half as much as today
+HALF_LIFE_DAYS = 14
+
+MAX_COVER_DAYS = 3650
+
+
+def _daily_consumption_matrix(gym_id, item_index, window_start, window_days):
+    """
+    (items x days) array of units consumed plus per-item transaction counts,
+    built from one grouped query
+    """
+    matrix = np.zeros((len(item_index), window_days))
+    counts = np.zeros(len(item_index), dtype=int)
+
+    start = timezone.make_aware(datetime.combine(window_start, datetime.min.time()))
+    rows = (
+        StockTransaction.objects.filter(
+            item__gym_id=gym_id,
+            item__is_active=True,
+            transaction_type__in=CONSUMPTION_TYPES,
+            transaction_date__gte=start,
+        )
+        .annotate(day=TruncDate("transaction_date"))
+        .values("item_id", "day")
+        .annotate(consumed=Sum(F("stock_before") - F("stock_after")), transactions=Count("id"))
+        .order_by()  # drop Meta.ordering so it doesn't leak into GROUP BY
+    )
+
+    item_positions, day_positions, quantities = [], [], []
+    for row in rows:
+        day = (row["day"] - window_start).days
+        if row["item_id"] in item_index and 0 <= day < window_days:
+            item_positions.append(item_index[row["item_id"]])
+            day_positions.append(day)
+            quantities.append(float(row["consumed"] or 0))
+            counts[item_index[row["item_id"]]] += row["transactions"]
+
+    if quantities:
+        np.add.at(matrix, (np.array(item_positions), np.array(day_positions)), np.array(quantities))
+
+    return np.clip(matrix, 0, None), counts
+
+
+def forecast_gym(gym_id, window_days=DEFAULT_WINDOW_DAYS):
+    """Compute and store forecasts for one gym's active items"""
+    today = timezone.localdate()
+    window_start = today - timedelta(days=window_days - 1)
+
+    items = list(
+        InventoryItem.objects.filter(gym_id=gym_id, is_active=True).values_list(
+            "id", "current_stock", "created_at"
+        )
+    )
+    if not items:
+        InventoryForecast.objects.filter(gym_id=gym_id).delete()
+        return 0
+
+    item_ids = [item_id for item_id, _, _ in items]
+    item_index = {item_id: position for position, item_id in enumerate(item_ids)}
+    stock = np.array([float(current_stock) for _, current_stock, _ in items])
+
+    # Only average over days the item existed, so new items aren't diluted
+    first_day = np.array([
+        max((timezone.localdate(created_at) - window_start).days, 0) for _, _, created_at in items
+    ])
+
+    matrix, transaction_counts = _daily_consumption_matrix(gym_id, item_index, window_start, window_days)
+
+    days = np.arange(window_days)
+    weights = 0.5 ** ((window_days - 1 - days) / HALF_LIFE_DAYS)
+    weights = weights[np.newaxis, :] * (days[np.newaxis, :] >= first_day[:, np.newaxis])
+    weight_totals = weights.sum(axis=1)
+
+    rates = np.divide(
+        (matrix * weights).sum(axis=1),
+        weight_totals,
+        out=np.zeros(len(items)),
+        where=weight_totals > 0,
+    )
+    cover = np.divide(stock, rates, out=np.full(len(items), np.nan), where=rates > 0)
+    cover = np.minimum(cover, MAX_COVER_DAYS)
+
+    computed_at = timezone.now()
+    forecasts = []
+    for position, item_id in enumerate(item_ids):
+        days_of_cover = None if np.isnan(cover[position]) else cover[position]
+        forecasts.append(InventoryForecast(
+            item_id=item_id,
+            gym_id=gym_id,
+            daily_consumption=Decimal(f"{rates[position]:.4f}"),
+            days_of_cover=None if days_of_cover is None else Decimal(f"{days_of_cover:.1f}"),
+            stockout_date=None if days_of_cover is None else today + timedelta(days=int(days_of_cover)),
+            window_days=window_days,
+            transactions_analyzed=int(transaction_counts[position]),
+            computed_at=computed_at,
+        ))
+
+    with transaction.atomic():
+        InventoryForecast.objects.filter(gym_id=gym_id).exclude(item_id__in=item_ids).delete()
+        InventoryForecast.objects.bulk_create(
+            forecasts,
+            update_conflicts=True,
+            unique_fields=["item"],
+            update_fields=[
+                "gym", "daily_consumption", "days_of_cover", "stockout_date",
+                "window_days", "transactions_analyzed", "computed_at",
+            ],
+        )
+
+    return len(forecasts)
+
+
+def forecast_all_gyms(window_days=DEFAULT_WINDOW_DAYS, gym_id=None):
+    """Forecast every active gym (or just one). Returns {gym_id: items forecast}"""
+    gyms = Gym.objects.filter(is_active=True)
+    if gym_id:
+        gyms = gyms.filter(id=gym_id)
+
+    results = {}
+    for gym_pk in gyms.values_list("id", flat=True):
+        results[gym_pk] = forecast_gym(gym_pk, window_days=window_days)
+    return results
@@ -586,3 +586,49 @@ class BulkStockUpdateForm(forms.Form):
             }
         )
     )
+
+
+class EquipmentImportForm(forms.Form):
+    """Upload form for the bulk equipment CSV import"""
+
+    csv_file = forms.FileField(
+        widget=forms.ClearableFileInput(attrs={"class": "form-control", "accept": ".csv,text/csv"}),
+    )
+
+    create_categories = forms.BooleanField(
+        required=False,
+        help_text="Create categories that do not exist in this gym yet",
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
+    )
+
+    dry_run = forms.BooleanField(
+        required=False,
+        initial=True,
+        help_text="Only validate the file and report row errors",
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
+    )
+
+
+class EquipmentImportRowForm(forms.Form):
+    """Validates the plain columns of one equipment CSV row (category and vendor are resolved by name)"""
+
+    name = forms.CharField(max_length=100)
+    category = forms.CharField(max_length=255)
+    brand = forms.CharField(max_length=100)
+    model_number = forms.CharField(max_length=100, required=False)
+    serial_number = forms.CharField(max_length=100)
+    vendor = forms.CharField(max_length=100, required=False)
+    purchase_date = forms.DateField()
+    purchase_price = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    invoice_number = forms.CharField(max_length=100, required=False)
+    warranty_period_months = forms.IntegerField(min_value=0, max_value=120, required=False)
+    warranty_start_date = forms.DateField(required=False)
+    status = forms.ChoiceField(choices=Equipment.EQUIPMENT_STATUS_CHOICES, required=False)
+    condition = forms.ChoiceField(choices=Equipment.CONDITION_CHOICES, required=False)
+    location = forms.CharField(max_length=100)
+    last_maintenance_date = forms.DateField(required=False)
+    next_maintenance_date = forms.DateField(required=False)
+    maintenance_frequency_days = forms.IntegerField(min_value=1, required=False)
+    depreciation_rate = forms.DecimalField(max_digits=5, decimal_places=2, min_value=0, max_value=100, required=False)
+    specifications = forms.CharField(required=False)
+    notes = forms.CharField(required=False)
@@ -0,0 +1,213 @@
+# inventory_management/labels.py
+"""
+QR asset labels for equipment.
+
+Each label carries a QR code of the gym's scan URL with the serial number
+(.../equipment/<gym>/scan/?code=<serial>), so a phone camera opens the
+equipment directly and a handheld scanner can type it into the scan page.
+serial_from_payload() accepts that URL or a bare serial number.
+
+Label sheets are A4 PDFs of LABEL_COLUMNS x LABEL_ROWS labels drawn with
+Pillow. They are rendered in a background thread and stored under
+equipment_labels/<gym_id>/. The state of a gym's latest job (queued,
+running, ready or failed, and the stored file) is kept next to them in
+job.json, so the labels page polls it instead of waiting on the request
+and every worker process sees the same job and download.
+"""
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import qrcode
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.utils import timezone
+from PIL import Image, ImageDraw, ImageFont
+from qrcode.image.pil import PilImage
+
+from .models import Equipment
+
+
+LABEL_DPI = 200
+
+# A4 in pixels at LABEL_DPI
+PAGE_SIZE = (1654, 2339)
+PAGE_MARGIN = 60
+LABEL_COLUMNS = 3
+LABEL_ROWS = 8
+LABEL_PADDING = 18
+
+LABELS_PER_PAGE = LABEL_COLUMNS * LABEL_ROWS
+
+# A job still queued or running after this long died with its process
+LABEL_JOB_TIMEOUT = timedelta(minutes=10)
+
+SCAN_PARAM = "code"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def label_payload(scan_url, serial_number):
+    """Text encoded in the QR code of one label"""
+    return f"{scan_url}?{urlencode({SCAN_PARAM: serial_number})}"
+
+
+def serial_from_payload(payload):
+    """Serial number in a scanned label URL, or the payload itself when it's a bare serial"""
+    payload = (payload or "").strip()
+    if "://" in payload or payload.startswith("/"):
+        values = parse_qs(urlsplit(payload).query).get(SCAN_PARAM)
+        return values[0].strip() if values else ""
+    return payload
+
+
+def qr_image(payload, size):
+    """size x size black-on-white QR code (error correction M, quiet zone included)"""
+    code = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=2)
+    code.add_data(payload)
+    code.make(fit=True)
+    # Whole pixels per module keep the edges sharp for scanners
+    code.box_size = max(size // (code.modules_count + 2 * code.border), 1)
+    return code.make_image(image_factory=PilImage).get_image().convert("L")
+
+
+def _fit(draw, text, font, width):
+    """text, shortened with an ellipsis until it fits in `width` pixels"""
+    text = text or ""
+    if draw.textlength(text, font=font) <= width:
+        return text
+    while text and draw.textlength(text + "…", font=font) > width:
+        text = text[:-1]
+    return text + "…"
+
+
+def render_label_sheets(equipment, scan_url):
+    """PDF bytes of label sheets for (name, serial_number, category name, location) tuples"""
+    label_width = (PAGE_SIZE[0] - 2 * PAGE_MARGIN) // LABEL_COLUMNS
+    label_height = (PAGE_SIZE[1] - 2 * PAGE_MARGIN) // LABEL_ROWS
+    code_size = label_height - 2 * LABEL_PADDING
+    text_width = label_width - code_size - 3 * LABEL_PADDING
+
+    title_font = ImageFont.load_default(size=34)
+    body_font = ImageFont.load_default(size=26)
+
+    pages = []
+    for start in range(0, max(len(equipment), 1), LABELS_PER_PAGE):
+        page = Image.new("L", PAGE_SIZE, 255)
+        draw = ImageDraw.Draw(page)
+
+        for position, (name, serial_number, category, location) in enumerate(equipment[start:start + LABELS_PER_PAGE]):
+            row, column = divmod(position, LABEL_COLUMNS)
+            left = PAGE_MARGIN + column * label_width
+            top = PAGE_MARGIN + row * label_height
+            # Cut guides
+            draw.rectangle([left, top, left + label_width - 1, top + label_height - 1], outline=0)
+
+            code = qr_image(label_payload(scan_url, serial_number), code_size)
+            offset = (code_size - code.width) // 2
+            page.paste(code, (left + LABEL_PADDING + offset, top + LABEL_PADDING + offset))
+
+            text_left = left + code_size + 2 * LABEL_PADDING
+            text_top = top + LABEL_PADDING + 10
+            draw.text((text_left, text_top), _fit(draw, name, title_font, text_width), font=title_font, fill=0)
+            draw.text((text_left, text_top + 50), _fit(draw, serial_number, body_font, text_width), font=body_font, fill=0)
+            details = " · ".join(part for part in (category, location) if part)
+            draw.text((text_left, text_top + 90), _fit(draw, details, body_font, text_width), font=body_font, fill=0)
+
+        # Black and white only: a tenth of the size of a grayscale page, and what label printers take
+        pages.append(page.convert("1", dither=Image.Dither.NONE))
+
+    buffer = BytesIO()
+    pages[0].save(buffer, "PDF", save_all=True, append_images=pages[1:], resolution=LABEL_DPI)
+    return buffer.getvalue()
+
+
+def label_queryset(gym_id, category_id=None, location=None):
+    equipment = Equipment.objects.filter(gym_id=gym_id, is_active=True).exclude(status="disposed")
+    if category_id:
+        equipment = equipment.filter(category_id=category_id)
+    if location:
+        equipment = equipment.filter(location=location)
+    return equipment
+
+
+def _job_name(gym_id):
+    return f"equipment_labels/{gym_id}/job.json"
+
+
+def label_job(gym_id):
+    """State of the gym's latest label job, None if there is none"""
+    try:
+        with default_storage.open(_job_name(gym_id)) as job_file:
+            state = json.load(job_file)
+    except (FileNotFoundError, ValueError):
+        # No job yet, or caught mid-rewrite
+        return None
+
+    for field in ("requested_at", "finished_at"):
+        if state.get(field):
+            state[field] = datetime.fromisoformat(state[field])
+    return state
+
+
+def _set_job(gym_id, **state):
+    name = _job_name(gym_id)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    default_storage.save(name, ContentFile(json.dumps(state, cls=DjangoJSONEncoder)))
+
+
+def generate_labels(gym_id, scan_url, category_id=None, location=None):
+    """Render and store the label sheets. Returns the storage name and the number of labels."""
+    equipment = list(
+        label_queryset(gym_id, category_id, location)
+        .order_by("category__name", "name")
+        .values_list("name", "serial_number", "category__name", "location")
+    )
+    content = render_label_sheets(equipment, scan_url)
+    name = default_storage.save(
+        f"equipment_labels/{gym_id}/labels-{timezone.now():%Y%m%d-%H%M%S}.pdf", ContentFile(content)
+    )
+    return name, len(equipment)
+
+
+def _run(gym_id, scan_url, category_id, location, requested_at, previous_file):
+    # The previous sheets stay downloadable until the new ones replace them
+    _set_job(gym_id, status="running", requested_at=requested_at, file=previous_file)
+    try:
+        name, count = generate_labels(gym_id, scan_url, category_id, location)
+        _set_job(gym_id, status="ready", requested_at=requested_at, file=name, count=count, finished_at=timezone.now())
+        if previous_file and previous_file != name and default_storage.exists(previous_file):
+            default_storage.delete(previous_file)
+    except Exception as e:
+        print(f"❌ Error generating equipment labels for gym {gym_id}: {str(e)}")
+        _set_job(gym_id, status="failed", requested_at=requested_at, file=previous_file, error=str(e))
+    finally:
+        connection.close()
+
+
+def _executor_instance():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="equipment-labels")
+        return _executor
+
+
+def queue_labels(gym_id, scan_url, category_id=None, location=None):
+    """Start a label job for the gym in the background. False if one is already in progress."""
+    job = label_job(gym_id)
+    if job and job["status"] in ("queued", "running") and timezone.now() - job["requested_at"] < LABEL_JOB_TIMEOUT:
+        return False
+
+    previous_file = job.get("file") if job else None
+    requested_at = timezone.now()
+    _set_job(gym_id, status="queued", requested_at=requested_at, file=previous_file)
+    _executor_instance().submit(_run, gym_id, scan_url, category_id, location, requested_at, previous_file)
+    return True
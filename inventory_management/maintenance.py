@@ -0,0 +1,280 @@
+# inventory_management/maintenance.py
+"""
+Preventive maintenance planning.
+
+plan_preventive_maintenance() finds a gym's equipment whose
+next_maintenance_date falls before the end of a horizon and has no open
+maintenance record, then proposes a date for each: its due date (today
+for overdue equipment), moved to the nearest day inside the horizon on
+which the assignee - a vendor, or a named in-house technician - still has
+capacity. Bookings already in the calendar count against that capacity,
+read with one grouped query.
+
+schedule_preventive_maintenance() turns an accepted plan into
+MaintenanceRecords with one bulk_create inside a single transaction.
+
+Status changes of a record are applied to its equipment by
+sync_equipment_status(): only the Equipment columns that actually change
+are written, with update_fields, and the equipment's alerts are
+recomputed once when the transaction commits (see
+signals.refresh_equipment_alerts_on_commit). transition_maintenance() is
+the entry point for moving a record between states.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Equipment, MaintenanceRecord
+
+
+DEFAULT_HORIZON_DAYS = 30
+MAX_HORIZON_DAYS = 365
+
+# Services one assignee can carry out per day
+DEFAULT_DAILY_CAPACITY = 5
+
+OPEN_STATUSES = ["scheduled", "in_progress"]
+
+ALLOWED_TRANSITIONS = {
+    "scheduled": {"scheduled", "in_progress", "completed", "cancelled"},
+    "in_progress": {"in_progress", "completed", "cancelled"},
+    "completed": {"completed"},
+    "cancelled": {"cancelled", "scheduled"},
+}
+
+# Record fields transition_maintenance() accepts alongside the status
+TRANSITION_FIELDS = {
+    "actual_date",
+    "work_performed",
+    "parts_replaced",
+    "notes",
+    "labor_cost",
+    "parts_cost",
+    "downtime_hours",
+    "next_maintenance_due",
+    "technician_name",
+    "vendor_id",
+}
+
+
+def _assignee(vendor_id, technician_name):
+    return (vendor_id, (technician_name or "").strip().lower())
+
+
+def _existing_load(gym_id, start_date, end_date):
+    """Counter of open bookings per (assignee, day) within the horizon"""
+    rows = (
+        MaintenanceRecord.objects.filter(
+            equipment__gym_id=gym_id,
+            status__in=OPEN_STATUSES,
+            scheduled_date__range=(start_date, end_date),
+        )
+        .values_list("vendor_id", "technician_name", "scheduled_date")
+        .order_by()
+    )
+    load = Counter()
+    for vendor_id, technician_name, scheduled_date in rows:
+        load[(_assignee(vendor_id, technician_name), scheduled_date)] += 1
+    return load
+
+
+def _open_equipment_ids(gym_id, equipment_ids=None):
+    records = MaintenanceRecord.objects.filter(equipment__gym_id=gym_id, status__in=OPEN_STATUSES)
+    if equipment_ids is not None:
+        records = records.filter(equipment_id__in=equipment_ids)
+    return set(records.values_list("equipment_id", flat=True))
+
+
+def equipment_due(gym_id, end_date):
+    """Active equipment due for service by end_date with nothing scheduled yet, most overdue first"""
+    return list(
+        Equipment.objects.filter(
+            gym_id=gym_id,
+            is_active=True,
+            next_maintenance_date__lte=end_date,
+        )
+        .exclude(status="disposed")
+        .exclude(maintenance_records__status__in=OPEN_STATUSES)
+        .select_related("category", "vendor")
+        .order_by("next_maintenance_date", "id")
+    )
+
+
+def _free_day(load, assignee, target, start_date, end_date, capacity):
+    """Nearest day to target within [start_date, end_date] with spare capacity, later days first"""
+    for offset in range((end_date - start_date).days + 1):
+        for day in (target + timedelta(days=offset), target - timedelta(days=offset)):
+            if offset and day == target:
+                continue
+            if start_date <= day <= end_date and load[(assignee, day)] < capacity:
+                return day
+    return None
+
+
+def plan_preventive_maintenance(
+    gym_id,
+    horizon_days=DEFAULT_HORIZON_DAYS,
+    daily_capacity=DEFAULT_DAILY_CAPACITY,
+    start_date=None,
+    vendor_id=None,
+    technician_name="",
+):
+    """
+    Propose a service date for every piece of equipment coming due.
+
+    Work goes to `vendor_id` / `technician_name` when given, else to the
+    equipment's own vendor. Returns {"scheduled": [...], "unscheduled": [...]};
+    each entry has equipment, due_date, scheduled_date, vendor_id and
+    technician_name. Equipment that doesn't fit in the horizon is unscheduled.
+    """
+    start_date = start_date or timezone.localdate()
+    horizon_days = min(max(int(horizon_days), 1), MAX_HORIZON_DAYS)
+    daily_capacity = max(int(daily_capacity), 1)
+    end_date = start_date + timedelta(days=horizon_days - 1)
+
+    load = _existing_load(gym_id, start_date, end_date)
+    technician_name = (technician_name or "").strip()
+
+    scheduled, unscheduled = [], []
+    for equipment in equipment_due(gym_id, end_date):
+        assigned_vendor_id = vendor_id or equipment.vendor_id
+        assignee = _assignee(assigned_vendor_id, technician_name)
+        target = max(equipment.next_maintenance_date, start_date)
+
+        day = _free_day(load, assignee, target, start_date, end_date, daily_capacity)
+        proposal = {
+            "equipment": equipment,
+            "due_date": equipment.next_maintenance_date,
+            "scheduled_date": day,
+            "vendor_id": assigned_vendor_id,
+            "technician_name": technician_name,
+        }
+        if day is None:
+            unscheduled.append(proposal)
+        else:
+            load[(assignee, day)] += 1
+            scheduled.append(proposal)
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "daily_capacity": daily_capacity,
+        "scheduled": scheduled,
+        "unscheduled": unscheduled,
+    }
+
+
+def schedule_preventive_maintenance(gym_id, proposals, user=None):
+    """
+    Create one preventive MaintenanceRecord per proposal (dicts with
+    equipment_id, scheduled_date, vendor_id, technician_name) in a single
+    transaction. Equipment that is not in the gym, or was scheduled in the
+    meantime, is skipped. Returns the created records.
+    """
+    proposals = {int(proposal["equipment_id"]): proposal for proposal in proposals}
+    if not proposals:
+        return []
+
+    with transaction.atomic():
+        equipment = {
+            row.id: row
+            for row in Equipment.objects.select_for_update().filter(
+                gym_id=gym_id, is_active=True, id__in=proposals
+            )
+        }
+        already_open = _open_equipment_ids(gym_id, list(equipment))
+
+        records = MaintenanceRecord.objects.bulk_create([
+            MaintenanceRecord(
+                equipment_id=equipment_id,
+                maintenance_type="preventive",
+                scheduled_date=proposal["scheduled_date"],
+                description=f"Preventive maintenance ({equipment[equipment_id].maintenance_frequency_days}-day service)",
+                technician_name=proposal.get("technician_name") or "",
+                vendor_id=proposal.get("vendor_id") or None,
+                created_by=user,
+            )
+            for equipment_id, proposal in proposals.items()
+            if equipment_id in equipment and equipment_id not in already_open
+        ])
+
+        # Same effect as saving a scheduled record one at a time
+        Equipment.objects.filter(id__in=[record.equipment_id for record in records]).update(
+            status="maintenance", updated_at=timezone.now()
+        )
+
+    return records
+
+
+def equipment_changes(record):
+    """{field: value} the record's status implies for its equipment, only fields that differ"""
+    equipment = record.equipment
+    target = {}
+
+    if record.status in OPEN_STATUSES:
+        target["status"] = "maintenance"
+    elif record.status == "completed" and record.actual_date:
+        target["status"] = "working"
+        target["last_maintenance_date"] = record.actual_date
+        target["next_maintenance_date"] = record.next_maintenance_due or (
+            record.actual_date + timedelta(days=equipment.maintenance_frequency_days)
+        )
+    elif record.status == "cancelled" and equipment.status == "maintenance":
+        target["status"] = "working"
+
+    return {field: value for field, value in target.items() if getattr(equipment, field) != value}
+
+
+def sync_equipment_status(record):
+    """Write the equipment columns the record's status changes; alerts refresh on commit"""
+    changes = equipment_changes(record)
+    if not changes:
+        return []
+
+    equipment = record.equipment
+    for field, value in changes.items():
+        setattr(equipment, field, value)
+    equipment.updated_at = timezone.now()
+    equipment.save(update_fields=[*changes, "updated_at"])
+    return list(changes)
+
+
+def transition_maintenance(record, status, **fields):
+    """
+    Move a record to `status`, updating any of TRANSITION_FIELDS with it.
+    Raises ValueError for unknown statuses or fields and for transitions
+    ALLOWED_TRANSITIONS doesn't permit (e.g. reopening completed work).
+    Completion without an actual date is dated today.
+    Saves only the changed columns of the record and its equipment.
+    """
+    if status not in ALLOWED_TRANSITIONS:
+        raise ValueError(f"Unknown maintenance status: {status}")
+    if status not in ALLOWED_TRANSITIONS[record.status]:
+        raise ValueError(
+            f"Cannot change maintenance from {record.get_status_display()} to "
+            f"{dict(MaintenanceRecord.STATUS_CHOICES)[status]}"
+        )
+
+    unknown = set(fields) - TRANSITION_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown maintenance fields: {', '.join(sorted(unknown))}")
+
+    if status == "completed" and not (fields.get("actual_date") or record.actual_date):
+        fields["actual_date"] = timezone.localdate()
+
+    changed = [field for field, value in fields.items() if getattr(record, field) != value]
+    for field in changed:
+        setattr(record, field, fields[field])
+    if record.status != status:
+        record.status = status
+        changed.append("status")
+
+    if not changed:
+        return record
+
+    if {"labor_cost", "parts_cost"} & set(changed):
+        changed.append("total_cost")
+    record.save(update_fields=[*changed, "updated_at"])
+    return record
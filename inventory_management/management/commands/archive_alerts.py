@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from inventory_management.utils import ALERT_ARCHIVE_CHUNK_SIZE, archive_resolved_alerts
+
+
+class Command(BaseCommand):
+    help = 'Move old resolved alerts into the alert archive in small chunks (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Archive alerts resolved more than this many days ago')
+        parser.add_argument('--chunk-size', type=int, default=ALERT_ARCHIVE_CHUNK_SIZE, help='Alerts moved per transaction')
+
+    def handle(self, *args, **options):
+        archived_count = archive_resolved_alerts(days=options['days'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived_count} resolved alerts"))
@@ -23,13 +23,7 @@ class Command(BaseCommand):
         self.stdout.write(f'🔍 Debugging alerts for gym: {gym.name}')
         
         # 1. Check current alerts
-        current_alerts = StockAlert.objects.filter(
-            inventory_item__gym=gym,
-            is_resolved=False
-        ).count() + StockAlert.objects.filter(
-            equipment__gym=gym,
-            is_resolved=False
-        ).count()
+        current_alerts = StockAlert.objects.filter(gym=gym, is_resolved=False).count()
         
         self.stdout.write(f'📊 Current unresolved alerts: {current_alerts}')
         
@@ -125,13 +119,7 @@ class Command(BaseCommand):
             self.stdout.write('❌ No equipment found!')
         
         # 4. Final alert count
-        final_alerts = StockAlert.objects.filter(
-            inventory_item__gym=gym,
-            is_resolved=False
-        ).count() + StockAlert.objects.filter(
-            equipment__gym=gym,
-            is_resolved=False
-        ).count()
+        final_alerts = StockAlert.objects.filter(gym=gym, is_resolved=False).count()
         
         self.stdout.write(f'\n📊 Final alert count: {final_alerts}')
         
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from inventory_management.forecasting import DEFAULT_WINDOW_DAYS, forecast_all_gyms
+
+
+class Command(BaseCommand):
+    help = 'Compute consumption rates and days of cover for inventory items (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gym-id', type=int, help='Forecast a specific gym only')
+        parser.add_argument('--window-days', type=int, default=DEFAULT_WINDOW_DAYS, help='Days of ledger history to analyse')
+
+    def handle(self, *args, **options):
+        results = forecast_all_gyms(window_days=options['window_days'], gym_id=options.get('gym_id'))
+
+        for gym_id, item_count in results.items():
+            self.stdout.write(f"Gym {gym_id}: forecast {item_count} items")
+
+        self.stdout.write(self.style.SUCCESS(f"Forecasting completed for {len(results)} gyms"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from inventory_management.purchasing import generate_all_purchase_orders
+
+
+class Command(BaseCommand):
+    help = 'Draft vendor purchase orders for low-stock auto-reorder items (run periodically)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gym-id', type=int, help='Generate orders for a specific gym only')
+
+    def handle(self, *args, **options):
+        results = generate_all_purchase_orders(gym_id=options.get('gym_id'))
+
+        for gym_id, order_count in results.items():
+            if order_count:
+                self.stdout.write(f"Gym {gym_id}: drafted {order_count} purchase orders")
+
+        total = sum(results.values())
+        self.stdout.write(self.style.SUCCESS(f"Drafted {total} purchase orders across {len(results)} gyms"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from inventory_management.search import fts_enabled, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for inventory items and equipment'
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            self.stdout.write("Full-text search is not available on this database - list searches use icontains.")
+            return
+
+        inventory_count, equipment_count = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {inventory_count} inventory items and {equipment_count} equipment."
+        ))
@@ -0,0 +1,60 @@
+# Full-text search tables for inventory items and equipment (SQLite FTS5 only)
+
+from django.db import migrations
+
+
+INVENTORY_FTS_TABLE = 'inventory_management_inventoryitem_fts'
+EQUIPMENT_FTS_TABLE = 'inventory_management_equipment_fts'
+
+
+def _fts5_available(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return 'ENABLE_FTS5' in {row[0] for row in cursor.fetchall()}
+
+
+def create_search_tables(apps, schema_editor):
+    connection = schema_editor.connection
+    if not _fts5_available(connection):
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {INVENTORY_FTS_TABLE} USING fts5("
+            "name, brand, sku, barcode, description, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {EQUIPMENT_FTS_TABLE} USING fts5("
+            "name, brand, model_number, serial_number, location, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(
+            f"INSERT INTO {INVENTORY_FTS_TABLE} (rowid, name, brand, sku, barcode, description) "
+            "SELECT id, name, brand, sku, barcode, description FROM inventory_management_inventoryitem"
+        )
+        cursor.execute(
+            f"INSERT INTO {EQUIPMENT_FTS_TABLE} (rowid, name, brand, model_number, serial_number, location) "
+            "SELECT id, name, brand, model_number, serial_number, location FROM inventory_management_equipment"
+        )
+
+
+def drop_search_tables(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {INVENTORY_FTS_TABLE}')
+        cursor.execute(f'DROP TABLE IF EXISTS {EQUIPMENT_FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory_management', '0004_equipmentcategory_created_by_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
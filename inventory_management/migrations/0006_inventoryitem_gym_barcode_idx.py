@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory_management', '0005_search_index'),
+        ('multiple_gym', '0002_alter_user_user_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['gym', 'barcode'], name='inventory_gym_barcode_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:34
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory_management', '0006_inventoryitem_gym_barcode_idx'),
+        ('multiple_gym', '0002_alter_user_user_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('daily_consumption', models.DecimalField(decimal_places=4, default=0, help_text='Units consumed per day', max_digits=12)),
+                ('days_of_cover', models.DecimalField(blank=True, decimal_places=1, help_text='Days until current stock runs out (blank if no consumption)', max_digits=10, null=True)),
+                ('stockout_date', models.DateField(blank=True, null=True)),
+                ('window_days', models.IntegerField(default=90, help_text='History window used for the forecast')),
+                ('transactions_analyzed', models.IntegerField(default=0)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('gym', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_forecasts', to='multiple_gym.gym')),
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='forecast', to='inventory_management.inventoryitem')),
+            ],
+            options={
+                'ordering': ['days_of_cover'],
+                'indexes': [models.Index(fields=['gym', 'days_of_cover'], name='forecast_gym_cover_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory_management', '0008_purchaseorder'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stocktransaction',
+            index=models.Index(fields=['item', 'transaction_date'], name='stock_txn_item_date_idx'),
+        ),
+    ]
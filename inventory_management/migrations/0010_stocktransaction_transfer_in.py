@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory_management', '0009_stocktransaction_item_date_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stocktransaction',
+            name='transaction_type',
+            field=models.CharField(choices=[('purchase', 'Purchase'), ('sale', 'Sale'), ('adjustment', 'Stock Adjustment'), ('damage', 'Damage/Loss'), ('return', 'Return'), ('transfer', 'Transfer'), ('transfer_in', 'Transfer In'), ('expired', 'Expired')], max_length=20),
+        ),
+    ]
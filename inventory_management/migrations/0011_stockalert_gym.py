@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_alert_gym(apps, schema_editor):
+    """Copy the gym from each alert's equipment or inventory item"""
+    StockAlert = apps.get_model('inventory_management', 'StockAlert')
+    Equipment = apps.get_model('inventory_management', 'Equipment')
+    InventoryItem = apps.get_model('inventory_management', 'InventoryItem')
+
+    StockAlert.objects.filter(gym__isnull=True, equipment__isnull=False).update(
+        gym=Subquery(Equipment.objects.filter(id=OuterRef('equipment_id')).values('gym_id')[:1])
+    )
+    StockAlert.objects.filter(gym__isnull=True, inventory_item__isnull=False).update(
+        gym=Subquery(InventoryItem.objects.filter(id=OuterRef('inventory_item_id')).values('gym_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory_management', '0010_stocktransaction_transfer_in'),
+        ('multiple_gym', '0002_alter_user_user_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockalert',
+            name='gym',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stock_alerts', to='multiple_gym.gym'),
+        ),
+        migrations.RunPython(backfill_alert_gym, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='stockalert',
+            index=models.Index(fields=['gym', 'is_resolved', 'priority', 'created_at'], name='alert_gym_status_idx'),
+        ),
+    ]
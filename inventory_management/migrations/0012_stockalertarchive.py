@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory_management', '0011_stockalert_gym'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockAlertArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alert_id', models.IntegerField(unique=True)),
+                ('gym_id', models.IntegerField(blank=True, null=True)),
+                ('equipment_id', models.IntegerField(blank=True, null=True)),
+                ('inventory_item_id', models.IntegerField(blank=True, null=True)),
+                ('resolved_by_id', models.IntegerField(blank=True, null=True)),
+                ('alert_type', models.CharField(choices=[('low_stock', 'Low Stock'), ('expiry_soon', 'Expiring Soon'), ('expired', 'Expired'), ('maintenance_due', 'Maintenance Due'), ('warranty_expiring', 'Warranty Expiring'), ('reorder_needed', 'Reorder Needed')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('critical', 'Critical')], max_length=10)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-resolved_at'],
+                'indexes': [models.Index(fields=['gym_id', 'resolved_at'], name='alert_archive_gym_idx')],
+            },
+        ),
+    ]
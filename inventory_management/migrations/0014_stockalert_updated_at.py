@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:46
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_alert_updated_at(apps, schema_editor):
+    """Existing alerts last changed when they were resolved or created, not at migration time"""
+    StockAlert = apps.get_model('inventory_management', 'StockAlert')
+    StockAlert.objects.update(updated_at=Coalesce('resolved_at', 'created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory_management', '0013_maintenancerecord_status_actual_idx'),
+        ('multiple_gym', '0002_alter_user_user_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockAlertRemoval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alert_id', models.IntegerField()),
+                ('gym_id', models.IntegerField(blank=True, null=True)),
+                ('removed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='stockalert',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_alert_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='stockalert',
+            index=models.Index(fields=['gym', 'updated_at'], name='alert_gym_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockalertremoval',
+            index=models.Index(fields=['gym_id', 'removed_at'], name='alert_removal_gym_idx'),
+        ),
+    ]
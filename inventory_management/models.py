@@ -264,42 +264,25 @@ class MaintenanceRecord(models.Model):
     
     class Meta:
         ordering = ['-scheduled_date']
+        indexes = [
+            # Completed-work cost reports filter on status and group by actual_date
+            models.Index(fields=['status', 'actual_date'], name='maint_status_actual_idx'),
+        ]
     
     def __str__(self):
         return f"{self.equipment.name} - {self.maintenance_type} ({self.scheduled_date})"
     
     def save(self, *args, **kwargs):
+        from .maintenance import sync_equipment_status
+
         try:
             # Calculate total cost
             self.total_cost = self.labor_cost + self.parts_cost
-            
-            # AUTO UPDATE EQUIPMENT STATUS based on maintenance status
-            if self.status == 'scheduled':
-                self.equipment.status = 'maintenance'
-                self.equipment.save()
-                
-            elif self.status == 'in_progress':
-                self.equipment.status = 'maintenance' 
-                self.equipment.save()
-                
-            elif self.status == 'completed' and self.actual_date:
-                self.equipment.status = 'working'
-                self.equipment.last_maintenance_date = self.actual_date
-                
-                if self.next_maintenance_due:
-                    self.equipment.next_maintenance_date = self.next_maintenance_due
-                else:
-                    from datetime import timedelta
-                    next_date = self.actual_date + timedelta(days=self.equipment.maintenance_frequency_days)
-                    self.equipment.next_maintenance_date = next_date
-                
-                self.equipment.save()
-                
-            elif self.status == 'cancelled':
-                if self.equipment.status == 'maintenance':
-                    self.equipment.status = 'working'
-                    self.equipment.save()
-            
+
+            # AUTO UPDATE EQUIPMENT STATUS based on maintenance status -
+            # only the changed equipment columns are written
+            sync_equipment_status(self)
+
             super().save(*args, **kwargs)
             
         except Exception as e:
@@ -378,6 +361,10 @@ class InventoryItem(models.Model):
     class Meta:
         ordering = ['name']
         unique_together = ['name', 'gym']
+        indexes = [
+            # Point-of-sale barcode lookups (see barcode_index.py)
+            models.Index(fields=['gym', 'barcode'], name='inventory_gym_barcode_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.current_stock} {self.unit})"
@@ -419,8 +406,12 @@ class StockTransaction(models.Model):
         ('damage', 'Damage/Loss'),
         ('return', 'Return'),
         ('transfer', 'Transfer'),
+        ('transfer_in', 'Transfer In'),
         ('expired', 'Expired'),
     ]
+
+    # Types that add to stock; everything else takes stock out
+    INCOMING_TYPES = ['purchase', 'adjustment', 'return', 'transfer_in']
     
     item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='transactions')
     transaction_type = models.CharField(max_length=20, choices=TRANSACTION_TYPE_CHOICES)
@@ -449,9 +440,16 @@ class StockTransaction(models.Model):
     
     class Meta:
         ordering = ['-transaction_date']
+        indexes = [
+            models.Index(fields=['item', 'transaction_date'], name='stock_txn_item_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.item.name} - {self.transaction_type} ({self.quantity})"
+
+    @property
+    def is_incoming(self):
+        return self.transaction_type in self.INCOMING_TYPES
     
     def save(self, *args, **kwargs):
         """Override save with proper Decimal handling"""
@@ -476,7 +474,7 @@ class StockTransaction(models.Model):
             self.total_amount = quantity_decimal * unit_price_decimal
 
             # Update stock levels based on transaction type
-            if self.transaction_type in ['purchase', 'adjustment', 'return']:
+            if self.transaction_type in self.INCOMING_TYPES:
                 # Incoming stock
                 stock_after_decimal = stock_before_decimal + quantity_decimal
             else:  # sale, damage, transfer, expired
@@ -532,6 +530,9 @@ class StockAlert(models.Model):
     alert_type = models.CharField(max_length=20, choices=ALERT_TYPE_CHOICES)
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='medium')
     
+    # Copied from the equipment/item so alert lists filter on one indexed column
+    gym = models.ForeignKey('multiple_gym.Gym', on_delete=models.CASCADE, null=True, blank=True, related_name='stock_alerts')
+    
     # Related objects
     equipment = models.ForeignKey(Equipment, on_delete=models.CASCADE, null=True, blank=True)
     inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, null=True, blank=True)
@@ -548,9 +549,155 @@ class StockAlert(models.Model):
     
     # Tracking
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bulk .update() calls set it too: the live alert poll reads changes from it
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['gym', 'is_resolved', 'priority', 'created_at'], name='alert_gym_status_idx'),
+            models.Index(fields=['gym', 'updated_at'], name='alert_gym_updated_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.alert_type}: {self.title}"
+    
+    def save(self, *args, **kwargs):
+        if self.gym_id is None:
+            source = self.equipment or self.inventory_item
+            if source is not None:
+                self.gym_id = source.gym_id
+        super().save(*args, **kwargs)
+
+class StockAlertArchive(models.Model):
+    """Resolved alerts moved out of StockAlert by utils.archive_resolved_alerts()"""
+    # Plain ids rather than foreign keys: archived rows must survive deleted
+    # items/equipment and must not slow down deletes elsewhere
+    alert_id = models.IntegerField(unique=True)
+    gym_id = models.IntegerField(null=True, blank=True)
+    equipment_id = models.IntegerField(null=True, blank=True)
+    inventory_item_id = models.IntegerField(null=True, blank=True)
+    resolved_by_id = models.IntegerField(null=True, blank=True)
+    
+    alert_type = models.CharField(max_length=20, choices=StockAlert.ALERT_TYPE_CHOICES)
+    priority = models.CharField(max_length=10, choices=StockAlert.PRIORITY_CHOICES)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    
+    created_at = models.DateTimeField()
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-resolved_at']
+        indexes = [
+            models.Index(fields=['gym_id', 'resolved_at'], name='alert_archive_gym_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.alert_type}: {self.title} (archived)"
+
+class StockAlertRemoval(models.Model):
+    """Open alerts that were deleted, so live alert polls can report them; pruned with the archive"""
+    # Plain ids, as in StockAlertArchive
+    alert_id = models.IntegerField()
+    gym_id = models.IntegerField(null=True, blank=True)
+    removed_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['gym_id', 'removed_at'], name='alert_removal_gym_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Alert #{self.alert_id} removed at {self.removed_at}"
+
+class InventoryForecast(models.Model):
+    """Consumption rate and days of cover per item - computed by forecasting.py"""
+    item = models.OneToOneField(InventoryItem, on_delete=models.CASCADE, related_name='forecast')
+    gym = models.ForeignKey('multiple_gym.Gym', on_delete=models.CASCADE, related_name='inventory_forecasts')
+    
+    # Forecast
+    daily_consumption = models.DecimalField(max_digits=12, decimal_places=4, default=0, help_text="Units consumed per day")
+    days_of_cover = models.DecimalField(max_digits=10, decimal_places=1, null=True, blank=True, help_text="Days until current stock runs out (blank if no consumption)")
+    stockout_date = models.DateField(null=True, blank=True)
+    
+    # Input window
+    window_days = models.IntegerField(default=90, help_text="History window used for the forecast")
+    transactions_analyzed = models.IntegerField(default=0)
+    
+    # Tracking
+    computed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['days_of_cover']
+        indexes = [
+            models.Index(fields=['gym', 'days_of_cover'], name='forecast_gym_cover_idx'),
+        ]
+    
+    def __str__(self):
+        if self.days_of_cover is None:
+            return f"{self.item.name} - no consumption"
+        return f"{self.item.name} - runs out in {self.days_of_cover} days"
+
+
+class PurchaseOrder(models.Model):
+    """Purchase orders to vendors - drafted automatically from auto_reorder items (see purchasing.py)"""
+    STATUS_CHOICES = [
+        ('draft', 'Draft'),
+        ('sent', 'Sent to Vendor'),
+        ('received', 'Received'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    gym = models.ForeignKey('multiple_gym.Gym', on_delete=models.CASCADE, related_name='purchase_orders')
+    vendor = models.ForeignKey(Vendor, on_delete=models.SET_NULL, null=True, blank=True, related_name='purchase_orders')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    
+    # Order details
+    expected_date = models.DateField(null=True, blank=True)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    notes = models.TextField(blank=True)
+    
+    # Receiving
+    received_at = models.DateTimeField(null=True, blank=True)
+    received_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='received_purchase_orders')
+    
+    # Tracking
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['gym', 'status'], name='po_gym_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.po_number} - {self.vendor.name if self.vendor else 'No vendor'} ({self.status})"
+    
+    @property
+    def po_number(self):
+        return f"PO-{self.id:06d}" if self.id else "PO-NEW"
+    
+    @property
+    def is_open(self):
+        return self.status in ['draft', 'sent']
+
+
+class PurchaseOrderLine(models.Model):
+    """One inventory item on a purchase order"""
+    purchase_order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, related_name='lines')
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='purchase_order_lines')
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    received_quantity = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    
+    class Meta:
+        ordering = ['item__name']
+        unique_together = ['purchase_order', 'item']
     
     def __str__(self):
-        return f"{self.alert_type}: {self.title}"
\ No newline at end of file
+        return f"{self.purchase_order.po_number}: {self.item.name} x {self.quantity}"
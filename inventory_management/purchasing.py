@@ -0,0 +1,129 @@
+# inventory_management/purchasing.py
+"""
+Purchase orders from auto_reorder items.
+
+generate_purchase_orders() collects every active, low-stock, auto_reorder
+item of a gym that is not already on an open order, groups them by primary
+vendor and creates one draft PurchaseOrder per vendor with its lines in bulk.
+receive_purchase_order() books a received order into the ledger as one
+batch of `purchase` StockTransactions (see stock.py).
+
+Run generation periodically with `manage.py generate_purchase_orders`.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from multiple_gym.models import Gym
+from .models import InventoryItem, PurchaseOrder, PurchaseOrderLine
+from .stock import record_stock_movements
+
+
+def reorder_quantity_for(item):
+    """Quantity to order: the configured reorder quantity, else top up to maximum"""
+    if item.reorder_quantity and item.reorder_quantity > 0:
+        return Decimal(str(item.reorder_quantity))
+
+    target = max(item.maximum_stock, item.minimum_stock)
+    return max(Decimal(str(target)) - Decimal(str(item.current_stock)), Decimal("0"))
+
+
+def generate_purchase_orders(gym_id, user=None):
+    """Draft one purchase order per vendor for the gym's low-stock items. Returns the new orders."""
+    items = list(
+        InventoryItem.objects.filter(
+            gym_id=gym_id,
+            is_active=True,
+            auto_reorder=True,
+            current_stock__lte=F("minimum_stock"),
+        )
+        .exclude(purchase_order_lines__purchase_order__status__in=["draft", "sent"])
+        .order_by("primary_vendor_id", "name")
+    )
+
+    items_by_vendor = defaultdict(list)
+    for item in items:
+        quantity = reorder_quantity_for(item)
+        if quantity > 0:
+            items_by_vendor[item.primary_vendor_id].append((item, quantity))
+
+    if not items_by_vendor:
+        return []
+
+    with transaction.atomic():
+        orders = PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(
+                gym_id=gym_id,
+                vendor_id=vendor_id,
+                total_amount=sum(quantity * item.cost_price for item, quantity in vendor_items),
+                notes="Generated automatically from auto-reorder items",
+                created_by=user,
+            )
+            for vendor_id, vendor_items in items_by_vendor.items()
+        ])
+
+        PurchaseOrderLine.objects.bulk_create([
+            PurchaseOrderLine(
+                purchase_order=order,
+                item=item,
+                quantity=quantity,
+                unit_price=item.cost_price,
+                total_amount=quantity * item.cost_price,
+            )
+            for order, vendor_items in zip(orders, items_by_vendor.values())
+            for item, quantity in vendor_items
+        ])
+
+    return orders
+
+
+def generate_all_purchase_orders(gym_id=None):
+    """Run generation for every active gym (or one). Returns {gym_id: orders created}"""
+    gyms = Gym.objects.filter(is_active=True)
+    if gym_id:
+        gyms = gyms.filter(id=gym_id)
+
+    return {gym_pk: len(generate_purchase_orders(gym_pk)) for gym_pk in gyms.values_list("id", flat=True)}
+
+
+def receive_purchase_order(order, user=None, received_quantities=None):
+    """
+    Book a purchase order into stock. `received_quantities` maps line id to the
+    quantity actually delivered (defaults to the ordered quantity); lines
+    received as zero are skipped.
+    """
+    received_quantities = received_quantities or {}
+
+    with transaction.atomic():
+        # Re-read under lock so a double submit can't book the order twice
+        order = PurchaseOrder.objects.select_for_update().get(id=order.id)
+        if not order.is_open:
+            raise ValueError(f"{order.po_number} is {order.get_status_display().lower()} and cannot be received")
+
+        lines = list(order.lines.all())
+        movements = []
+        for line in lines:
+            line.received_quantity = Decimal(str(received_quantities.get(line.id, line.quantity)))
+            if line.received_quantity > 0:
+                movements.append({
+                    "item_id": line.item_id,
+                    "transaction_type": "purchase",
+                    "quantity": line.received_quantity,
+                    "unit_price": line.unit_price,
+                    "reference_number": order.po_number,
+                    "vendor_id": order.vendor_id,
+                    "notes": f"Received against {order.po_number}",
+                })
+
+        record_stock_movements(movements, user=user)
+        PurchaseOrderLine.objects.bulk_update(lines, ["received_quantity"])
+
+        order.status = "received"
+        order.received_at = timezone.now()
+        order.received_by = user
+        order.save(update_fields=["status", "received_at", "received_by", "updated_at"])
+
+    return order
@@ -0,0 +1,226 @@
+# inventory_management/reliability.py
+"""
+Equipment reliability analytics.
+
+Over a window of months, per equipment and per category:
+
+- MTBF: hours in service divided by the number of failures
+- MTTR: downtime of failure repairs divided by the number of failures
+- total downtime and availability (share of the window the equipment was up)
+- maintenance cost per hour of uptime, and as a share of the book value
+
+Failures are completed corrective and emergency records. The window of
+equipment bought during it starts at the purchase date, and hours are
+calendar hours. The data comes from two queries - the gym's equipment and
+one group-by over completed MaintenanceRecords on the (status,
+actual_date) index - and is combined in NumPy arrays. Results are cached
+per gym and window; any maintenance change of the gym bumps its cache
+generation.
+"""
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from multiple_gym.cache_generations import bump_generation, current_generation
+from .models import Equipment, MaintenanceRecord
+from .valuation import book_values
+
+
+FAILURE_TYPES = ["corrective", "emergency"]
+
+HOURS_PER_DAY = 24
+
+DEFAULT_WINDOW_MONTHS = 12
+MAX_WINDOW_MONTHS = 60
+WINDOW_PRESETS = [3, 6, 12, 24]
+
+RELIABILITY_CACHE_TTL = 60 * 60
+
+# Replacement candidates: maintenance in the window cost at least this share of the book value
+REPLACE_COST_RATIO = 0.5
+
+
+def invalidate_reliability(gym_id):
+    """Make every cached reliability report of the gym stale"""
+    bump_generation("reliability", gym_id)
+
+
+def parse_window_months(value):
+    try:
+        months = int(value or DEFAULT_WINDOW_MONTHS)
+    except ValueError:
+        months = DEFAULT_WINDOW_MONTHS
+    return min(max(months, 1), MAX_WINDOW_MONTHS)
+
+
+def _ratio(numerator, denominator):
+    """Element-wise numerator / denominator, NaN where the denominator is zero"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1), np.nan)
+
+
+def _number(value):
+    """float for templates, None for NaN"""
+    return None if np.isnan(value) else float(value)
+
+
+def build_reliability_report(gym_id, months=DEFAULT_WINDOW_MONTHS, today=None):
+    """Reliability metrics per equipment and category over the last `months` months"""
+    today = today or timezone.localdate()
+    window_start = today - relativedelta(months=months)
+
+    equipment = list(
+        Equipment.objects.filter(gym_id=gym_id, is_active=True)
+        .values(
+            "id",
+            "name",
+            "serial_number",
+            "status",
+            "category_id",
+            "category__name",
+            "purchase_date",
+            "purchase_price",
+            "depreciation_rate",
+        )
+        .order_by("name")
+    )
+
+    history = {
+        row["equipment_id"]: row
+        for row in MaintenanceRecord.objects.filter(
+            equipment__gym_id=gym_id,
+            status="completed",
+            actual_date__gt=window_start,
+            actual_date__lte=today,
+        )
+        .values("equipment_id")
+        .annotate(
+            failures=Count("id", filter=Q(maintenance_type__in=FAILURE_TYPES)),
+            repair_downtime=Sum("downtime_hours", filter=Q(maintenance_type__in=FAILURE_TYPES)),
+            downtime=Sum("downtime_hours"),
+            cost=Sum("total_cost"),
+        )
+        .order_by()
+    }
+
+    def column(name):
+        return np.array([float(history.get(row["id"], {}).get(name) or 0) for row in equipment])
+
+    failures = column("failures")
+    repair_downtime = column("repair_downtime")
+    downtime = column("downtime")
+    cost = column("cost")
+
+    start_ordinal = window_start.toordinal()
+    in_service_days = np.array(
+        [today.toordinal() - max(row["purchase_date"].toordinal(), start_ordinal) for row in equipment],
+        dtype=float,
+    )
+    window_hours = np.clip(in_service_days, 0, None) * HOURS_PER_DAY
+    uptime = np.clip(window_hours - downtime, 0, None)
+
+    book_value = book_values(
+        [row["purchase_price"] for row in equipment],
+        [row["purchase_date"] for row in equipment],
+        [row["depreciation_rate"] for row in equipment],
+        today,
+    )
+
+    mtbf = _ratio(uptime, failures)
+    mttr = _ratio(repair_downtime, failures)
+    availability = _ratio(uptime, window_hours) * 100
+    cost_per_uptime_hour = _ratio(cost, uptime)
+    cost_to_value = _ratio(cost, book_value)
+    replace = (cost > 0) & ((book_value <= 0) | (np.nan_to_num(cost_to_value) >= REPLACE_COST_RATIO))
+
+    rows = []
+    for position, row in enumerate(equipment):
+        rows.append({
+            "id": row["id"],
+            "name": row["name"],
+            "serial_number": row["serial_number"],
+            "status": row["status"],
+            "category__name": row["category__name"],
+            "failures": int(failures[position]),
+            "mtbf_hours": _number(mtbf[position]),
+            "mttr_hours": _number(mttr[position]),
+            "downtime_hours": float(downtime[position]),
+            "availability": _number(availability[position]),
+            "maintenance_cost": float(cost[position]),
+            "cost_per_uptime_hour": _number(cost_per_uptime_hour[position]),
+            "book_value": float(book_value[position]),
+            "cost_to_value": _number(cost_to_value[position] * 100),
+            "replace": bool(replace[position]),
+        })
+
+    # Worst first: replacement candidates, then by cost per hour of uptime
+    rows.sort(key=lambda r: (not r["replace"], -(r["cost_per_uptime_hour"] or 0), -r["failures"]))
+
+    category_names = {row["category_id"]: row["category__name"] for row in equipment}
+    positions = {category_id: index for index, category_id in enumerate(sorted(category_names))}
+    category_index = np.array([positions[row["category_id"]] for row in equipment], dtype=int)
+
+    def per_category(values):
+        return np.bincount(category_index, weights=values, minlength=len(positions))
+
+    category_failures = per_category(failures)
+    category_uptime = per_category(uptime)
+    category_window = per_category(window_hours)
+    category_repair = per_category(repair_downtime)
+    category_downtime = per_category(downtime)
+    category_cost = per_category(cost)
+    category_count = np.bincount(category_index, minlength=len(positions))
+
+    category_mtbf = _ratio(category_uptime, category_failures)
+    category_mttr = _ratio(category_repair, category_failures)
+    category_availability = _ratio(category_uptime, category_window) * 100
+    category_cost_per_hour = _ratio(category_cost, category_uptime)
+
+    categories = [
+        {
+            "category__name": category_names[category_id],
+            "count": int(category_count[index]),
+            "failures": int(category_failures[index]),
+            "mtbf_hours": _number(category_mtbf[index]),
+            "mttr_hours": _number(category_mttr[index]),
+            "downtime_hours": float(category_downtime[index]),
+            "availability": _number(category_availability[index]),
+            "maintenance_cost": float(category_cost[index]),
+            "cost_per_uptime_hour": _number(category_cost_per_hour[index]),
+        }
+        for category_id, index in positions.items()
+    ]
+    categories.sort(key=lambda c: -(c["cost_per_uptime_hour"] or 0))
+
+    total_failures = float(failures.sum())
+    total_uptime = float(uptime.sum())
+
+    return {
+        "window_start": window_start,
+        "window_end": today,
+        "months": months,
+        "equipment": rows,
+        "categories": categories,
+        "total_failures": int(total_failures),
+        "total_downtime": float(downtime.sum()),
+        "total_maintenance_cost": float(cost.sum()),
+        "fleet_mtbf": total_uptime / total_failures if total_failures else None,
+        "fleet_mttr": float(repair_downtime.sum()) / total_failures if total_failures else None,
+        "fleet_availability": total_uptime / float(window_hours.sum()) * 100 if window_hours.sum() else None,
+        "replace_candidates": sum(1 for row in rows if row["replace"]),
+        "generated_at": timezone.now(),
+    }
+
+
+def get_reliability_report(gym_id, months=DEFAULT_WINDOW_MONTHS):
+    """Cached build_reliability_report() - rebuilt after the gym's next maintenance change"""
+    generation = current_generation("reliability", gym_id)
+    key = f"reliability:{gym_id}:{generation}:{months}:{timezone.localdate().isoformat()}"
+
+    report = cache.get(key)
+    if report is None:
+        report = build_reliability_report(gym_id, months)
+        cache.set(key, report, RELIABILITY_CACHE_TTL)
+    return report
@@ -0,0 +1,247 @@
+# inventory_management/reports.py
+"""
+Inventory report data for a date range.
+
+build_inventory_report() needs three queries whatever the size of the
+ledger: the gym's active items, item velocity over the window (one grouped
+query on the (item, transaction_date) index) and monthly movement totals.
+Everything else - category totals, stock distribution, ABC classes, fast
+and slow movers - is derived in Python from those rows.
+
+Reports are cached per (gym, range). Every gym has a generation number in
+the cache that is bumped whenever a stock transaction is recorded or an
+item changes, so cached reports are never served stale - the old keys just
+expire.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from multiple_gym.cache_generations import bump_generation, current_generation
+from .forecasting import CONSUMPTION_TYPES
+from .models import InventoryItem, StockTransaction
+
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 730
+RANGE_PRESETS = [7, 30, 90, 180, 365]
+
+REPORT_CACHE_TTL = 60 * 60
+TOP_MOVERS = 10
+
+ITEM_FIELDS = (
+    "id",
+    "name",
+    "brand",
+    "unit",
+    "current_stock",
+    "minimum_stock",
+    "maximum_stock",
+    "cost_price",
+    "auto_reorder",
+    "reorder_quantity",
+    "category__name",
+    "primary_vendor__name",
+)
+
+
+def invalidate_inventory_report(gym_id):
+    """Make every cached report of the gym stale"""
+    bump_generation("inventory_report", gym_id)
+
+
+def parse_report_range(start_value=None, end_value=None, days_value=None):
+    """
+    (start_date, end_date) from request parameters: explicit start/end dates,
+    else the last `days` days, else the last DEFAULT_RANGE_DAYS days.
+    """
+    today = timezone.localdate()
+
+    def parse(value):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+        except ValueError:
+            return None
+
+    end_date = min(parse(end_value) or today, today)
+    start_date = parse(start_value)
+
+    if start_date is None:
+        try:
+            days = int(days_value or DEFAULT_RANGE_DAYS)
+        except ValueError:
+            days = DEFAULT_RANGE_DAYS
+        days = min(max(days, 1), MAX_RANGE_DAYS)
+        start_date = end_date - timedelta(days=days - 1)
+
+    start_date = max(min(start_date, end_date), end_date - timedelta(days=MAX_RANGE_DAYS - 1))
+    return start_date, end_date
+
+
+def _stock_level(item):
+    if item["current_stock"] <= 0:
+        return "out_of_stock"
+    if item["current_stock"] <= item["minimum_stock"]:
+        return "low_stock"
+    if item["maximum_stock"] > 0 and item["current_stock"] > item["maximum_stock"]:
+        return "overstock"
+    return "normal_stock"
+
+
+def _percentage(part, whole):
+    return float(part) / float(whole) * 100 if whole else 0
+
+
+def build_inventory_report(gym_id, start_date, end_date):
+    """Compute the report dict for one gym and an inclusive date range"""
+    start = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+    range_days = (end_date - start_date).days + 1
+
+    items = list(
+        InventoryItem.objects.filter(gym_id=gym_id, is_active=True)
+        .values(*ITEM_FIELDS)
+        .order_by("name")
+    )
+
+    ledger = StockTransaction.objects.filter(
+        item__gym_id=gym_id, transaction_date__gte=start, transaction_date__lt=end
+    )
+
+    velocity = {
+        row["item_id"]: row
+        for row in ledger.filter(item__is_active=True)
+        .values("item_id")
+        .annotate(
+            transaction_count=Count("id"),
+            units_out=Sum("quantity", filter=Q(transaction_type__in=CONSUMPTION_TYPES)),
+            last_transaction=Max("transaction_date"),
+        )
+        .order_by()
+    }
+
+    monthly = {}
+    for row in (
+        ledger.annotate(month=TruncMonth("transaction_date"))
+        .values("month", "transaction_type")
+        .annotate(count=Count("id"), amount=Sum("total_amount"))
+        .order_by()
+    ):
+        month = monthly.setdefault(row["month"], {
+            "month": row["month"].strftime("%b %Y"),
+            "purchases": 0,
+            "sales": 0,
+            "purchase_value": Decimal("0"),
+            "sales_value": Decimal("0"),
+        })
+        if row["transaction_type"] == "purchase":
+            month["purchases"] += row["count"]
+            month["purchase_value"] += row["amount"] or 0
+        elif row["transaction_type"] == "sale":
+            month["sales"] += row["count"]
+            month["sales_value"] += row["amount"] or 0
+    transaction_summary = [monthly[key] for key in sorted(monthly)]
+    for month in transaction_summary:
+        month["net_value"] = month["sales_value"] - month["purchase_value"]
+
+    categories = {}
+    distribution = {"out_of_stock": 0, "low_stock": 0, "normal_stock": 0, "overstock": 0}
+    total_value = Decimal("0")
+    overstock_value = Decimal("0")
+    consumed_value = Decimal("0")
+
+    for item in items:
+        moves = velocity.get(item["id"], {})
+        item["total_value"] = item["current_stock"] * item["cost_price"]
+        item["transaction_count"] = moves.get("transaction_count", 0)
+        item["total_quantity"] = moves.get("units_out") or Decimal("0")
+        item["units_per_day"] = item["total_quantity"] / range_days
+        item["last_transaction"] = moves.get("last_transaction")
+        item["stock_level"] = _stock_level(item)
+
+        distribution[item["stock_level"]] += 1
+        total_value += item["total_value"]
+        consumed_value += item["total_quantity"] * item["cost_price"]
+        if item["stock_level"] == "overstock":
+            overstock_value += (item["current_stock"] - item["maximum_stock"]) * item["cost_price"]
+
+        category = categories.setdefault(item["category__name"], {
+            "category__name": item["category__name"],
+            "item_count": 0,
+            "total_value": Decimal("0"),
+        })
+        category["item_count"] += 1
+        category["total_value"] += item["total_value"]
+
+    for category in categories.values():
+        category["avg_value"] = category["total_value"] / category["item_count"]
+
+    total_items = len(items)
+    for level in list(distribution):
+        distribution[f"{level}_pct"] = _percentage(distribution[level], total_items)
+
+    # ABC: A = top 80% of value, B = next 15%, C = the rest
+    abc = {"a": [0, Decimal("0")], "b": [0, Decimal("0")], "c": [0, Decimal("0")]}
+    running = Decimal("0")
+    for item in sorted(items, key=lambda i: i["total_value"], reverse=True):
+        share = _percentage(running, total_value)
+        band = "a" if share < 80 else "b" if share < 95 else "c"
+        abc[band][0] += 1
+        abc[band][1] += item["total_value"]
+        running += item["total_value"]
+    abc_analysis = {}
+    for band, (count, value) in abc.items():
+        abc_analysis[f"category_{band}_count"] = count
+        abc_analysis[f"category_{band}_pct"] = _percentage(count, total_items)
+        abc_analysis[f"category_{band}_value_pct"] = _percentage(value, total_value)
+
+    moving = [item for item in items if item["total_quantity"] > 0]
+    fast_moving_items = sorted(moving, key=lambda i: i["total_quantity"], reverse=True)[:TOP_MOVERS]
+    slow_moving_items = sorted(
+        [item for item in items if item["current_stock"] > 0],
+        key=lambda i: (i["units_per_day"], -i["total_value"]),
+    )[:TOP_MOVERS]
+
+    low_stock_items = sorted(
+        [item for item in items if item["stock_level"] in ("out_of_stock", "low_stock")],
+        key=lambda i: i["current_stock"],
+    )
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "range_days": range_days,
+        "total_items": total_items,
+        "total_inventory_value": total_value,
+        "total_transactions": sum(row["transaction_count"] for row in velocity.values()),
+        "inventory_by_category": sorted(categories.values(), key=lambda c: c["total_value"], reverse=True),
+        "stock_distribution": distribution,
+        "transaction_summary": transaction_summary,
+        "fast_moving_items": fast_moving_items,
+        "slow_moving_items": slow_moving_items,
+        "low_stock_items": low_stock_items,
+        "low_stock_count": len(low_stock_items),
+        "out_of_stock_count": distribution["out_of_stock"],
+        "abc_analysis": abc_analysis,
+        "well_stocked_percentage": distribution["normal_stock_pct"] + distribution["overstock_pct"],
+        "avg_turnover": float(consumed_value / total_value) * 365 / range_days if total_value else 0,
+        "overstock_pct": _percentage(overstock_value, total_value),
+        "items_without_vendors": sum(1 for item in items if not item["primary_vendor__name"]),
+        "generated_at": timezone.now(),
+    }
+
+
+def get_inventory_report(gym_id, start_date, end_date):
+    """Cached build_inventory_report() - rebuilt after the gym's next stock change"""
+    generation = current_generation("inventory_report", gym_id)
+    key = f"inventory_report:{gym_id}:{generation}:{start_date.isoformat()}:{end_date.isoformat()}"
+
+    report = cache.get(key)
+    if report is None:
+        report = build_inventory_report(gym_id, start_date, end_date)
+        cache.set(key, report, REPORT_CACHE_TTL)
+    return report
@@ -0,0 +1,155 @@
+# inventory_management/search.py
+"""
+Full-text search for inventory items and equipment.
+
+On SQLite the searchable text columns are mirrored into FTS5 virtual tables
+(created by migration 0005 and kept in sync by the signals in signals.py), and
+list searches become a single indexed MATCH instead of a chain of LIKE scans.
+Other database backends fall back to the old icontains lookups.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+INVENTORY_FTS_TABLE = "inventory_management_inventoryitem_fts"
+EQUIPMENT_FTS_TABLE = "inventory_management_equipment_fts"
+
+INVENTORY_SEARCH_FIELDS = ("name", "brand", "sku", "barcode", "description")
+EQUIPMENT_SEARCH_FIELDS = ("name", "brand", "model_number", "serial_number", "location")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_fts5_support = {}
+
+
+def fts_enabled(conn=None):
+    """Check if the connection is SQLite with the FTS5 extension compiled in"""
+    conn = conn or connection
+    if conn.vendor != "sqlite":
+        return False
+
+    if conn.alias not in _fts5_support:
+        with conn.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            options = {row[0] for row in cursor.fetchall()}
+        _fts5_support[conn.alias] = "ENABLE_FTS5" in options
+
+    return _fts5_support[conn.alias]
+
+
+def build_match_query(text):
+    """
+    Turn free text into an FTS5 query: every word must match as a prefix,
+    so "whey 2k" finds "Whey Protein 2kg" and "SUP-00" finds "SUP-001".
+    """
+    tokens = _TOKEN_RE.findall(text or "")
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _search(queryset, text, table, fields):
+    match = build_match_query(text)
+    if not match:
+        return queryset
+
+    if fts_enabled():
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match])
+        )
+
+    # Fallback for databases without FTS5
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f"{field}__icontains": text})
+    return queryset.filter(condition)
+
+
+def search_inventory_items(queryset, text):
+    """Filter an InventoryItem queryset by free-text search"""
+    return _search(queryset, text, INVENTORY_FTS_TABLE, INVENTORY_SEARCH_FIELDS)
+
+
+def search_equipment(queryset, text):
+    """Filter an Equipment queryset by free-text search"""
+    return _search(queryset, text, EQUIPMENT_FTS_TABLE, EQUIPMENT_SEARCH_FIELDS)
+
+
+def _index_rows(table, fields, rows):
+    """Replace the index rows for (id, *fields) tuples"""
+    if not rows or not fts_enabled():
+        return
+
+    columns = ", ".join(fields)
+    placeholders = ", ".join(["%s"] * (len(fields) + 1))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {table} WHERE rowid = %s", [(row[0],) for row in rows]
+        )
+        cursor.executemany(
+            f"INSERT INTO {table} (rowid, {columns}) VALUES ({placeholders})",
+            [[value or "" for value in row] for row in rows],
+        )
+
+
+def _unindex(table, object_id):
+    if not fts_enabled():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [object_id])
+
+
+def index_inventory_items(items):
+    """Add or refresh InventoryItem instances in the search index"""
+    _index_rows(
+        INVENTORY_FTS_TABLE,
+        INVENTORY_SEARCH_FIELDS,
+        [
+            (item.id, *(getattr(item, field) for field in INVENTORY_SEARCH_FIELDS))
+            for item in items
+        ],
+    )
+
+
+def index_equipment(equipment_items):
+    """Add or refresh Equipment instances in the search index"""
+    _index_rows(
+        EQUIPMENT_FTS_TABLE,
+        EQUIPMENT_SEARCH_FIELDS,
+        [
+            (equipment.id, *(getattr(equipment, field) for field in EQUIPMENT_SEARCH_FIELDS))
+            for equipment in equipment_items
+        ],
+    )
+
+
+def unindex_inventory_item(item_id):
+    _unindex(INVENTORY_FTS_TABLE, item_id)
+
+
+def unindex_equipment(equipment_id):
+    _unindex(EQUIPMENT_FTS_TABLE, equipment_id)
+
+
+def rebuild_search_index():
+    """
+    Rebuild both FTS tables from scratch. Needed after writes that bypass
+    signals (queryset.update(), bulk_create, raw SQL).
+    """
+    from .models import Equipment, InventoryItem
+
+    if not fts_enabled():
+        return 0, 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {INVENTORY_FTS_TABLE}")
+        cursor.execute(f"DELETE FROM {EQUIPMENT_FTS_TABLE}")
+
+    inventory_rows = list(InventoryItem.objects.values_list("id", *INVENTORY_SEARCH_FIELDS))
+    equipment_rows = list(Equipment.objects.values_list("id", *EQUIPMENT_SEARCH_FIELDS))
+    _index_rows(INVENTORY_FTS_TABLE, INVENTORY_SEARCH_FIELDS, inventory_rows)
+    _index_rows(EQUIPMENT_FTS_TABLE, EQUIPMENT_SEARCH_FIELDS, equipment_rows)
+
+    return len(inventory_rows), len(equipment_rows)
@@ -1,9 +1,13 @@
+import threading
+
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from datetime import date, timedelta
 from decimal import Decimal
-from .models import InventoryItem, Equipment, StockTransaction, StockAlert, MaintenanceRecord
+from .models import InventoryItem, Equipment, StockTransaction, StockAlert, StockAlertRemoval, MaintenanceRecord, InventoryForecast
+from . import alert_stream, barcode_index, equipment_reports, reliability, reports, search
 
 
 @receiver(post_save, sender=InventoryItem)
@@ -12,13 +16,6 @@ def generate_inventory_alerts(sender, instance, created, **kwargs):
     print(f"🔍 Auto-checking alerts for: {instance.name}")
     
     try:
-        # Clear existing alerts for this item to avoid duplicates
-        StockAlert.objects.filter(
-            inventory_item=instance,
-            is_resolved=False,
-            alert_type__in=['low_stock', 'reorder_needed']
-        ).delete()
-        
         # Convert float constants to Decimal for proper arithmetic
         HALF = Decimal('0.5')
         ZERO = Decimal('0')
@@ -43,102 +40,175 @@ def generate_inventory_alerts(sender, instance, created, **kwargs):
                 title = f'Low Stock: {instance.name}'
                 message = f'{instance.name} is below minimum stock level. Current: {current_stock} {instance.unit}, Minimum: {minimum_stock} {instance.unit}.'
             
-            alert = StockAlert.objects.create(
-                alert_type='low_stock',
-                priority=priority,
-                inventory_item=instance,
-                title=title,
-                message=message
-            )
-            print(f"✅ Created LOW STOCK alert: {alert.title}")
+            sync_item_alert(instance, 'low_stock', priority=priority, title=title, message=message)
+        else:
+            sync_item_alert(instance, 'low_stock', None)
         
         # 2. REORDER ALERT (if auto_reorder is enabled)
         if instance.auto_reorder and instance.is_low_stock:
-            StockAlert.objects.create(
-                alert_type='reorder_needed',
-                priority='medium',
-                inventory_item=instance,
-                title=f'Reorder Required: {instance.name}',
-                message=f'{instance.name} needs restocking. Suggested reorder quantity: {instance.reorder_quantity} {instance.unit}. Contact vendor: {instance.primary_vendor.name if instance.primary_vendor else "Not specified"}.'
+            message = f'{instance.name} needs restocking. Suggested reorder quantity: {instance.reorder_quantity} {instance.unit}. Contact vendor: {instance.primary_vendor.name if instance.primary_vendor else "Not specified"}.'
+            
+            # Add the nightly forecast if there is one
+            forecast = InventoryForecast.objects.filter(item=instance, daily_consumption__gt=0).first()
+            if forecast:
+                days_left = current_stock / forecast.daily_consumption
+                message += f' At {forecast.daily_consumption.normalize()} {instance.unit}/day it runs out in {days_left:.0f} days.'
+            
+            sync_item_alert(
+                instance, 'reorder_needed',
+                priority='medium', title=f'Reorder Required: {instance.name}', message=message
             )
-            print(f"✅ Created REORDER alert for: {instance.name}")
+        else:
+            sync_item_alert(instance, 'reorder_needed', None)
     
     except Exception as e:
         print(f"❌ Error in generate_inventory_alerts: {str(e)}")
         # Don't re-raise to avoid breaking the transaction
 
 
+def sync_item_alert(item, alert_type, priority=None, **fields):
+    """The item's open alert of the type with these details, or none when `priority` is None"""
+    open_alerts = StockAlert.objects.filter(inventory_item=item, alert_type=alert_type, is_resolved=False)
+    alert = None
+    if priority is not None:
+        alert = StockAlert(alert_type=alert_type, inventory_item=item, priority=priority, **fields)
+    sync_open_alert(open_alerts, alert)
+
+
+def sync_open_alert(open_alerts, alert):
+    """
+    Make `open_alerts` (one object's open alerts of one type) hold exactly
+    the unsaved `alert`, or nothing when it is None. An existing alert is
+    updated in place rather than replaced, so its id stays the same across
+    saves and live alert clients see an update instead of a new alert.
+    """
+    if alert is None:
+        open_alerts.delete()
+        return
+
+    current = open_alerts.order_by('created_at').first()
+    if current is None:
+        alert.save()
+        print(f"✅ Created {alert.get_alert_type_display()} alert: {alert.title}")
+        return
+
+    # Left over from before alerts were kept in place
+    open_alerts.exclude(id=current.id).delete()
+    changed = [field for field in ('priority', 'title', 'message') if getattr(current, field) != getattr(alert, field)]
+    if changed:
+        for field in changed:
+            setattr(current, field, getattr(alert, field))
+        current.save(update_fields=changed + ['updated_at'])
+
+
+# Equipment fields the maintenance/warranty alerts are derived from
+EQUIPMENT_ALERT_FIELDS = (
+    "name",
+    "next_maintenance_date",
+    "warranty_start_date",
+    "warranty_period_months",
+    "warranty_end_date",
+)
+
+_pending_equipment_alerts = threading.local()
+
+
+def refresh_equipment_alerts_on_commit(equipment):
+    """Recompute the equipment's alerts once after commit, however many saves ask for it"""
+    pending = _pending_equipment_alerts.__dict__.setdefault("equipment", {})
+    pending[equipment.pk] = equipment
+
+    def refresh():
+        instance = pending.pop(equipment.pk, None)
+        if instance is not None:
+            generate_equipment_alerts(sender=Equipment, instance=instance, created=False)
+
+    transaction.on_commit(refresh)
+
+
 @receiver(post_save, sender=Equipment)
-def generate_equipment_alerts(sender, instance, created, **kwargs):
+def generate_equipment_alerts(sender, instance, created, update_fields=None, **kwargs):
     """Automatically generate alerts for equipment"""
+    # Partial saves (maintenance status changes) are coalesced into one refresh on commit
+    if update_fields is not None:
+        if _touches_fields(update_fields, EQUIPMENT_ALERT_FIELDS):
+            refresh_equipment_alerts_on_commit(instance)
+        return
+
     print(f"🔍 Auto-checking equipment alerts for: {instance.name}")
     
     try:
-        # Clear existing alerts for this equipment
-        StockAlert.objects.filter(
-            equipment=instance,
-            is_resolved=False,
-            alert_type__in=['maintenance_due', 'warranty_expiring']
-        ).delete()
+        alerts = {alert.alert_type: alert for alert in build_equipment_alerts(instance)}
+        for alert_type in ('maintenance_due', 'warranty_expiring'):
+            open_alerts = StockAlert.objects.filter(equipment=instance, alert_type=alert_type, is_resolved=False)
+            sync_open_alert(open_alerts, alerts.get(alert_type))
+    
+    except Exception as e:
+        print(f"❌ Error in generate_equipment_alerts: {str(e)}")
+        # Don't re-raise to avoid breaking the transaction
+
+
+def build_equipment_alerts(instance, today=None):
+    """Unsaved maintenance-due and warranty-expiring alerts for the equipment"""
+    today = today or date.today()
+    alerts = []
+    
+    # 1. MAINTENANCE DUE ALERT
+    if instance.next_maintenance_date:
+        days_until_maintenance = (instance.next_maintenance_date - today).days
         
-        # 1. MAINTENANCE DUE ALERT
-        if instance.next_maintenance_date:
-            days_until_maintenance = (instance.next_maintenance_date - date.today()).days
+        # Create alert if maintenance is due within 7 days or overdue
+        if days_until_maintenance <= 7:
+            if days_until_maintenance < 0:  # Overdue
+                priority = 'critical'
+                title = f'MAINTENANCE OVERDUE: {instance.name}'
+                message = f'{instance.name} maintenance is {abs(days_until_maintenance)} days overdue! Immediate attention required.'
+            elif days_until_maintenance == 0:  # Due today
+                priority = 'critical'
+                title = f'MAINTENANCE DUE TODAY: {instance.name}'
+                message = f'{instance.name} maintenance is due today. Please schedule immediately.'
+            else:  # Due within 7 days
+                priority = 'high' if days_until_maintenance <= 3 else 'medium'
+                title = f'Maintenance Due Soon: {instance.name}'
+                message = f'{instance.name} maintenance is due in {days_until_maintenance} day(s) on {instance.next_maintenance_date}.'
             
-            # Create alert if maintenance is due within 7 days or overdue
-            if days_until_maintenance <= 7:
-                if days_until_maintenance < 0:  # Overdue
-                    priority = 'critical'
-                    title = f'MAINTENANCE OVERDUE: {instance.name}'
-                    message = f'{instance.name} maintenance is {abs(days_until_maintenance)} days overdue! Immediate attention required.'
-                elif days_until_maintenance == 0:  # Due today
-                    priority = 'critical'
-                    title = f'MAINTENANCE DUE TODAY: {instance.name}'
-                    message = f'{instance.name} maintenance is due today. Please schedule immediately.'
-                else:  # Due within 7 days
-                    priority = 'high' if days_until_maintenance <= 3 else 'medium'
-                    title = f'Maintenance Due Soon: {instance.name}'
-                    message = f'{instance.name} maintenance is due in {days_until_maintenance} day(s) on {instance.next_maintenance_date}.'
-                
-                alert = StockAlert.objects.create(
-                    alert_type='maintenance_due',
-                    priority=priority,
-                    equipment=instance,
-                    title=title,
-                    message=message
-                )
-                print(f"✅ Created MAINTENANCE alert: {alert.title}")
+            alerts.append(StockAlert(
+                alert_type='maintenance_due',
+                priority=priority,
+                equipment=instance,
+                gym_id=instance.gym_id,
+                title=title,
+                message=message
+            ))
+    
+    # 2. WARRANTY EXPIRING ALERT
+    if instance.warranty_end_date:
+        days_remaining = (instance.warranty_end_date - today).days
         
-        # 2. WARRANTY EXPIRING ALERT
-        if instance.warranty_end_date:
-            days_remaining = (instance.warranty_end_date - date.today()).days
+        # Create alert if warranty expires within 30 days
+        if 0 <= days_remaining <= 30:
+            if days_remaining <= 7:
+                priority = 'critical'
+                title = f'WARRANTY EXPIRING SOON: {instance.name}'
+            elif days_remaining <= 15:
+                priority = 'high'
+                title = f'Warranty Expiring: {instance.name}'
+            else:
+                priority = 'medium'
+                title = f'Warranty Alert: {instance.name}'
+            
+            message = f'Warranty for {instance.name} expires in {days_remaining} day(s) on {instance.warranty_end_date}. Consider renewal or replacement.'
             
-            # Create alert if warranty expires within 30 days
-            if 0 <= days_remaining <= 30:
-                if days_remaining <= 7:
-                    priority = 'critical'
-                    title = f'WARRANTY EXPIRING SOON: {instance.name}'
-                elif days_remaining <= 15:
-                    priority = 'high'
-                    title = f'Warranty Expiring: {instance.name}'
-                else:
-                    priority = 'medium'
-                    title = f'Warranty Alert: {instance.name}'
-                
-                message = f'Warranty for {instance.name} expires in {days_remaining} day(s) on {instance.warranty_end_date}. Consider renewal or replacement.'
-                
-                alert = StockAlert.objects.create(
-                    alert_type='warranty_expiring',
-                    priority=priority,
-                    equipment=instance,
-                    title=title,
-                    message=message
-                )
-                print(f"✅ Created WARRANTY alert: {alert.title}")
+            alerts.append(StockAlert(
+                alert_type='warranty_expiring',
+                priority=priority,
+                equipment=instance,
+                gym_id=instance.gym_id,
+                title=title,
+                message=message
+            ))
     
-    except Exception as e:
-        print(f"❌ Error in generate_equipment_alerts: {str(e)}")
-        # Don't re-raise to avoid breaking the transaction
+    return alerts
 
 
 @receiver(post_save, sender=StockTransaction)
@@ -161,8 +231,11 @@ def handle_stock_transaction_alerts(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=MaintenanceRecord)
-def handle_maintenance_completion(sender, instance, created, **kwargs):
+def handle_maintenance_completion(sender, instance, created, update_fields=None, **kwargs):
     """Handle maintenance record updates"""
+    if not _touches_fields(update_fields, ["status"]):
+        return
+
     try:
         if instance.status == 'completed':
             # Resolve maintenance alerts for this equipment
@@ -173,7 +246,8 @@ def handle_maintenance_completion(sender, instance, created, **kwargs):
             ).update(
                 is_resolved=True,
                 resolved_at=timezone.now(),
-                resolved_by=instance.created_by
+                resolved_by=instance.created_by,
+                updated_at=timezone.now()
             )
             
             if resolved_count > 0:
@@ -181,4 +255,119 @@ def handle_maintenance_completion(sender, instance, created, **kwargs):
     
     except Exception as e:
         print(f"❌ Error in handle_maintenance_completion: {str(e)}")
-        # Don't re-raise to avoid breaking the transaction
\ No newline at end of file
+        # Don't re-raise to avoid breaking the transaction
+
+
+def _touches_fields(update_fields, fields):
+    """True unless the save was restricted to fields outside `fields`"""
+    return update_fields is None or bool(set(update_fields) & set(fields))
+
+
+@receiver(post_save, sender=InventoryItem)
+def update_inventory_search_index(sender, instance, update_fields=None, **kwargs):
+    """Keep the full-text index in sync with inventory item text fields"""
+    # Stock movements save with update_fields=['current_stock'] - nothing to reindex
+    if not _touches_fields(update_fields, search.INVENTORY_SEARCH_FIELDS):
+        return
+
+    try:
+        search.index_inventory_items([instance])
+    except Exception as e:
+        print(f"❌ Error in update_inventory_search_index: {str(e)}")
+
+
+@receiver(post_delete, sender=InventoryItem)
+def remove_inventory_search_index(sender, instance, **kwargs):
+    try:
+        search.unindex_inventory_item(instance.id)
+    except Exception as e:
+        print(f"❌ Error in remove_inventory_search_index: {str(e)}")
+
+
+@receiver(post_save, sender=Equipment)
+def update_equipment_search_index(sender, instance, update_fields=None, **kwargs):
+    """Keep the full-text index in sync with equipment text fields"""
+    if not _touches_fields(update_fields, search.EQUIPMENT_SEARCH_FIELDS):
+        return
+
+    try:
+        search.index_equipment([instance])
+    except Exception as e:
+        print(f"❌ Error in update_equipment_search_index: {str(e)}")
+
+
+@receiver(post_delete, sender=Equipment)
+def remove_equipment_search_index(sender, instance, **kwargs):
+    try:
+        search.unindex_equipment(instance.id)
+    except Exception as e:
+        print(f"❌ Error in remove_equipment_search_index: {str(e)}")
+
+
+@receiver(post_save, sender=InventoryItem)
+def update_barcode_index(sender, instance, **kwargs):
+    """Keep the point-of-sale barcode index current (stock and price included)"""
+    try:
+        barcode_index.update_item(instance)
+    except Exception as e:
+        print(f"❌ Error in update_barcode_index: {str(e)}")
+
+
+@receiver(post_delete, sender=InventoryItem)
+def remove_from_barcode_index(sender, instance, **kwargs):
+    try:
+        barcode_index.remove_item(instance.id)
+    except Exception as e:
+        print(f"❌ Error in remove_from_barcode_index: {str(e)}")
+
+
+@receiver(post_save, sender=StockTransaction)
+@receiver(post_save, sender=InventoryItem)
+@receiver(post_delete, sender=InventoryItem)
+def invalidate_inventory_report(sender, instance, **kwargs):
+    """Cached inventory reports of the gym are stale once stock or items change"""
+    gym_id = instance.item.gym_id if sender is StockTransaction else instance.gym_id
+    transaction.on_commit(lambda: reports.invalidate_inventory_report(gym_id))
+
+
+@receiver(post_save, sender=MaintenanceRecord)
+@receiver(post_delete, sender=MaintenanceRecord)
+def invalidate_maintenance_costs(sender, instance, **kwargs):
+    """A completed record changes the cached cost totals of its month and the reliability figures"""
+    if not instance.actual_date:
+        return
+
+    try:
+        gym_id = instance.equipment.gym_id
+    except Equipment.DoesNotExist:
+        # Deleted along with its equipment - nothing left to report on
+        return
+    transaction.on_commit(
+        lambda: equipment_reports.invalidate_maintenance_month(gym_id, instance.actual_date)
+    )
+    transaction.on_commit(lambda: reliability.invalidate_reliability(gym_id))
+
+
+@receiver(post_save, sender=StockAlert)
+def publish_alert_saved(sender, instance, created, **kwargs):
+    """Push the change to live alert streams once it is committed"""
+    if created:
+        event = 'created'
+    elif instance.is_resolved:
+        event = 'resolved'
+    else:
+        event = 'updated'
+    gym_id, data = instance.gym_id, alert_stream.serialize_alert(instance)
+    transaction.on_commit(lambda: alert_stream.publish(gym_id, event, data))
+
+
+@receiver(post_delete, sender=StockAlert)
+def publish_alert_removed(sender, instance, **kwargs):
+    # Resolved alerts were already announced; deleting them (archival) is not news
+    if instance.is_resolved:
+        return
+    # Other worker processes' streams learn about it from the database
+    StockAlertRemoval.objects.create(alert_id=instance.id, gym_id=instance.gym_id)
+    # Serialize now - the instance loses its id once the delete completes
+    gym_id, data = instance.gym_id, alert_stream.serialize_alert(instance)
+    transaction.on_commit(lambda: alert_stream.publish(gym_id, 'removed', data))
@@ -0,0 +1,99 @@
+# inventory_management/stock.py
+"""
+Batched stock movements.
+
+StockTransaction.save() handles one movement at a time: it refreshes the
+item, writes the ledger row, saves the item and re-runs the alert signals.
+record_stock_movements() applies many movements with the same stock rules
+in a fixed number of queries, then re-evaluates alerts once per item after
+the transaction commits.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import InventoryItem, StockTransaction
+
+
+INCOMING_TYPES = StockTransaction.INCOMING_TYPES
+
+LEDGER_FIELDS = ["reference_number", "vendor_id", "expiry_date", "batch_number", "notes"]
+
+
+def _refresh_derived_state(items):
+    """Alerts, the barcode index and cached reports - what the save signals would do"""
+    from . import barcode_index, reports
+    from .signals import generate_inventory_alerts
+
+    for item in items:
+        generate_inventory_alerts(sender=InventoryItem, instance=item, created=False)
+        barcode_index.update_item(item)
+
+    for gym_id in {item.gym_id for item in items}:
+        reports.invalidate_inventory_report(gym_id)
+
+
+def record_stock_movements(movements, user=None):
+    """
+    Apply a batch of stock movements atomically.
+
+    Each movement is a dict with item_id, transaction_type, quantity and
+    optionally unit_price plus any of LEDGER_FIELDS. Items are locked in id
+    order so concurrent batches touching the same items cannot deadlock.
+    Outgoing movements larger than the available stock raise ValueError and
+    roll the whole batch back. Returns the created StockTransactions.
+    """
+    if not movements:
+        return []
+
+    item_ids = sorted({movement["item_id"] for movement in movements})
+    now = timezone.now()
+
+    with transaction.atomic():
+        items = {
+            item.id: item
+            for item in InventoryItem.objects.select_for_update().filter(id__in=item_ids).order_by("id")
+        }
+        missing = set(item_ids) - set(items)
+        if missing:
+            raise ValueError(f"Inventory items not found: {sorted(missing)}")
+
+        ledger = []
+        for movement in movements:
+            item = items[movement["item_id"]]
+            quantity = Decimal(str(movement["quantity"]))
+            unit_price = Decimal(str(movement.get("unit_price") or 0))
+            if quantity <= 0:
+                raise ValueError(f"Quantity for {item.name} must be greater than zero")
+
+            stock_before = Decimal(str(item.current_stock))
+            if movement["transaction_type"] in INCOMING_TYPES:
+                stock_after = stock_before + quantity
+            else:
+                if quantity > stock_before:
+                    raise ValueError(f"Insufficient stock for {item.name}! Available: {stock_before} {item.unit}")
+                stock_after = stock_before - quantity
+
+            item.current_stock = stock_after
+            item.updated_at = now
+            ledger.append(StockTransaction(
+                item=item,
+                transaction_type=movement["transaction_type"],
+                quantity=quantity,
+                unit_price=unit_price,
+                total_amount=quantity * unit_price,
+                stock_before=stock_before,
+                stock_after=stock_after,
+                transaction_date=now,
+                created_by=user,
+                **{field: movement[field] for field in LEDGER_FIELDS if movement.get(field) is not None},
+            ))
+
+        StockTransaction.objects.bulk_create(ledger)
+        InventoryItem.objects.bulk_update(items.values(), ["current_stock", "updated_at"])
+
+        changed_items = list(items.values())
+        transaction.on_commit(lambda: _refresh_derived_state(changed_items))
+
+    return ledger
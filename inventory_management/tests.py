@@ -1,3 +1,323 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from multiple_gym.models import Gym
+from . import alert_stream, equipment_import, labels, purchasing, reports, search
+from .models import Equipment, EquipmentCategory, InventoryCategory, InventoryItem, StockAlert, StockTransaction
+from .transfers import transfer_stock
+
+User = get_user_model()
+
+# Never the file cache the worker processes share
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class InventoryTestCase(TestCase):
+    """Two gyms, a superadmin and a supplements category"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('root', password='x', user_type='superadmin')
+        cls.gym = Gym.objects.create(name='Main', address='a', phone='1', email='main@example.com', created_by=cls.admin)
+        cls.other_gym = Gym.objects.create(name='Branch', address='a', phone='1', email='branch@example.com', created_by=cls.admin)
+        cls.category = InventoryCategory.objects.create(name='Supplements')
+
+    def setUp(self):
+        cache.clear()
+
+    def make_item(self, name, gym=None, **fields):
+        defaults = {
+            'category': self.category,
+            'current_stock': 10,
+            'minimum_stock': 2,
+            'cost_price': Decimal('100'),
+            'selling_price': Decimal('150'),
+        }
+        defaults.update(fields)
+        return InventoryItem.objects.create(name=name, gym=gym or self.gym, **defaults)
+
+
+class StockTransferTests(InventoryTestCase):
+
+    def test_transfer_moves_stock_and_creates_destination_item(self):
+        source = self.make_item('Whey', sku='WHEY-1')
+
+        reference, ledger = transfer_stock(self.gym.id, self.other_gym.id, [(source.id, 4)], user=self.admin)
+
+        source.refresh_from_db()
+        destination = InventoryItem.objects.get(gym=self.other_gym, name='Whey')
+        self.assertEqual(source.current_stock, 6)
+        self.assertEqual(destination.current_stock, 4)
+        self.assertEqual(destination.sku, f'WHEY-1-G{self.other_gym.id}')
+        self.assertEqual(len(ledger), 2)
+        self.assertEqual(
+            set(StockTransaction.objects.filter(reference_number=reference).values_list('transaction_type', flat=True)),
+            {'transfer', 'transfer_in'},
+        )
+
+    def test_insufficient_stock_changes_nothing(self):
+        source = self.make_item('Creatine', sku='CRE-1', current_stock=3)
+
+        with self.assertRaises(ValueError):
+            transfer_stock(self.gym.id, self.other_gym.id, [(source.id, 5)], user=self.admin)
+
+        source.refresh_from_db()
+        self.assertEqual(source.current_stock, 3)
+        self.assertFalse(InventoryItem.objects.filter(gym=self.other_gym).exists())
+
+    def test_blank_sku_source_gets_unique_destination_sku(self):
+        # Blank counts as a value for the unique SKU: copying it would clash with the source itself
+        source = self.make_item('Shaker', sku='')
+
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            reverse('inventory:stock_transfer', args=[self.gym.id]),
+            {'to_gym': self.other_gym.id, f'quantity_{source.id}': '1'},
+        )
+
+        self.assertRedirects(response, reverse('inventory:inventory_list', args=[self.gym.id]), fetch_redirect_response=False)
+        destination = InventoryItem.objects.get(gym=self.other_gym, name='Shaker')
+        self.assertEqual(destination.sku, f'G{self.other_gym.id}-{source.id}')
+        self.assertEqual(destination.current_stock, 1)
+
+    def test_duplicate_sku_is_reported_not_raised(self):
+        source = self.make_item('Gloves', sku='GLV')
+        # Some other item already took the SKU the destination would get
+        self.make_item('Old Gloves', gym=self.other_gym, sku=f'GLV-G{self.other_gym.id}')
+
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            reverse('inventory:stock_transfer', args=[self.gym.id]),
+            {'to_gym': self.other_gym.id, f'quantity_{source.id}': '1'},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('duplicate SKU', ' '.join(str(message) for message in get_messages(response.wsgi_request)))
+        source.refresh_from_db()
+        self.assertEqual(source.current_stock, 10)
+
+
+class InventoryAlertTests(InventoryTestCase):
+
+    def low_stock_alerts(self, item):
+        return StockAlert.objects.filter(inventory_item=item, alert_type='low_stock', is_resolved=False)
+
+    def test_stock_movements_update_the_open_alert_in_place(self):
+        item = self.make_item('Bars', sku='BAR-1', current_stock=1, minimum_stock=5)
+        alert = self.low_stock_alerts(item).get()
+        since = timezone.now()
+
+        item.current_stock = 2
+        item.save()
+
+        updated = self.low_stock_alerts(item).get()
+        self.assertEqual(updated.id, alert.id)
+        self.assertIn('Current: 2', updated.message)
+        # Polling clients see the same alert updated, not a new one
+        events = alert_stream.events_since(self.gym.id, since + alert_stream.CURSOR_OVERLAP)
+        self.assertEqual([(event['event'], event['alert']['id']) for event in events], [('updated', alert.id)])
+
+    def test_restocking_clears_the_alert(self):
+        item = self.make_item('Bars', sku='BAR-1', current_stock=1, minimum_stock=5)
+
+        item.current_stock = 20
+        item.save()
+
+        self.assertFalse(self.low_stock_alerts(item).exists())
+
+    def test_polling_reports_bulk_resolves_and_removals(self):
+        resolved = self.make_item('Bars', sku='BAR-1', current_stock=1, minimum_stock=5)
+        restocked = self.make_item('Shakes', sku='SHK-1', current_stock=1, minimum_stock=5)
+        alert_id = self.low_stock_alerts(restocked).get().id
+        since = timezone.now() + alert_stream.CURSOR_OVERLAP
+
+        now = timezone.now()
+        self.low_stock_alerts(resolved).update(is_resolved=True, resolved_at=now, updated_at=now)
+        restocked.current_stock = 20
+        restocked.save()
+
+        events = alert_stream.events_since(self.gym.id, since)
+        self.assertEqual(
+            [(event['event'], event['alert']['id']) for event in events],
+            [('resolved', StockAlert.objects.get(inventory_item=resolved).id), ('removed', alert_id)],
+        )
+        self.assertEqual(alert_stream.events_since(self.other_gym.id, since), [])
+
+    def test_polling_asks_for_a_refresh_after_too_many_changes(self):
+        since = timezone.now()
+        self.make_item('Bars', sku='BAR-1', current_stock=1, minimum_stock=5)
+        self.make_item('Shakes', sku='SHK-1', current_stock=1, minimum_stock=5)
+
+        with mock.patch.object(alert_stream, 'MAX_EVENTS', 1):
+            events = alert_stream.events_since(self.gym.id, since)
+        self.assertEqual([event['event'] for event in events], ['refresh'])
+
+
+class EquipmentLabelJobTests(SimpleTestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_job_state_is_read_back_from_storage(self):
+        requested_at = timezone.now().replace(microsecond=0)
+        labels._set_job(7, status='queued', requested_at=requested_at, file=None)
+        labels._set_job(7, status='ready', requested_at=requested_at, file='labels.pdf', count=3)
+
+        job = labels.label_job(7)
+        self.assertEqual(job['status'], 'ready')
+        self.assertEqual(job['requested_at'], requested_at)
+        self.assertEqual(job['count'], 3)
+        self.assertIsNone(labels.label_job(8))
+
+
+class InventoryReportTests(InventoryTestCase):
+
+    def test_overstock_share_of_value_and_invalidation(self):
+        # 20 on hand against a maximum of 15: 5 x 100 of 2000 is overstock
+        item = self.make_item('Mats', sku='MAT-1', current_stock=20, maximum_stock=15)
+        today = timezone.localdate()
+
+        report = reports.get_inventory_report(self.gym.id, today, today)
+        self.assertAlmostEqual(report['overstock_pct'], 25.0)
+        self.assertEqual(reports.get_inventory_report(self.gym.id, today, today)['generated_at'], report['generated_at'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            item.current_stock = 10
+            item.save()
+
+        report = reports.get_inventory_report(self.gym.id, today, today)
+        self.assertEqual(report['overstock_pct'], 0)
+
+
+class InventorySearchTests(InventoryTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.whey = self.make_item('Whey Protein 2kg', sku='SUP-001', brand='Optimum')
+        self.creatine = self.make_item('Creatine Monohydrate', sku='SUP-120', brand='MuscleTech')
+
+    def search(self, text):
+        return set(search.search_inventory_items(InventoryItem.objects.all(), text))
+
+    def test_every_word_matches_as_a_prefix(self):
+        self.assertTrue(search.fts_enabled())
+        self.assertEqual(self.search('whey 2k'), {self.whey})
+        self.assertEqual(self.search('SUP-00'), {self.whey})
+        self.assertEqual(self.search('sup'), {self.whey, self.creatine})
+
+    def test_index_follows_edits_and_deletes(self):
+        self.whey.name = 'Isolate 1kg'
+        self.whey.save()
+        self.assertEqual(self.search('whey'), set())
+        self.assertEqual(self.search('isolate'), {self.whey})
+
+        self.creatine.delete()
+        self.assertEqual(self.search('creatine'), set())
+
+    def test_falls_back_to_icontains_without_fts5(self):
+        with mock.patch.dict(search._fts5_support, {connection.alias: False}):
+            self.assertEqual(self.search('protein'), {self.whey})
+            self.assertEqual(self.search('muscletech'), {self.creatine})
+            self.assertEqual(self.search('   '), {self.whey, self.creatine})
+
+
+class PurchaseOrderReceivingTests(InventoryTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.bands = self.make_item('Bands', sku='BND-1', current_stock=1, minimum_stock=5, auto_reorder=True, reorder_quantity=20)
+        self.chalk = self.make_item('Chalk', sku='CHK-1', current_stock=0, minimum_stock=3, maximum_stock=12, auto_reorder=True)
+        [self.order] = purchasing.generate_purchase_orders(self.gym.id, user=self.admin)
+
+    def test_generation_orders_each_low_item_once(self):
+        quantities = dict(self.order.lines.values_list('item__name', 'quantity'))
+        self.assertEqual(quantities, {'Bands': Decimal('20'), 'Chalk': Decimal('12')})
+        self.assertEqual(self.order.total_amount, Decimal('3200'))
+        # Both items are on an open order now
+        self.assertEqual(purchasing.generate_purchase_orders(self.gym.id), [])
+
+    def test_receiving_books_the_delivered_quantities(self):
+        chalk_line = self.order.lines.get(item=self.chalk)
+
+        order = purchasing.receive_purchase_order(self.order, user=self.admin, received_quantities={chalk_line.id: 0})
+
+        self.bands.refresh_from_db()
+        self.chalk.refresh_from_db()
+        self.assertEqual(order.status, 'received')
+        self.assertEqual(self.bands.current_stock, 21)
+        self.assertEqual(self.chalk.current_stock, 0)
+        self.assertEqual(
+            list(StockTransaction.objects.filter(reference_number=order.po_number).values_list('item__name', 'quantity')),
+            [('Bands', Decimal('20'))],
+        )
+
+    def test_an_order_is_received_only_once(self):
+        purchasing.receive_purchase_order(self.order, user=self.admin)
+
+        with self.assertRaises(ValueError):
+            purchasing.receive_purchase_order(self.order, user=self.admin)
+        self.bands.refresh_from_db()
+        self.assertEqual(self.bands.current_stock, 21)
+
+
+class EquipmentImportTests(InventoryTestCase):
+
+    HEADER = 'Name,Category,Brand,Serial Number,Purchase Date,Purchase Price,Location,Warranty Period Months\n'
+
+    def setUp(self):
+        super().setUp()
+        self.cardio = EquipmentCategory.objects.create(gym=self.gym, name='Cardio')
+
+    def run_import(self, rows, **options):
+        return equipment_import.import_equipment(self.gym, io.StringIO(self.HEADER + rows), user=self.admin, **options)
+
+    def test_dry_run_validates_without_writing(self):
+        report = self.run_import('Treadmill,cardio,Life,TM-1,2024-01-15,1500.00,Floor 1,12\n')
+
+        self.assertEqual((report['total_rows'], report['valid_rows'], report['created']), (1, 1, 0))
+        self.assertFalse(Equipment.objects.exists())
+
+    def test_invalid_rows_are_reported_and_the_rest_imported(self):
+        report = self.run_import(
+            'Treadmill,Cardio,Life,TM-1,2024-01-15,1500.00,Floor 1,12\n'
+            'Bike,Cardio,Life,TM-1,2024-01-15,900.00,Floor 1,12\n'
+            'Rack,Strength,Rogue,RK-1,2024-01-15,700.00,Floor 2,\n'
+            'Rower,Cardio,Concept2,RW-1,not a date,800.00,Floor 1,\n',
+            dry_run=False,
+        )
+
+        self.assertEqual(report['created'], 1)
+        self.assertEqual([error['line'] for error in report['errors']], [3, 4, 5])
+        equipment = Equipment.objects.get()
+        self.assertEqual((equipment.serial_number, equipment.category), ('TM-1', self.cardio))
+        self.assertEqual(equipment.warranty_end_date, date(2025, 1, 15))
+        self.assertEqual(search.search_equipment(Equipment.objects.all(), 'treadmill').get(), equipment)
+
+    def test_missing_categories_can_be_created(self):
+        report = self.run_import('Rack,Strength,Rogue,RK-1,2024-01-15,700.00,Floor 2,\n', dry_run=False, create_categories=True)
+
+        self.assertEqual(report['new_categories'], ['Strength'])
+        self.assertEqual(Equipment.objects.get().category.name, 'Strength')
+
+    def test_missing_columns_reject_the_file(self):
+        report = equipment_import.import_equipment(self.gym, io.StringIO('name,brand\nTreadmill,Life\n'), dry_run=False)
+
+        self.assertTrue(report['file_errors'])
+        self.assertFalse(Equipment.objects.exists())
@@ -0,0 +1,141 @@
+# inventory_management/transfers.py
+"""
+Stock transfers between gyms.
+
+transfer_stock() moves any number of items from one gym to another in a
+single database transaction. Each line writes a `transfer` row on the
+source item and a `transfer_in` row on the matching destination item, both
+carrying the same TRF-... reference so the two sides reconcile. The
+destination item is the one with the same name in the target gym (names
+are unique per gym); it is created from the source item when missing.
+
+Both sides go through stock.record_stock_movements() as one batch, so all
+rows are locked in id order and alerts are re-evaluated once per item on
+commit.
+"""
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from multiple_gym.models import Gym
+from . import search
+from .models import InventoryItem
+from .stock import record_stock_movements
+
+
+# Catalog fields copied when the destination gym doesn't stock the item yet
+COPIED_FIELDS = [
+    "name",
+    "category_id",
+    "brand",
+    "description",
+    "unit",
+    "minimum_stock",
+    "maximum_stock",
+    "cost_price",
+    "selling_price",
+    "barcode",
+    "has_expiry",
+    "expiry_alert_days",
+]
+
+
+def new_transfer_reference():
+    return f"TRF-{timezone.localdate():%Y%m%d}-{uuid.uuid4().hex[:6].upper()}"
+
+
+def _destination_sku(source, to_gym_id):
+    # SKUs are globally unique, blank ones included; suffix the gym so branches stay distinguishable
+    if source.sku:
+        return f"{source.sku}-G{to_gym_id}"[:50]
+    return f"G{to_gym_id}-{source.pk}"
+
+
+def _destination_items(sources, to_gym_id, user):
+    """{source item id: destination item}, creating missing items in the target gym"""
+    existing = {
+        item.name: item
+        for item in InventoryItem.objects.filter(gym_id=to_gym_id, name__in=[s.name for s in sources])
+    }
+
+    missing = [
+        InventoryItem(
+            gym_id=to_gym_id,
+            sku=_destination_sku(source, to_gym_id),
+            current_stock=0,
+            created_by=user,
+            **{field: getattr(source, field) for field in COPIED_FIELDS},
+        )
+        for source in sources
+        if source.name not in existing
+    ]
+    if missing:
+        # bulk_create skips the save signals - alerts run once the stock has arrived
+        created = InventoryItem.objects.bulk_create(missing)
+        search.index_inventory_items(created)
+        existing.update({item.name: item for item in created})
+
+    return {source.id: existing[source.name] for source in sources}
+
+
+def transfer_stock(from_gym_id, to_gym_id, lines, user=None, notes=""):
+    """
+    Move stock between two gyms atomically.
+
+    `lines` is an iterable of (source_item_id, quantity). Quantities for the
+    same item are combined. Raises ValueError - and changes nothing - if an
+    item doesn't belong to the source gym or has insufficient stock.
+    Returns (reference, ledger rows).
+    """
+    if int(from_gym_id) == int(to_gym_id):
+        raise ValueError("Source and destination gym must be different")
+
+    quantities = OrderedDict()
+    for item_id, quantity in lines:
+        quantity = Decimal(str(quantity))
+        if quantity <= 0:
+            raise ValueError("Transfer quantities must be greater than zero")
+        quantities[int(item_id)] = quantities.get(int(item_id), Decimal("0")) + quantity
+
+    if not quantities:
+        raise ValueError("Select at least one item to transfer")
+
+    reference = new_transfer_reference()
+
+    with transaction.atomic():
+        from_gym = Gym.objects.get(id=from_gym_id)
+        to_gym = Gym.objects.get(id=to_gym_id)
+
+        sources = list(InventoryItem.objects.filter(gym_id=from_gym_id, id__in=quantities))
+        if len(sources) != len(quantities):
+            raise ValueError(f"Some items do not belong to {from_gym.name}")
+
+        destinations = _destination_items(sources, to_gym_id, user)
+
+        movements = []
+        for source in sources:
+            quantity = quantities[source.id]
+            common = {
+                "quantity": quantity,
+                "unit_price": source.cost_price,
+                "reference_number": reference,
+            }
+            movements.append({
+                "item_id": source.id,
+                "transaction_type": "transfer",
+                "notes": notes or f"Transferred to {to_gym.name}",
+                **common,
+            })
+            movements.append({
+                "item_id": destinations[source.id].id,
+                "transaction_type": "transfer_in",
+                "notes": notes or f"Transferred from {from_gym.name}",
+                **common,
+            })
+
+        ledger = record_stock_movements(movements, user=user)
+
+    return reference, ledger
@@ -12,6 +12,10 @@ urlpatterns = [
     # Equipment URLs - EDIT/DELETE ADDED
     path('equipment/<int:gym_id>/', views.equipment_list, name='equipment_list'),
     path('equipment/<int:gym_id>/add/', views.add_equipment, name='add_equipment'),
+    path('equipment/<int:gym_id>/import/', views.import_equipment_csv, name='import_equipment'),
+    path('equipment/<int:gym_id>/labels/', views.equipment_labels, name='equipment_labels'),
+    path('equipment/<int:gym_id>/labels/download/', views.download_equipment_labels, name='download_equipment_labels'),
+    path('equipment/<int:gym_id>/scan/', views.scan_equipment, name='scan_equipment'),
     path('equipment/<int:gym_id>/<int:equipment_id>/edit/', views.add_equipment, name='edit_equipment'),
     path('equipment/<int:gym_id>/<int:equipment_id>/delete/', views.delete_equipment, name='delete_equipment'),
     path('equipment/<int:gym_id>/<int:equipment_id>/', views.equipment_detail, name='equipment_detail'),
@@ -26,6 +30,7 @@ urlpatterns = [
     path('maintenance/<int:gym_id>/', views.maintenance_list, name='maintenance_list'),
     path('maintenance/<int:gym_id>/schedule/', views.schedule_maintenance, name='schedule_maintenance'),
     path('maintenance/<int:gym_id>/schedule/<int:equipment_id>/', views.schedule_maintenance, name='schedule_equipment_maintenance'),
+    path('maintenance/<int:gym_id>/planner/', views.maintenance_planner, name='maintenance_planner'),
     path('maintenance/<int:gym_id>/<int:maintenance_id>/update/', views.update_maintenance, name='update_maintenance'),
     
     # Inventory URLs
@@ -33,6 +38,11 @@ urlpatterns = [
     path('inventory/<int:gym_id>/add/', views.add_inventory_item, name='add_inventory_item'),
     path('inventory/<int:gym_id>/<int:item_id>/', views.inventory_detail, name='inventory_detail'),
     path('inventory/<int:gym_id>/<int:item_id>/transaction/', views.stock_transaction, name='stock_transaction'),
+    path('inventory/<int:gym_id>/transfer/', views.stock_transfer, name='stock_transfer'),
+    
+    # Purchase Order URLs
+    path('purchase-orders/<int:gym_id>/', views.purchase_order_list, name='purchase_order_list'),
+    path('purchase-orders/<int:gym_id>/<int:po_id>/', views.purchase_order_detail, name='purchase_order_detail'),
     
     # Vendor URLs - FIXED और COMPLETE
     path('gym/<int:gym_id>/vendors/', views.vendor_list, name='vendor_list'),
@@ -43,6 +53,7 @@ urlpatterns = [
     
     # Reports URLs
     path('reports/<int:gym_id>/equipment/', views.equipment_reports, name='equipment_reports'),
+    path('reports/<int:gym_id>/reliability/', views.equipment_reliability, name='equipment_reliability'),
     path('reports/<int:gym_id>/inventory/', views.inventory_reports, name='inventory_reports'),
     
     # Alerts URLs
@@ -51,10 +62,13 @@ urlpatterns = [
     path('alerts/<int:gym_id>/<int:alert_id>/read/', views.mark_alert_as_read, name='mark_alert_as_read'),
     path('alerts/<int:gym_id>/mark-all-read/', views.mark_all_alerts_as_read, name='mark_all_alerts_as_read'),
     path('alerts/<int:gym_id>/resolve-all/', views.resolve_all_alerts, name='resolve_all_alerts'),
+    path('alerts/<int:gym_id>/stream/', views.alert_stream_view, name='alert_stream'),
+    path('alerts/<int:gym_id>/events/', views.alert_events, name='alert_events'),
     
     # AJAX URLs
     path('ajax/equipment/<int:equipment_id>/data/', views.get_equipment_maintenance_data, name='equipment_data'),
     path('ajax/inventory/<int:item_id>/data/', views.get_inventory_item_data, name='inventory_data'),
+    path('ajax/inventory/<int:gym_id>/lookup/', views.lookup_inventory_code, name='inventory_lookup'),
 
     # Inventory Category URLs - FIXED WITH GYM_ID
     path('inventory-categories/<int:gym_id>/', views.inventory_category_list, name='inventory_category_list'),
@@ -1,6 +1,20 @@
+import time
+
+from django.db import transaction
 from django.utils import timezone
 from datetime import date, timedelta
-from .models import StockAlert, InventoryItem, Equipment
+from .models import StockAlert, StockAlertArchive, StockAlertRemoval, InventoryItem, Equipment
+
+
+ALERT_ARCHIVE_CHUNK_SIZE = 500
+
+# Seconds between archive chunks, so requests waiting on the SQLite write lock get a turn
+ALERT_ARCHIVE_PAUSE = 0.05
+
+ARCHIVED_ALERT_FIELDS = [
+    'id', 'gym_id', 'equipment_id', 'inventory_item_id', 'resolved_by_id',
+    'alert_type', 'priority', 'title', 'message', 'created_at', 'resolved_at',
+]
 
 
 def generate_daily_alerts():
@@ -52,15 +66,43 @@ def generate_daily_alerts():
     return alert_count
 
 
-def cleanup_old_resolved_alerts(days=30):
+def archive_resolved_alerts(days=30, chunk_size=ALERT_ARCHIVE_CHUNK_SIZE, pause=ALERT_ARCHIVE_PAUSE):
     """
-    Clean up old resolved alerts (older than specified days)
+    Move resolved alerts older than `days` into StockAlertArchive, and drop
+    StockAlertRemoval records as old.
+
+    Works through the backlog in chunks of `chunk_size` rows, each copied
+    and deleted in its own short transaction, sleeping `pause` seconds in
+    between so request traffic can take the database lock. Safe to stop
+    and rerun at any point.
     """
     cutoff_date = timezone.now() - timedelta(days=days)
-    deleted_count = StockAlert.objects.filter(
-        is_resolved=True,
-        resolved_at__lt=cutoff_date
-    ).delete()[0]
-    
-    print(f"🧹 Cleaned up {deleted_count} old alerts")
-    return deleted_count
\ No newline at end of file
+    archived_count = 0
+
+    while True:
+        chunk_ids = list(
+            StockAlert.objects.filter(is_resolved=True, resolved_at__lt=cutoff_date)
+            .order_by('id')
+            .values_list('id', flat=True)[:chunk_size]
+        )
+        if not chunk_ids:
+            break
+
+        with transaction.atomic():
+            rows = StockAlert.objects.filter(id__in=chunk_ids).values(*ARCHIVED_ALERT_FIELDS)
+            StockAlertArchive.objects.bulk_create(
+                [StockAlertArchive(alert_id=row.pop('id'), **row) for row in rows],
+                ignore_conflicts=True,  # rows left behind by an interrupted run
+            )
+            StockAlert.objects.filter(id__in=chunk_ids).delete()
+
+        archived_count += len(chunk_ids)
+        if len(chunk_ids) < chunk_size:
+            break
+        time.sleep(pause)
+
+    # Removal records only serve live alert clients catching up on recent changes
+    StockAlertRemoval.objects.filter(removed_at__lt=cutoff_date).delete()
+
+    print(f"🧹 Archived {archived_count} old resolved alerts")
+    return archived_count
@@ -0,0 +1,159 @@
+# inventory_management/valuation.py
+"""
+Equipment asset valuation.
+
+Straight-line depreciation, the same rule as Equipment.current_value:
+value = purchase_price * (1 - depreciation_rate% * years since purchase),
+never below zero. Instead of instantiating every Equipment and computing
+in Decimal, a gym's equipment is read with one values() query into NumPy
+arrays and valued in bulk - today, or at any number of future dates for
+the depreciation schedule.
+"""
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from django.utils import timezone
+
+from .models import Equipment
+
+
+DAYS_PER_YEAR = 365.25
+
+SCHEDULE_YEARS = 5
+
+# Age bands (years) of the equipment reports' age analysis
+AGE_BANDS = [
+    ("new", 0, 1),
+    ("medium", 1, 3),
+    ("old", 3, 5),
+    ("very_old", 5, None),
+]
+
+
+def _load(gym_id):
+    """Column arrays for the gym's active equipment, from one query"""
+    rows = list(
+        Equipment.objects.filter(gym_id=gym_id, is_active=True)
+        .values_list("category_id", "category__name", "purchase_price", "purchase_date", "depreciation_rate")
+        .order_by()
+    )
+
+    category_names = {row[0]: row[1] for row in rows}
+    positions = {category_id: position for position, category_id in enumerate(sorted(category_names))}
+
+    return {
+        "count": len(rows),
+        "categories": [(category_id, category_names[category_id]) for category_id in positions],
+        "category_index": np.array([positions[row[0]] for row in rows], dtype=int),
+        "price": np.array([float(row[2] or 0) for row in rows]),
+        "purchase_ordinal": np.array([row[3].toordinal() for row in rows], dtype=float),
+        "rate": np.array([float(row[4] or 0) for row in rows]) / 100,
+    }
+
+
+def _values_at(data, when):
+    """(equipment x dates) book values at each date in `when`"""
+    ordinals = np.array([moment.toordinal() for moment in when], dtype=float)
+    years = np.clip((ordinals[np.newaxis, :] - data["purchase_ordinal"][:, np.newaxis]) / DAYS_PER_YEAR, 0, None)
+    return np.clip(data["price"][:, np.newaxis] * (1 - data["rate"][:, np.newaxis] * years), 0, None)
+
+
+def book_values(prices, purchase_dates, depreciation_rates, as_of=None):
+    """Vector of book values for parallel sequences of prices, purchase dates and rates (%)"""
+    data = {
+        "price": np.array([float(price or 0) for price in prices]),
+        "purchase_ordinal": np.array([day.toordinal() for day in purchase_dates], dtype=float),
+        "rate": np.array([float(rate or 0) for rate in depreciation_rates]) / 100,
+    }
+    if not len(data["price"]):
+        return np.zeros(0)
+    return _values_at(data, [as_of or timezone.localdate()])[:, 0]
+
+
+def _per_category(data, values):
+    """Sum a per-equipment vector by category"""
+    return np.bincount(data["category_index"], weights=values, minlength=len(data["categories"]))
+
+
+def equipment_valuation(gym_id, as_of=None):
+    """
+    Current book value of a gym's equipment: totals, per-category rows and
+    the age analysis used by the equipment reports.
+    """
+    as_of = as_of or timezone.localdate()
+    data = _load(gym_id)
+
+    current = _values_at(data, [as_of])[:, 0] if data["count"] else np.zeros(0)
+    ages = np.clip((as_of.toordinal() - data["purchase_ordinal"]) / DAYS_PER_YEAR, 0, None)
+
+    counts = np.bincount(data["category_index"], minlength=len(data["categories"]))
+    purchase_by_category = _per_category(data, data["price"])
+    current_by_category = _per_category(data, current)
+
+    categories = [
+        {
+            "category_id": category_id,
+            "category__name": name,
+            "count": int(counts[position]),
+            "purchase_value": float(purchase_by_category[position]),
+            "current_value": float(current_by_category[position]),
+            "depreciation": float(purchase_by_category[position] - current_by_category[position]),
+            "percentage": float(counts[position]) / data["count"] * 100,
+        }
+        for position, (category_id, name) in enumerate(data["categories"])
+    ]
+    categories.sort(key=lambda row: row["current_value"], reverse=True)
+
+    age_analysis = {}
+    for band, low, high in AGE_BANDS:
+        in_band = (ages >= low) & (ages < high) if high is not None else (ages >= low)
+        age_analysis[f"{band}_count"] = int(in_band.sum())
+        age_analysis[f"{band}_percentage"] = float(in_band.mean() * 100) if data["count"] else 0.0
+
+    total_purchase = float(data["price"].sum())
+    total_current = float(current.sum())
+
+    return {
+        "as_of": as_of,
+        "equipment_count": data["count"],
+        "total_purchase_value": total_purchase,
+        "total_current_value": total_current,
+        "total_depreciation": total_purchase - total_current,
+        "fully_depreciated_count": int((current <= 0).sum()),
+        "average_age": float(ages.mean()) if data["count"] else 0.0,
+        "categories": categories,
+        "age_analysis": age_analysis,
+    }
+
+
+def depreciation_schedule(gym_id, years=SCHEDULE_YEARS, as_of=None):
+    """
+    Projected book value at today and each of the next `years` anniversaries,
+    in total and per category, with the depreciation charged in each year.
+    """
+    as_of = as_of or timezone.localdate()
+    data = _load(gym_id)
+    dates = [as_of + relativedelta(years=offset) for offset in range(years + 1)]
+
+    values = _values_at(data, dates) if data["count"] else np.zeros((0, len(dates)))
+    totals = values.sum(axis=0)
+
+    by_category = np.zeros((len(data["categories"]), len(dates)))
+    if data["count"]:
+        np.add.at(by_category, data["category_index"], values)
+
+    rows = []
+    for position, moment in enumerate(dates):
+        rows.append({
+            "date": moment,
+            "book_value": float(totals[position]),
+            "depreciation": float(totals[position - 1] - totals[position]) if position else 0.0,
+        })
+
+    return {
+        "dates": dates,
+        "rows": rows,
+        "categories": [
+            {"category__name": name, "values": [float(value) for value in by_category[position]]}
+            for position, (_, name) in enumerate(data["categories"])
+        ],
+    }
@@ -2,16 +2,24 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db import transaction
-from django.http import JsonResponse
+from django.db import IntegrityError, transaction
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.db.models import Q, Sum, Count, F
+from asgiref.sync import sync_to_async
+import asyncio
+import csv
+import io
+import json
 from django.utils import timezone
-from datetime import date, timedelta
-from decimal import Decimal
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
+from django.urls import reverse
 from django.db.models import Q
 from multiple_gym.models import Gym
 from .models import EquipmentCategory, Equipment
@@ -25,7 +33,47 @@ from .models import (
     InventoryCategory,
     StockTransaction,
     StockAlert,
+    InventoryForecast,
+    PurchaseOrder,
+)
+from . import alert_stream, barcode_index
+from .equipment_import import IMPORT_COLUMNS, REQUIRED_COLUMNS, import_equipment, template_rows
+from .equipment_reports import (
+    MONTH_PRESETS,
+    TOP_EQUIPMENT,
+    equipment_status_summary,
+    maintenance_by_equipment,
+    monthly_maintenance_costs,
+    parse_report_months,
 )
+from .labels import LABELS_PER_PAGE, label_job, queue_labels, serial_from_payload
+from .maintenance import (
+    ALLOWED_TRANSITIONS,
+    DEFAULT_DAILY_CAPACITY,
+    DEFAULT_HORIZON_DAYS,
+    MAX_HORIZON_DAYS,
+    plan_preventive_maintenance,
+    schedule_preventive_maintenance,
+    transition_maintenance,
+)
+from .purchasing import generate_purchase_orders, receive_purchase_order
+from .reliability import (
+    REPLACE_COST_RATIO,
+    WINDOW_PRESETS,
+    get_reliability_report,
+    parse_window_months,
+)
+from .reports import RANGE_PRESETS, get_inventory_report, parse_report_range
+from .search import search_equipment, search_inventory_items
+from .transfers import transfer_stock
+from .valuation import depreciation_schedule, equipment_valuation
+
+EQUIPMENT_PAGE_SIZE = 24
+INVENTORY_PAGE_SIZE = 24
+STOCKOUT_HORIZON_DAYS = 30
+PURCHASE_ORDER_PAGE_SIZE = 20
+ALERT_PAGE_SIZE = 25
+RELIABILITY_PAGE_SIZE = 25
 
 
 # Import Gym and GymAdmin from your main app
@@ -71,13 +119,10 @@ def inventory_dashboard(request, gym_id=None):
         gym=gym, current_stock__lte=F("minimum_stock")
     ).count()
 
-    # Financial Statistics
-    total_equipment_value = (
-        Equipment.objects.filter(gym=gym, is_active=True).aggregate(
-            total=Sum("purchase_price")
-        )["total"]
-        or 0
-    )
+    # Financial Statistics - equipment at depreciated book value
+    equipment_valuation_summary = equipment_valuation(gym.id if gym else None)
+    total_equipment_value = equipment_valuation_summary["total_current_value"]
+    total_equipment_investment = equipment_valuation_summary["total_purchase_value"]
 
     total_inventory_value = sum(
         item.total_value
@@ -93,17 +138,25 @@ def inventory_dashboard(request, gym_id=None):
         "-transaction_date"
     )[:5]
 
-    # 🔥 FIXED: Get all alerts first, then calculate counts BEFORE slicing
-    all_alerts = StockAlert.objects.filter(
-        Q(equipment__gym=gym) | Q(inventory_item__gym=gym), is_resolved=False
-    ).order_by("-created_at")
+    # Items running out soon - precomputed by the nightly forecast job
+    stockout_forecasts = (
+        InventoryForecast.objects.filter(
+            gym=gym, item__is_active=True, days_of_cover__lte=STOCKOUT_HORIZON_DAYS
+        )
+        .select_related("item")
+        .order_by("days_of_cover")[:5]
+    )
 
-    # Calculate alert counts BEFORE slicing
-    critical_alerts = all_alerts.filter(priority="critical").count()
-    high_alerts = all_alerts.filter(priority="high").count()
+    # Open alerts - counts and the latest 10 from the (gym, is_resolved, ...) index
+    open_alerts = StockAlert.objects.filter(gym=gym, is_resolved=False)
+    alert_counts = open_alerts.aggregate(
+        critical=Count("id", filter=Q(priority="critical")),
+        high=Count("id", filter=Q(priority="high")),
+    )
+    critical_alerts = alert_counts["critical"]
+    high_alerts = alert_counts["high"]
 
-    # Now slice for display (only first 10)
-    alerts = all_alerts[:10]
+    alerts = open_alerts.select_related("equipment", "inventory_item").order_by("-created_at")[:10]
 
     context = {
         "gym": gym,
@@ -114,98 +167,19 @@ def inventory_dashboard(request, gym_id=None):
         "total_inventory_items": total_inventory_items,
         "low_stock_items": low_stock_items,
         "total_equipment_value": total_equipment_value,
+        "total_equipment_investment": total_equipment_investment,
         "total_inventory_value": total_inventory_value,
         "recent_maintenance": recent_maintenance,
         "recent_transactions": recent_transactions,
         "alerts": alerts,
         "critical_alerts": critical_alerts,
         "high_alerts": high_alerts,
+        "stockout_forecasts": stockout_forecasts,
     }
 
     return render(request, "inventory_management/dashboard.html", context)
 
 
-def equipment_list(request, gym_id):
-    """Equipment list view with simple debugging"""
-
-    # Basic permission check
-    if request.user.user_type not in ["superadmin", "gymadmin"]:
-        messages.error(request, "Access denied!")
-        return redirect("login")
-
-    # Get gym
-    gym = get_object_or_404(Gym, id=gym_id)
-    print(f"🔍 Debug - Gym found: {gym.name} (ID: {gym.id})")
-
-    # Check if any equipment exists at all
-    all_equipment = Equipment.objects.all()
-    print(f"🔍 Debug - Total equipment in database: {all_equipment.count()}")
-
-    for eq in all_equipment:
-        print(f"  - {eq.name} (Gym: '{eq.gym}', Type: {type(eq.gym)})")
-
-    # Try different filtering approaches
-    print(f"🔍 Debug - Looking for equipment with gym='{gym}'")
-
-    # Method 1: Filter by gym object
-    equipment_list = Equipment.objects.filter(gym=gym)
-    print(f"🔍 Debug - Method 1 (gym object): Found {equipment_list.count()} equipment")
-
-    # Method 2: Filter by gym string (if gym is CharField)
-    equipment_list2 = Equipment.objects.filter(gym=str(gym))
-    print(
-        f"🔍 Debug - Method 2 (gym string): Found {equipment_list2.count()} equipment"
-    )
-
-    # Method 3: Filter by gym name
-    equipment_list3 = Equipment.objects.filter(gym=gym.name)
-    print(f"🔍 Debug - Method 3 (gym name): Found {equipment_list3.count()} equipment")
-
-    # Method 4: Filter by gym ID (if gym field stores ID)
-    equipment_list4 = Equipment.objects.filter(gym=str(gym.id))
-    print(f"🔍 Debug - Method 4 (gym ID): Found {equipment_list4.count()} equipment")
-
-    # Use the method that returns data
-    if equipment_list.count() > 0:
-        final_equipment_list = equipment_list
-        print("✅ Using Method 1 (gym object)")
-    elif equipment_list2.count() > 0:
-        final_equipment_list = equipment_list2
-        print("✅ Using Method 2 (gym string)")
-    elif equipment_list3.count() > 0:
-        final_equipment_list = equipment_list3
-        print("✅ Using Method 3 (gym name)")
-    elif equipment_list4.count() > 0:
-        final_equipment_list = equipment_list4
-        print("✅ Using Method 4 (gym ID)")
-    else:
-        final_equipment_list = Equipment.objects.none()
-        print("❌ No equipment found with any method!")
-
-    # Print each equipment found
-    print(f"🔍 Debug - Final equipment list ({final_equipment_list.count()} items):")
-    for equipment in final_equipment_list:
-        print(f"  ✅ {equipment.name} - {equipment.brand} - {equipment.serial_number}")
-
-    # Get categories for filter
-    categories = EquipmentCategory.objects.all()
-    print(f"🔍 Debug - Categories found: {categories.count()}")
-
-    context = {
-        "gym": gym,
-        "gym_id": gym_id,
-        "equipment_list": final_equipment_list,
-        "categories": categories,
-        "search_query": "",
-        "category_filter": "",
-        "status_filter": "",
-    }
-
-    print(f"🔍 Debug - Sending to template: {len(context['equipment_list'])} equipment")
-
-    return render(request, "inventory_management/equipment_list.html", context)
-
-
 @login_required
 def equipment_detail(request, gym_id, equipment_id):
     """Equipment detail view"""
@@ -249,7 +223,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from .models import Equipment, EquipmentCategory, Vendor
-from .forms import EquipmentForm
+from .forms import EquipmentForm, EquipmentImportForm
 
 # from your_main_app.models import Gym, GymAdmin  # Adjust import as needed
 
@@ -368,6 +342,230 @@ def add_equipment(request, gym_id, equipment_id=None):
 
 
 
+@login_required
+def import_equipment_csv(request, gym_id):
+    """Bulk-add equipment from a CSV file, with a dry run that only reports row errors"""
+    if request.user.user_type not in ["superadmin", "gymadmin"]:
+        messages.error(request, "Access denied!")
+        return redirect("login")
+
+    gym = get_object_or_404(Gym, id=gym_id)
+
+    # Check access permissions for gymadmin
+    if request.user.user_type == "gymadmin":
+        try:
+            gym_admin = GymAdmin.objects.get(user=request.user)
+            if gym not in gym_admin.gyms.all():
+                messages.error(request, "You do not have access to this gym!")
+                return redirect("gymadmin_home")
+        except GymAdmin.DoesNotExist:
+            messages.error(request, "Access denied!")
+            return redirect("login")
+
+    if request.GET.get("template"):
+        response = HttpResponse(content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="equipment_import_template.csv"'
+        csv.writer(response).writerows(template_rows())
+        return response
+
+    report = None
+    if request.method == "POST":
+        form = EquipmentImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            lines = io.TextIOWrapper(form.cleaned_data["csv_file"].file, encoding="utf-8-sig", newline="")
+            report = import_equipment(
+                gym,
+                lines,
+                user=request.user,
+                dry_run=form.cleaned_data["dry_run"],
+                create_categories=form.cleaned_data["create_categories"],
+            )
+
+            if report["file_errors"]:
+                messages.error(request, " ".join(report["file_errors"]))
+            elif report["dry_run"]:
+                messages.info(
+                    request,
+                    f"Dry run: {report['valid_rows']} of {report['total_rows']} rows are ready to import.",
+                )
+            elif report["created"]:
+                messages.success(request, f"Imported {report['created']} equipment.")
+                if not report["error_count"]:
+                    return redirect("inventory:equipment_list", gym_id=gym_id)
+            else:
+                messages.error(request, "No equipment imported - correct the errors below.")
+        else:
+            messages.error(request, "Please correct the errors below.")
+    else:
+        form = EquipmentImportForm()
+
+    context = {
+        "gym": gym,
+        "gym_id": gym_id,
+        "form": form,
+        "report": report,
+        "required_columns": REQUIRED_COLUMNS,
+        "optional_columns": IMPORT_COLUMNS[len(REQUIRED_COLUMNS):],
+    }
+    return render(request, "inventory_management/import_equipment.html", context)
+
+
+@login_required
+def equipment_labels(request, gym_id):
+    """Printable QR label sheets for the gym's equipment, rendered in the background"""
+    if request.user.user_type not in ["superadmin", "gymadmin"]:
+        messages.error(request, "Access denied!")
+        return redirect("login")
+
+    gym = get_object_or_404(Gym, id=gym_id)
+
+    # Check access permissions for gymadmin
+    if request.user.user_type == "gymadmin":
+        try:
+            gym_admin = GymAdmin.objects.get(user=request.user)
+            if gym not in gym_admin.gyms.all():
+                messages.error(request, "You do not have access to this gym!")
+                return redirect("gymadmin_home")
+        except GymAdmin.DoesNotExist:
+            messages.error(request, "Access denied!")
+            return redirect("login")
+
+    if request.GET.get("status"):
+        job = label_job(gym.id) or {}
+        return JsonResponse({
+            "status": job.get("status"),
+            "count": job.get("count"),
+            "error": job.get("error"),
+            "ready": job.get("status") == "ready",
+        })
+
+    if request.method == "POST":
+        category_id = request.POST.get("category", "")
+        location = request.POST.get("location", "").strip()
+        scan_url = request.build_absolute_uri(reverse("inventory:scan_equipment", args=[gym.id]))
+        if queue_labels(
+            gym.id,
+            scan_url,
+            category_id=int(category_id) if category_id.isdigit() else None,
+            location=location or None,
+        ):
+            messages.info(request, "Generating labels - the download appears here when they are ready.")
+        else:
+            messages.warning(request, "Labels are already being generated for this gym.")
+        return redirect("inventory:equipment_labels", gym_id=gym_id)
+
+    categories = EquipmentCategory.objects.filter(gym=gym).order_by("name")
+    locations = (
+        Equipment.objects.filter(gym=gym, is_active=True)
+        .exclude(location="")
+        .values_list("location", flat=True)
+        .distinct()
+        .order_by("location")
+    )
+
+    context = {
+        "gym": gym,
+        "gym_id": gym_id,
+        "job": label_job(gym.id),
+        "categories": categories,
+        "locations": locations,
+        "labels_per_page": LABELS_PER_PAGE,
+    }
+    return render(request, "inventory_management/equipment_labels.html", context)
+
+
+@login_required
+def download_equipment_labels(request, gym_id):
+    """The label sheets of the gym's latest finished job"""
+    if request.user.user_type not in ["superadmin", "gymadmin"]:
+        messages.error(request, "Access denied!")
+        return redirect("login")
+
+    gym = get_object_or_404(Gym, id=gym_id)
+
+    # Check access permissions for gymadmin
+    if request.user.user_type == "gymadmin":
+        try:
+            gym_admin = GymAdmin.objects.get(user=request.user)
+            if gym not in gym_admin.gyms.all():
+                messages.error(request, "You do not have access to this gym!")
+                return redirect("gymadmin_home")
+        except GymAdmin.DoesNotExist:
+            messages.error(request, "Access denied!")
+            return redirect("login")
+
+    job = label_job(gym.id)
+    if not job or not job.get("file") or not default_storage.exists(job["file"]):
+        messages.error(request, "No label sheets to download - generate them first.")
+        return redirect("inventory:equipment_labels", gym_id=gym_id)
+
+    return FileResponse(
+        default_storage.open(job["file"], "rb"),
+        as_attachment=True,
+        filename=f"equipment-labels-{gym.id}.pdf",
+        content_type="application/pdf",
+    )
+
+
+@login_required
+def scan_equipment(request, gym_id):
+    """Resolve a scanned label (or a typed serial number) to its equipment"""
+    if request.user.user_type not in ["superadmin", "gymadmin"]:
+        messages.error(request, "Access denied!")
+        return redirect("login")
+
+    gym = get_object_or_404(Gym, id=gym_id)
+
+    # Check access permissions for gymadmin
+    if request.user.user_type == "gymadmin":
+        try:
+            gym_admin = GymAdmin.objects.get(user=request.user)
+            if gym not in gym_admin.gyms.all():
+                messages.error(request, "You do not have access to this gym!")
+                return redirect("gymadmin_home")
+        except GymAdmin.DoesNotExist:
+            messages.error(request, "Access denied!")
+            return redirect("login")
+
+    code = request.GET.get("code", "")
+    serial_number = serial_from_payload(code)
+    wants_json = request.GET.get("format") == "json"
+
+    equipment = None
+    if serial_number:
+        # serial_number is unique, so this is one lookup on its index
+        equipment = (
+            Equipment.objects.filter(serial_number=serial_number, gym=gym)
+            .only("id", "name", "serial_number", "status", "location")
+            .first()
+        )
+
+    if wants_json:
+        if equipment is None:
+            return JsonResponse({"found": False, "serial_number": serial_number}, status=404)
+        return JsonResponse({
+            "found": True,
+            "id": equipment.id,
+            "name": equipment.name,
+            "serial_number": equipment.serial_number,
+            "status": equipment.status,
+            "location": equipment.location,
+            "detail_url": reverse("inventory:equipment_detail", args=[gym.id, equipment.id]),
+            "maintenance_url": reverse("inventory:schedule_equipment_maintenance", args=[gym.id, equipment.id]),
+        })
+
+    if equipment is not None:
+        return redirect("inventory:equipment_detail", gym_id=gym_id, equipment_id=equipment.id)
+
+    context = {
+        "gym": gym,
+        "gym_id": gym_id,
+        "code": code,
+        "serial_number": serial_number,
+    }
+    return render(request, "inventory_management/scan_equipment.html", context, status=404 if serial_number else 200)
+
+
 @login_required
 def delete_equipment(request, gym_id, equipment_id):
     """Delete equipment with confirmation"""
@@ -545,177 +743,6 @@ def schedule_maintenance(request, gym_id, equipment_id=None):
     return render(request, "inventory_management/schedule_maintenance.html", context)
 
 
-# Inventory Views
-
-
-@login_required
-def inventory_list(request, gym_id=None):
-    """List inventory items with debugging"""
-    if request.user.user_type not in ["superadmin", "gymadmin"]:
-        messages.error(request, "Access denied!")
-        return redirect("login")
-
-    gym = get_object_or_404(Gym, id=gym_id)
-    print(f"🔍 Debug - Gym found: {gym.name} (ID: {gym.id})")
-
-    # Check access permissions for gymadmin
-    if request.user.user_type == "gymadmin":
-        try:
-            gym_admin = GymAdmin.objects.get(user=request.user)
-            if gym not in gym_admin.gyms.all():
-                messages.error(request, "You do not have access to this gym!")
-                return redirect("gymadmin_home")
-        except GymAdmin.DoesNotExist:
-            messages.error(request, "Access denied!")
-            return redirect("login")
-
-    # Debug: Check all inventory items
-    all_inventory = InventoryItem.objects.all()
-    print(f"🔍 Debug - Total inventory items in database: {all_inventory.count()}")
-
-    for item in all_inventory:
-        print(f"  - {item.name} (Gym: '{item.gym}', Active: {item.is_active})")
-
-    # Try different filtering approaches
-    print(f"🔍 Debug - Looking for inventory with gym='{gym}' and is_active=True")
-
-    # Method 1: Filter by gym object
-    inventory_items = InventoryItem.objects.filter(gym=gym, is_active=True)
-    print(f"🔍 Debug - Method 1 (gym object): Found {inventory_items.count()} items")
-
-    # Method 2: Filter by gym string
-    inventory_items2 = InventoryItem.objects.filter(gym=str(gym), is_active=True)
-    print(f"🔍 Debug - Method 2 (gym string): Found {inventory_items2.count()} items")
-
-    # Method 3: Filter by gym name
-    inventory_items3 = InventoryItem.objects.filter(gym=gym.name, is_active=True)
-    print(f"🔍 Debug - Method 3 (gym name): Found {inventory_items3.count()} items")
-
-    # Method 4: Filter by gym ID
-    inventory_items4 = InventoryItem.objects.filter(gym=str(gym.id), is_active=True)
-    print(f"🔍 Debug - Method 4 (gym ID): Found {inventory_items4.count()} items")
-
-    # Method 5: Just check is_active
-    inventory_items5 = InventoryItem.objects.filter(is_active=True)
-    print(
-        f"🔍 Debug - Method 5 (only is_active): Found {inventory_items5.count()} items"
-    )
-
-    # Use the method that returns data
-    if inventory_items.count() > 0:
-        final_inventory_items = inventory_items
-        print("✅ Using Method 1 (gym object)")
-    elif inventory_items2.count() > 0:
-        final_inventory_items = inventory_items2
-        print("✅ Using Method 2 (gym string)")
-    elif inventory_items3.count() > 0:
-        final_inventory_items = inventory_items3
-        print("✅ Using Method 3 (gym name)")
-    elif inventory_items4.count() > 0:
-        final_inventory_items = inventory_items4
-        print("✅ Using Method 4 (gym ID)")
-    elif inventory_items5.count() > 0:
-        final_inventory_items = inventory_items5
-        print("✅ Using Method 5 (only is_active) - WARNING: No gym filtering!")
-    else:
-        final_inventory_items = InventoryItem.objects.none()
-        print("❌ No inventory items found with any method!")
-
-    # Search functionality
-    search_query = request.GET.get("search")
-    if search_query:
-        final_inventory_items = final_inventory_items.filter(
-            Q(name__icontains=search_query)
-            | Q(brand__icontains=search_query)
-            | Q(sku__icontains=search_query)
-        )
-        print(
-            f"🔍 Debug - After search '{search_query}': {final_inventory_items.count()} items"
-        )
-
-    # Filter by category
-    category_filter = request.GET.get("category")
-    if category_filter:
-        final_inventory_items = final_inventory_items.filter(
-            category__id=category_filter
-        )
-        print(
-            f"🔍 Debug - After category filter: {final_inventory_items.count()} items"
-        )
-
-    # Filter by stock level
-    stock_filter = request.GET.get("stock_filter")
-    if stock_filter == "low_stock":
-        final_inventory_items = final_inventory_items.filter(
-            current_stock__lte=F("minimum_stock")
-        )
-    elif stock_filter == "out_of_stock":
-        final_inventory_items = final_inventory_items.filter(current_stock=0)
-
-    if stock_filter:
-        print(
-            f"🔍 Debug - After stock filter '{stock_filter}': {final_inventory_items.count()} items"
-        )
-
-    final_inventory_items = final_inventory_items.order_by("name")
-
-    # Print each item found
-    print(f"🔍 Debug - Final inventory items ({final_inventory_items.count()} items):")
-    for item in final_inventory_items:
-        print(
-            f"  ✅ {item.name} - Stock: {item.current_stock} - Category: {getattr(item.category, 'name', 'None')}"
-        )
-
-    categories = InventoryCategory.objects.all()
-    print(f"🔍 Debug - Categories found: {categories.count()}")
-
-    # Calculate statistics with error handling
-    try:
-        total_value = 0
-        for item in final_inventory_items:
-            try:
-                # Check if item has total_value property/method
-                if hasattr(item, "total_value"):
-                    if callable(item.total_value):
-                        total_value += item.total_value()
-                    else:
-                        total_value += item.total_value
-                else:
-                    # Calculate manually
-                    total_value += item.current_stock * item.cost_price
-            except Exception as e:
-                print(f"⚠️ Error calculating total_value for {item.name}: {e}")
-                total_value += item.current_stock * item.cost_price
-
-        low_stock_count = final_inventory_items.filter(
-            current_stock__lte=F("minimum_stock")
-        ).count()
-        print(
-            f"🔍 Debug - Statistics: Total Value: ₹{total_value}, Low Stock: {low_stock_count}"
-        )
-
-    except Exception as e:
-        print(f"⚠️ Error calculating statistics: {e}")
-        total_value = 0
-        low_stock_count = 0
-
-    context = {
-        "inventory_items": final_inventory_items,
-        "categories": categories,
-        "gym": gym,
-        "gym_id": gym_id,
-        "search_query": search_query,
-        "category_filter": category_filter,
-        "stock_filter": stock_filter,
-        "total_value": total_value,
-        "low_stock_count": low_stock_count,
-    }
-
-    print(f"🔍 Debug - Sending to template: {len(context['inventory_items'])} items")
-
-    return render(request, "inventory_management/inventory_list.html", context)
-
-
 # Vendor Views
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
@@ -888,41 +915,6 @@ def inventory_detail(request, gym_id, item_id):
 
 
 
-@login_required
-def update_maintenance(request, gym_id, maintenance_id):
-    """Placeholder for update maintenance"""
-    messages.info(request, "Update maintenance feature coming soon!")
-    return redirect("inventory:maintenance_list", gym_id=gym_id)
-
-
-@login_required
-def equipment_reports(request, gym_id):
-    """Placeholder for equipment reports"""
-    messages.info(request, "Equipment reports coming soon!")
-    return redirect("inventory:dashboard", gym_id=gym_id)
-
-
-@login_required
-def inventory_reports(request, gym_id):
-    """Placeholder for inventory reports"""
-    messages.info(request, "Inventory reports coming soon!")
-    return redirect("inventory:dashboard", gym_id=gym_id)
-
-
-@login_required
-def alerts_view(request, gym_id=None):
-    """Placeholder for alerts view"""
-    messages.info(request, "Alerts view coming soon!")
-    return redirect("inventory:dashboard", gym_id=gym_id)
-
-
-@login_required
-def resolve_alert(request, alert_id):
-    """Placeholder for resolve alert"""
-    messages.info(request, "Resolve alert feature coming soon!")
-    return redirect("inventory:dashboard")
-
-
 @login_required
 def get_equipment_maintenance_data(request, equipment_id):
     """AJAX view to get equipment maintenance data"""
@@ -967,22 +959,14 @@ def get_inventory_item_data(request, item_id):
 
 
 # Equipment Views
+@login_required
 def equipment_list(request, gym_id):
-    """Equipment list view with proper gym handling"""
-
-    # Basic permission check
+    """Paginated equipment list with status and category facets"""
     if request.user.user_type not in ["superadmin", "gymadmin"]:
         messages.error(request, "Access denied!")
         return redirect("login")
 
-    # 🔥 FIXED: Handle gym_id properly
-    try:
-        gym = get_object_or_404(Gym, id=gym_id)
-        print(f"🔍 Debug - Gym found: {gym.name} (ID: {gym.id})")
-    except (ValueError, Gym.DoesNotExist) as e:
-        print(f"🔍 Debug - Error getting gym: {e}")
-        messages.error(request, "Invalid gym!")
-        return redirect("login")
+    gym = get_object_or_404(Gym, id=gym_id)
 
     # Check access permissions for gymadmin
     if request.user.user_type == "gymadmin":
@@ -995,55 +979,76 @@ def equipment_list(request, gym_id):
             messages.error(request, "Access denied!")
             return redirect("login")
 
-    # 🔥 FIXED: Simple equipment filtering - gym is ForeignKey now
-    try:
-        equipment_list = Equipment.objects.filter(gym=gym, is_active=True)
-        print(f"🔍 Debug - Found {equipment_list.count()} equipment for gym {gym.name}")
-
-        # Debug each equipment
-        for eq in equipment_list:
-            print(f"  ✅ {eq.name} - {eq.brand} - Gym: {eq.gym.name}")
-
-    except Exception as e:
-        print(f"🔍 Debug - Error filtering equipment: {e}")
-        equipment_list = Equipment.objects.none()
-
-    # Get categories for filter
-    categories = EquipmentCategory.objects.all()
+    equipment_list = Equipment.objects.filter(gym=gym, is_active=True)
 
-    # Search functionality
+    # Search functionality - full-text index (see search.py)
     search_query = request.GET.get("search", "")
     if search_query:
-        equipment_list = equipment_list.filter(
-            Q(name__icontains=search_query)
-            | Q(brand__icontains=search_query)
-            | Q(serial_number__icontains=search_query)
-        )
+        equipment_list = search_equipment(equipment_list, search_query)
+
+    category_filter = request.GET.get("category", "")
+    if not category_filter.isdigit():
+        category_filter = ""
+    status_filter = request.GET.get("status", "")
+
+    # Facets and statistics from one grouped query over the searched list:
+    # each facet counts with the other facet's filter applied, the stats with both
+    status_counts, category_counts = {}, {}
+    stats = {"total_equipment": 0, "working_equipment": 0, "maintenance_due": 0, "out_of_order": 0}
+    for row in (
+        equipment_list.values("status", "category_id")
+        .annotate(count=Count("id"), due=Count("id", filter=Q(next_maintenance_date__lte=date.today())))
+        .order_by()
+    ):
+        in_category = not category_filter or row["category_id"] == int(category_filter)
+        in_status = not status_filter or row["status"] == status_filter
+        if in_category:
+            status_counts[row["status"]] = status_counts.get(row["status"], 0) + row["count"]
+        if in_status:
+            category_counts[row["category_id"]] = category_counts.get(row["category_id"], 0) + row["count"]
+        if in_category and in_status:
+            stats["total_equipment"] += row["count"]
+            stats["maintenance_due"] += row["due"]
+            if row["status"] == "working":
+                stats["working_equipment"] += row["count"]
+            elif row["status"] == "out_of_order":
+                stats["out_of_order"] += row["count"]
+
+    # Categories of this gym only, with their facet counts
+    categories = list(EquipmentCategory.objects.filter(gym=gym).order_by("name"))
+    for category in categories:
+        category.facet_count = category_counts.get(category.id, 0)
+
+    status_facets = [
+        {"value": value, "label": label, "count": status_counts.get(value, 0)}
+        for value, label in Equipment.EQUIPMENT_STATUS_CHOICES
+    ]
 
-    # Filter by category
-    category_filter = request.GET.get("category")
     if category_filter:
-        equipment_list = equipment_list.filter(category__id=category_filter)
-
-    # Filter by status
-    status_filter = request.GET.get("status")
+        equipment_list = equipment_list.filter(category_id=category_filter)
     if status_filter:
         equipment_list = equipment_list.filter(status=status_filter)
 
-    equipment_list = equipment_list.order_by("-created_at")
+    equipment_list = equipment_list.select_related("category", "vendor").order_by("-created_at")
+
+    # The facet query already counted the matches - no separate COUNT for the paginator
+    paginator = Paginator(equipment_list, EQUIPMENT_PAGE_SIZE)
+    paginator.count = stats["total_equipment"]
+    page_obj = paginator.get_page(request.GET.get("page"))
 
     context = {
         "gym": gym,
         "gym_id": gym_id,
-        "equipment_list": equipment_list,
+        "equipment_list": page_obj,
+        "page_obj": page_obj,
         "categories": categories,
+        "status_facets": status_facets,
         "search_query": search_query,
         "category_filter": category_filter,
         "status_filter": status_filter,
+        **stats,
     }
 
-    print(f"🔍 Debug - Sending {equipment_list.count()} equipment to template")
-
     return render(request, "inventory_management/equipment_list.html", context)
 
 
@@ -1160,91 +1165,144 @@ def update_maintenance(request, gym_id, maintenance_id):
 
     if request.method == "POST":
         try:
-            print(f"🔍 Debug - Updating maintenance: {maintenance.id}")
-
-            # Update basic fields
-            maintenance.status = request.POST.get("status")
-            print(f"🔍 Debug - New status: {maintenance.status}")
+            def parse_date(name):
+                value = request.POST.get(name)
+                return datetime.strptime(value, "%Y-%m-%d").date() if value else None
 
-            # Handle dates carefully
-            actual_date_str = request.POST.get("actual_date")
-            if actual_date_str:
-                from datetime import datetime
+            def parse_decimal(name):
+                try:
+                    return Decimal(str(request.POST.get(name) or "0"))
+                except (InvalidOperation, ValueError):
+                    return Decimal("0")
+
+            fields = {
+                "work_performed": request.POST.get("work_performed", ""),
+                "parts_replaced": request.POST.get("parts_replaced", ""),
+                "notes": request.POST.get("notes", ""),
+                "labor_cost": parse_decimal("labor_cost"),
+                "parts_cost": parse_decimal("parts_cost"),
+                "downtime_hours": parse_decimal("downtime_hours"),
+            }
+            for name in ("actual_date", "next_maintenance_due"):
+                value = parse_date(name)
+                if value:
+                    fields[name] = value
+
+            # Writes only the changed record and equipment columns
+            transition_maintenance(
+                maintenance, request.POST.get("status") or maintenance.status, **fields
+            )
 
-                maintenance.actual_date = datetime.strptime(
-                    actual_date_str, "%Y-%m-%d"
-                ).date()
-                print(f"🔍 Debug - Actual date: {maintenance.actual_date}")
+            messages.success(request, "Maintenance record updated successfully!")
+            return redirect("inventory:maintenance_list", gym_id=gym_id)
 
-            # Handle text fields
-            maintenance.work_performed = request.POST.get("work_performed", "")
-            maintenance.parts_replaced = request.POST.get("parts_replaced", "")
-            maintenance.notes = request.POST.get("notes", "")
+        except ValueError as e:
+            messages.error(request, f"Error updating maintenance: {str(e)}")
 
-            # Handle cost fields - convert to Decimal
-            from decimal import Decimal, InvalidOperation
+    context = {
+        "maintenance": maintenance,
+        "gym": gym,
+        "gym_id": gym_id,
+        "allowed_statuses": ALLOWED_TRANSITIONS[maintenance.status],
+    }
 
-            try:
-                labor_cost_str = request.POST.get("labor_cost", "0")
-                maintenance.labor_cost = (
-                    Decimal(str(labor_cost_str)) if labor_cost_str else Decimal("0")
-                )
-            except (InvalidOperation, ValueError):
-                maintenance.labor_cost = Decimal("0")
+    return render(request, "inventory_management/update_maintenance.html", context)
 
-            try:
-                parts_cost_str = request.POST.get("parts_cost", "0")
-                maintenance.parts_cost = (
-                    Decimal(str(parts_cost_str)) if parts_cost_str else Decimal("0")
-                )
-            except (InvalidOperation, ValueError):
-                maintenance.parts_cost = Decimal("0")
 
-            try:
-                downtime_str = request.POST.get("downtime_hours", "0")
-                maintenance.downtime_hours = (
-                    Decimal(str(downtime_str)) if downtime_str else Decimal("0")
-                )
-            except (InvalidOperation, ValueError):
-                maintenance.downtime_hours = Decimal("0")
+@login_required
+def maintenance_planner(request, gym_id):
+    """Plan preventive maintenance for all equipment coming due and schedule it in bulk"""
+    if request.user.user_type not in ["superadmin", "gymadmin"]:
+        messages.error(request, "Access denied!")
+        return redirect("login")
 
-            # Handle next maintenance date
-            next_maintenance_str = request.POST.get("next_maintenance_due")
-            if next_maintenance_str:
-                from datetime import datetime
+    gym = get_object_or_404(Gym, id=gym_id)
 
-                maintenance.next_maintenance_due = datetime.strptime(
-                    next_maintenance_str, "%Y-%m-%d"
-                ).date()
+    # Check access permissions for gymadmin
+    if request.user.user_type == "gymadmin":
+        try:
+            gym_admin = GymAdmin.objects.get(user=request.user)
+            if gym not in gym_admin.gyms.all():
+                messages.error(request, "You do not have access to this gym!")
+                return redirect("gymadmin_home")
+        except GymAdmin.DoesNotExist:
+            messages.error(request, "Access denied!")
+            return redirect("login")
 
-            print(
-                f"🔍 Debug - Before save: Status={maintenance.status}, Equipment={maintenance.equipment.name}"
-            )
+    vendors = Vendor.objects.filter(is_active=True).order_by("name")
+    params = request.POST if request.method == "POST" else request.GET
 
-            # Save the maintenance record (this will trigger equipment status update)
-            maintenance.save()
+    def int_param(name, default):
+        try:
+            return int(params.get(name) or default)
+        except ValueError:
+            return default
 
-            print(
-                f"🔍 Debug - After save: Equipment status={maintenance.equipment.status}"
-            )
+    horizon_days = min(max(int_param("horizon", DEFAULT_HORIZON_DAYS), 1), MAX_HORIZON_DAYS)
+    daily_capacity = max(int_param("capacity", DEFAULT_DAILY_CAPACITY), 1)
+    vendor_id = int_param("vendor", 0) or None
+    if vendor_id and not vendors.filter(id=vendor_id).exists():
+        vendor_id = None
+    technician_name = params.get("technician", "").strip()[:100]
 
-            messages.success(request, "Maintenance record updated successfully!")
+    if request.method == "POST":
+        try:
+            proposals = []
+            for equipment_id in request.POST.getlist("equipment"):
+                if not equipment_id.isdigit():
+                    continue
+                try:
+                    scheduled_date = datetime.strptime(
+                        request.POST.get(f"date_{equipment_id}", ""), "%Y-%m-%d"
+                    ).date()
+                except ValueError:
+                    raise ValueError("Every selected equipment needs a valid date")
+                vendor_value = request.POST.get(f"vendor_{equipment_id}", "")
+                proposals.append({
+                    "equipment_id": int(equipment_id),
+                    "scheduled_date": scheduled_date,
+                    "vendor_id": int(vendor_value) if vendor_value.isdigit() else None,
+                    "technician_name": technician_name,
+                })
+
+            if not proposals:
+                raise ValueError("Select at least one equipment to schedule")
+
+            records = schedule_preventive_maintenance(gym.id, proposals, user=request.user)
+            messages.success(request, f"Scheduled preventive maintenance for {len(records)} equipment.")
+            if len(records) < len(proposals):
+                messages.warning(
+                    request,
+                    f"{len(proposals) - len(records)} equipment skipped - already scheduled or no longer active.",
+                )
             return redirect("inventory:maintenance_list", gym_id=gym_id)
+        except ValueError as e:
+            messages.error(request, f"Error scheduling maintenance: {str(e)}")
 
-        except Exception as e:
-            print(f"🔍 Debug - Error in update_maintenance: {str(e)}")
-            import traceback
-
-            traceback.print_exc()
-            messages.error(request, f"Error updating maintenance: {str(e)}")
+    plan = plan_preventive_maintenance(
+        gym.id,
+        horizon_days=horizon_days,
+        daily_capacity=daily_capacity,
+        vendor_id=vendor_id,
+        technician_name=technician_name,
+    )
+    vendor_names = dict(Vendor.objects.values_list("id", "name"))
+    for proposal in plan["scheduled"] + plan["unscheduled"]:
+        proposal["vendor_name"] = vendor_names.get(proposal["vendor_id"], "")
 
     context = {
-        "maintenance": maintenance,
         "gym": gym,
         "gym_id": gym_id,
+        "vendors": vendors,
+        "horizon_days": horizon_days,
+        "daily_capacity": daily_capacity,
+        "selected_vendor": vendor_id,
+        "technician_name": technician_name,
+        "today": timezone.localdate(),
+        **plan,
     }
 
-    return render(request, "inventory_management/update_maintenance.html", context)
+    return render(request, "inventory_management/maintenance_planner.html", context)
 
 
 # Inventory Views
@@ -1273,14 +1331,10 @@ def inventory_list(request, gym_id=None):
 
     inventory_items = InventoryItem.objects.filter(gym=gym, is_active=True)
 
-    # Search functionality
+    # Search functionality - full-text index (see search.py)
     search_query = request.GET.get("search")
     if search_query:
-        inventory_items = inventory_items.filter(
-            Q(name__icontains=search_query)
-            | Q(brand__icontains=search_query)
-            | Q(sku__icontains=search_query)
-        )
+        inventory_items = search_inventory_items(inventory_items, search_query)
 
     # Filter by category
     category_filter = request.GET.get("category")
@@ -1294,25 +1348,31 @@ def inventory_list(request, gym_id=None):
     elif stock_filter == "out_of_stock":
         inventory_items = inventory_items.filter(current_stock=0)
 
-    inventory_items = inventory_items.order_by("name")
+    inventory_items = inventory_items.select_related("category").order_by("name")
     categories = InventoryCategory.objects.all()
 
-    # Calculate statistics - 🔥 FIXED: Use F instead of models.F
-    total_value = sum(item.total_value for item in inventory_items)
-    low_stock_count = inventory_items.filter(
-        current_stock__lte=F("minimum_stock")
-    ).count()
+    # Calculate statistics in SQL - one aggregate over the filtered items
+    stats = inventory_items.aggregate(
+        total_items=Count("id"),
+        total_value=Sum(F("current_stock") * F("cost_price")),
+        low_stock_count=Count("id", filter=Q(current_stock__lte=F("minimum_stock"))),
+    )
+
+    paginator = Paginator(inventory_items, INVENTORY_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get("page"))
 
     context = {
-        "inventory_items": inventory_items,
+        "inventory_items": page_obj,
+        "page_obj": page_obj,
         "categories": categories,
         "gym": gym,
         "gym_id": gym_id,
         "search_query": search_query,
         "category_filter": category_filter,
         "stock_filter": stock_filter,
-        "total_value": total_value,
-        "low_stock_count": low_stock_count,
+        "total_items": stats["total_items"],
+        "total_value": stats["total_value"] or 0,
+        "low_stock_count": stats["low_stock_count"],
     }
 
     return render(request, "inventory_management/inventory_list.html", context)
@@ -1552,75 +1612,314 @@ def stock_transaction(request, gym_id, item_id):
 
     return render(request, "inventory_management/stock_transaction.html", context)
 
+@login_required
+def stock_transfer(request, gym_id):
+    """Transfer stock of several items from this gym to another gym"""
+    if request.user.user_type not in ["superadmin", "gymadmin"]:
+        messages.error(request, "Access denied!")
+        return redirect("login")
+
+    gym = get_object_or_404(Gym, id=gym_id)
+
+    # Destination gyms: any active gym for superadmin, own gyms for gymadmin
+    destination_gyms = Gym.objects.filter(is_active=True).exclude(id=gym.id)
+    if request.user.user_type == "gymadmin":
+        try:
+            gym_admin = GymAdmin.objects.get(user=request.user)
+            if gym not in gym_admin.gyms.all():
+                messages.error(request, "You do not have access to this gym!")
+                return redirect("gymadmin_home")
+            destination_gyms = destination_gyms.filter(id__in=gym_admin.gyms.values("id"))
+        except GymAdmin.DoesNotExist:
+            messages.error(request, "Access denied!")
+            return redirect("login")
+
+    items = (
+        InventoryItem.objects.filter(gym=gym, is_active=True, current_stock__gt=0)
+        .select_related("category")
+        .order_by("name")
+    )
+
+    if request.method == "POST":
+        to_gym_id = request.POST.get("to_gym", "").strip()
+        try:
+            if not to_gym_id.isdigit() or not destination_gyms.filter(id=to_gym_id).exists():
+                raise ValueError("Select a destination gym")
+
+            lines = []
+            for item in items:
+                value = request.POST.get(f"quantity_{item.id}", "").strip()
+                if value:
+                    try:
+                        lines.append((item.id, Decimal(value)))
+                    except InvalidOperation:
+                        raise ValueError(f"Invalid quantity for {item.name}")
+
+            reference, ledger = transfer_stock(
+                gym.id,
+                int(to_gym_id),
+                lines,
+                user=request.user,
+                notes=request.POST.get("notes", "").strip(),
+            )
+            messages.success(
+                request, f"Transfer {reference} completed: {len(ledger) // 2} item(s) moved."
+            )
+            return redirect("inventory:inventory_list", gym_id=gym_id)
+        except ValueError as e:
+            messages.error(request, f"Error transferring stock: {str(e)}")
+        except IntegrityError as e:
+            print(f"❌ Error in stock_transfer: {str(e)}")
+            messages.error(request, "Error transferring stock: the destination item could not be created (duplicate SKU).")
+
+    context = {
+        "gym": gym,
+        "gym_id": gym_id,
+        "items": items,
+        "destination_gyms": destination_gyms,
+        "selected_gym": request.POST.get("to_gym", ""),
+    }
+
+    return render(request, "inventory_management/stock_transfer.html", context)
+
+
+# Purchase Order Views
+@login_required
+def purchase_order_list(request, gym_id):
+    """List purchase orders; POST drafts new orders from auto-reorder items"""
+    if request.user.user_type not in ["superadmin", "gymadmin"]:
+        messages.error(request, "Access denied!")
+        return redirect("login")
+
+    gym = get_object_or_404(Gym, id=gym_id)
+
+    # Check access permissions for gymadmin
+    if request.user.user_type == "gymadmin":
+        try:
+            gym_admin = GymAdmin.objects.get(user=request.user)
+            if gym not in gym_admin.gyms.all():
+                messages.error(request, "You do not have access to this gym!")
+                return redirect("gymadmin_home")
+        except GymAdmin.DoesNotExist:
+            messages.error(request, "Access denied!")
+            return redirect("login")
+
+    if request.method == "POST":
+        try:
+            orders = generate_purchase_orders(gym.id, user=request.user)
+            if orders:
+                messages.success(request, f"Drafted {len(orders)} purchase order(s) from low-stock items.")
+            else:
+                messages.info(request, "No auto-reorder items need ordering right now.")
+        except Exception as e:
+            messages.error(request, f"Error generating purchase orders: {str(e)}")
+        return redirect("inventory:purchase_order_list", gym_id=gym_id)
+
+    purchase_orders = (
+        PurchaseOrder.objects.filter(gym=gym)
+        .select_related("vendor")
+        .annotate(line_count=Count("lines"))
+        .order_by("-created_at")
+    )
+
+    status_filter = request.GET.get("status")
+    if status_filter:
+        purchase_orders = purchase_orders.filter(status=status_filter)
+
+    paginator = Paginator(purchase_orders, PURCHASE_ORDER_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get("page"))
+
+    context = {
+        "gym": gym,
+        "gym_id": gym_id,
+        "purchase_orders": page_obj,
+        "page_obj": page_obj,
+        "status_filter": status_filter,
+        "status_choices": PurchaseOrder.STATUS_CHOICES,
+    }
+
+    return render(request, "inventory_management/purchase_order_list.html", context)
+
+
+@login_required
+def purchase_order_detail(request, gym_id, po_id):
+    """Purchase order detail; POST action=send|cancel|receive"""
+    if request.user.user_type not in ["superadmin", "gymadmin"]:
+        messages.error(request, "Access denied!")
+        return redirect("login")
+
+    gym = get_object_or_404(Gym, id=gym_id)
+    order = get_object_or_404(PurchaseOrder.objects.select_related("vendor"), id=po_id, gym=gym)
+
+    # Check access permissions for gymadmin
+    if request.user.user_type == "gymadmin":
+        try:
+            gym_admin = GymAdmin.objects.get(user=request.user)
+            if gym not in gym_admin.gyms.all():
+                messages.error(request, "You do not have access to this gym!")
+                return redirect("gymadmin_home")
+        except GymAdmin.DoesNotExist:
+            messages.error(request, "Access denied!")
+            return redirect("login")
+
+    lines = order.lines.select_related("item")
+
+    if request.method == "POST":
+        action = request.POST.get("action")
+        try:
+            if action == "send" and order.status == "draft":
+                order.status = "sent"
+                order.save(update_fields=["status", "updated_at"])
+                messages.success(request, f"{order.po_number} marked as sent to vendor.")
+
+            elif action == "cancel" and order.is_open:
+                order.status = "cancelled"
+                order.save(update_fields=["status", "updated_at"])
+                messages.success(request, f"{order.po_number} cancelled.")
+
+            elif action == "receive":
+                received_quantities = {}
+                for line in lines:
+                    value = request.POST.get(f"received_{line.id}", "").strip()
+                    if value:
+                        received_quantities[line.id] = Decimal(value)
+                receive_purchase_order(order, user=request.user, received_quantities=received_quantities)
+                messages.success(request, f"{order.po_number} received and stock updated.")
+
+            else:
+                messages.error(request, "Invalid action for this purchase order!")
+        except (InvalidOperation, ValueError) as e:
+            messages.error(request, f"Error updating purchase order: {str(e)}")
+
+        return redirect("inventory:purchase_order_detail", gym_id=gym_id, po_id=order.id)
+
+    context = {
+        "gym": gym,
+        "gym_id": gym_id,
+        "order": order,
+        "lines": lines,
+    }
+
+    return render(request, "inventory_management/purchase_order_detail.html", context)
+
+
 # Reports and Analytics Views
 @login_required
 def equipment_reports(request, gym_id):
     """Equipment reports and analytics"""
-    # Equipment by category
-    equipment_by_category = (
-        Equipment.objects.filter(gym=str(gym_id), is_active=True)
-        .values("category__name")
-        .annotate(count=Count("id"))
-    )
+    if request.user.user_type not in ["superadmin", "gymadmin"]:
+        messages.error(request, "Access denied!")
+        return redirect("login")
 
-    # Equipment by status
-    equipment_by_status = (
-        Equipment.objects.filter(gym=str(gym_id), is_active=True)
-        .values("status")
-        .annotate(count=Count("id"))
-    )
+    gym = get_object_or_404(Gym, id=gym_id)
 
-    # Maintenance costs by month (last 12 months)
-    from datetime import datetime
-    from dateutil.relativedelta import relativedelta
-
-    maintenance_costs = []
-    for i in range(12):
-        month_start = (datetime.now() - relativedelta(months=i)).replace(day=1)
-        month_end = (month_start + relativedelta(months=1)) - timedelta(days=1)
-
-        cost = (
-            MaintenanceRecord.objects.filter(
-                equipment__gym=str(gym_id),
-                actual_date__range=[month_start.date(), month_end.date()],
-                status="completed",
-            ).aggregate(total=Sum("total_cost"))["total"]
-            or 0
-        )
+    # Check access permissions for gymadmin
+    if request.user.user_type == "gymadmin":
+        try:
+            gym_admin = GymAdmin.objects.get(user=request.user)
+            if gym not in gym_admin.gyms.all():
+                messages.error(request, "You do not have access to this gym!")
+                return redirect("gymadmin_home")
+        except GymAdmin.DoesNotExist:
+            messages.error(request, "Access denied!")
+            return redirect("login")
 
-        maintenance_costs.append(
-            {"month": month_start.strftime("%b %Y"), "cost": float(cost)}
-        )
+    months = parse_report_months(request.GET.get("months"))
 
-    maintenance_costs.reverse()
+    # Book values, category totals and age bands - one query, valued in bulk
+    valuation = equipment_valuation(gym.id)
+    schedule = depreciation_schedule(gym.id)
+    status_summary = equipment_status_summary(gym.id)
 
-    # Top maintenance equipment
-    top_maintenance_equipment = (
-        Equipment.objects.filter(gym=str(gym_id))
-        .annotate(
-            maintenance_count=Count("maintenance_records"),
-            total_cost=Sum("maintenance_records__total_cost"),
-        )
-        .order_by("-total_cost")[:10]
+    # Completed maintenance per month - one grouped query, closed months cached
+    maintenance_costs = monthly_maintenance_costs(gym.id, months)
+    total_maintenance_cost = sum(month["cost"] for month in maintenance_costs)
+
+    # Equipment ranked by maintenance cost over the same months
+    range_start = maintenance_costs[0]["month_start"]
+    cost_by_equipment = maintenance_by_equipment(gym.id, range_start, timezone.localdate() + timedelta(days=1))
+    average_equipment_cost = (
+        sum(row["total_cost"] for row in cost_by_equipment) / len(cost_by_equipment)
+        if cost_by_equipment
+        else 0
     )
 
     context = {
+        "gym": gym,
         "gym_id": gym_id,
-        "equipment_by_category": list(equipment_by_category),
-        "equipment_by_status": list(equipment_by_status),
+        "months": months,
+        "month_presets": MONTH_PRESETS,
+        "valuation": valuation,
+        "depreciation_schedule": schedule,
+        "total_equipment": valuation["equipment_count"],
+        "total_equipment_value": valuation["total_current_value"],
+        "average_age": valuation["average_age"],
+        "age_analysis": valuation["age_analysis"],
+        "equipment_by_category": valuation["categories"],
         "maintenance_costs": maintenance_costs,
-        "top_maintenance_equipment": top_maintenance_equipment,
+        "total_maintenance_cost": total_maintenance_cost,
+        "monthly_avg_cost": total_maintenance_cost / months,
+        "top_maintenance_equipment": cost_by_equipment[:TOP_EQUIPMENT],
+        "high_maintenance_cost": sum(
+            1 for row in cost_by_equipment if row["total_cost"] > 2 * average_equipment_cost
+        ),
+        **status_summary,
     }
 
     return render(request, "inventory_management/equipment_reports.html", context)
 
 
+@login_required
+def equipment_reliability(request, gym_id):
+    """MTBF, MTTR, downtime and cost per uptime hour per equipment and category (?months=N)"""
+    if request.user.user_type not in ["superadmin", "gymadmin"]:
+        messages.error(request, "Access denied!")
+        return redirect("login")
+
+    gym = get_object_or_404(Gym, id=gym_id)
+
+    # Check access permissions for gymadmin
+    if request.user.user_type == "gymadmin":
+        try:
+            gym_admin = GymAdmin.objects.get(user=request.user)
+            if gym not in gym_admin.gyms.all():
+                messages.error(request, "You do not have access to this gym!")
+                return redirect("gymadmin_home")
+        except GymAdmin.DoesNotExist:
+            messages.error(request, "Access denied!")
+            return redirect("login")
+
+    report = get_reliability_report(gym.id, parse_window_months(request.GET.get("months")))
+
+    equipment_rows = report["equipment"]
+    if request.GET.get("replace") == "1":
+        equipment_rows = [row for row in equipment_rows if row["replace"]]
+
+    page_obj = Paginator(equipment_rows, RELIABILITY_PAGE_SIZE).get_page(request.GET.get("page"))
+
+    context = {
+        "gym": gym,
+        "gym_id": gym_id,
+        "window_presets": WINDOW_PRESETS,
+        "replace_only": request.GET.get("replace") == "1",
+        "page_obj": page_obj,
+        "replace_cost_ratio": REPLACE_COST_RATIO * 100,
+        **report,
+    }
+
+    return render(request, "inventory_management/equipment_reliability.html", context)
+
+
 # Fixed Inventory Reports View - Replace your existing inventory_reports function
 
 
 @login_required
 def inventory_reports(request, gym_id):
-    """Inventory reports and analytics"""
+    """Inventory reports and analytics over a date range (?days=N or ?start=&end=)"""
+    if request.user.user_type not in ["superadmin", "gymadmin"]:
+        messages.error(request, "Access denied!")
+        return redirect("login")
+
     gym = get_object_or_404(Gym, id=gym_id)
 
     # Check access permissions for gymadmin
@@ -1634,65 +1933,15 @@ def inventory_reports(request, gym_id):
             messages.error(request, "Access denied!")
             return redirect("login")
 
-    # Stock value by category - 🔥 FIXED: Proper aggregation calculation
-    inventory_by_category = (
-        InventoryItem.objects.filter(gym=gym, is_active=True)
-        .values("category__name")
-        .annotate(
-            total_items=Count("id"),
-            total_stock=Sum("current_stock"),
-            avg_cost=Sum("cost_price") / Count("id"),
-            total_value=Sum(F("current_stock") * F("cost_price")),
-        )
-    )
-
-    # Low stock items - 🔥 FIXED: Use F instead of models.F
-    low_stock_items = InventoryItem.objects.filter(
-        gym=gym, current_stock__lte=F("minimum_stock"), is_active=True
-    ).order_by("current_stock")
-
-    # Fast moving items (based on transactions)
-    fast_moving_items = (
-        InventoryItem.objects.filter(gym=gym, is_active=True)
-        .annotate(transaction_count=Count("transactions"))
-        .order_by("-transaction_count")[:10]
-    )
-
-    # Stock transactions by type (last 30 days)
-    thirty_days_ago = date.today() - timedelta(days=30)
-    transaction_summary = (
-        StockTransaction.objects.filter(
-            item__gym=gym, transaction_date__gte=thirty_days_ago
-        )
-        .values("transaction_type")
-        .annotate(total_quantity=Sum("quantity"), total_amount=Sum("total_amount"))
-    )
-
-    # Calculate overall statistics
-    total_inventory_value = (
-        InventoryItem.objects.filter(gym=gym, is_active=True).aggregate(
-            total=Sum(F("current_stock") * F("cost_price"))
-        )["total"]
-        or 0
+    start_date, end_date = parse_report_range(
+        request.GET.get("start"), request.GET.get("end"), request.GET.get("days")
     )
 
-    total_items = InventoryItem.objects.filter(gym=gym, is_active=True).count()
-    low_stock_count = low_stock_items.count()
-    out_of_stock_count = InventoryItem.objects.filter(
-        gym=gym, current_stock=0, is_active=True
-    ).count()
-
     context = {
         "gym": gym,
         "gym_id": gym_id,
-        "inventory_by_category": list(inventory_by_category),
-        "low_stock_items": low_stock_items,
-        "fast_moving_items": fast_moving_items,
-        "transaction_summary": list(transaction_summary),
-        "total_inventory_value": total_inventory_value,
-        "total_items": total_items,
-        "low_stock_count": low_stock_count,
-        "out_of_stock_count": out_of_stock_count,
+        "range_presets": RANGE_PRESETS,
+        **get_inventory_report(gym.id, start_date, end_date),
     }
 
     return render(request, "inventory_management/inventory_reports.html", context)
@@ -1724,15 +1973,22 @@ def alerts_view(request, gym_id=None):
             messages.error(request, "Access denied!")
             return redirect("login")
 
-    # Get all unresolved alerts for this gym
-    alerts = StockAlert.objects.filter(
-        Q(equipment__gym=gym) | Q(inventory_item__gym=gym), is_resolved=False
-    ).order_by("-created_at")
+    gym_alerts = StockAlert.objects.filter(gym=gym)
+
+    # Statistics for the whole gym in one query, independent of the filters
+    today_start = timezone.make_aware(datetime.combine(timezone.localdate(), datetime.min.time()))
+    counts = gym_alerts.aggregate(
+        total_count=Count("id", filter=Q(is_resolved=False)),
+        critical_count=Count("id", filter=Q(is_resolved=False, priority="critical")),
+        high_count=Count("id", filter=Q(is_resolved=False, priority="high")),
+        resolved_today=Count("id", filter=Q(is_resolved=True, resolved_at__gte=today_start)),
+    )
 
-    # Debug: Print alert IDs
-    print(f"🔍 Debug - Found {alerts.count()} alerts:")
-    for alert in alerts:
-        print(f"  - Alert ID: {alert.id}, Title: {alert.title}")
+    alerts = (
+        gym_alerts.filter(is_resolved=False)
+        .select_related("equipment", "inventory_item")
+        .order_by("-created_at")
+    )
 
     # Filter by priority
     priority_filter = request.GET.get("priority")
@@ -1744,38 +2000,106 @@ def alerts_view(request, gym_id=None):
     if type_filter:
         alerts = alerts.filter(alert_type=type_filter)
 
-    # Calculate statistics
-    all_alerts = StockAlert.objects.filter(
-        Q(equipment__gym=gym) | Q(inventory_item__gym=gym), is_resolved=False
-    )
-
-    critical_count = all_alerts.filter(priority="critical").count()
-    high_count = all_alerts.filter(priority="high").count()
-
-    # Resolved today count
-    from datetime import datetime
-
-    today = datetime.now().date()
-    resolved_today = StockAlert.objects.filter(
-        Q(equipment__gym=gym) | Q(inventory_item__gym=gym),
-        is_resolved=True,
-        resolved_at__date=today,
-    ).count()
+    paginator = Paginator(alerts, ALERT_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get("page"))
 
     context = {
         "gym": gym,
         "gym_id": gym_id,
-        "alerts": alerts,
+        "alerts": page_obj,
+        "page_obj": page_obj,
         "priority_filter": priority_filter,
         "type_filter": type_filter,
-        "critical_count": critical_count,
-        "high_count": high_count,
-        "resolved_today": resolved_today,
+        "alerts_cursor": alert_stream.cursor_for(timezone.now()),
+        **counts,
     }
 
     return render(request, "inventory_management/alerts.html", context)
 
 
+def _user_can_access_gym(user, gym_id):
+    """Same rule as the views above: superadmin sees every gym, gymadmin only their own"""
+    if user.user_type == "superadmin":
+        return Gym.objects.filter(id=gym_id).exists()
+    if user.user_type == "gymadmin":
+        return GymAdmin.objects.filter(user=user, gyms__id=gym_id).exists()
+    return False
+
+
+def _sse_message(payload):
+    return f"id: {payload['cursor']}\nevent: {payload['event']}\ndata: {json.dumps(payload)}\n\n"
+
+
+async def _alert_event_stream(gym_id, since):
+    with alert_stream.subscribe(gym_id) as queue:
+        # Time of the last database read - events of other worker processes after it are pending
+        checked_at = timezone.now()
+        if since:
+            for payload in await sync_to_async(alert_stream.events_since)(gym_id, since):
+                yield _sse_message(payload)
+
+        while True:
+            try:
+                events = [await asyncio.wait_for(queue.get(), timeout=alert_stream.HEARTBEAT_SECONDS)]
+                while not queue.empty():
+                    events.append(queue.get_nowait())
+            except asyncio.TimeoutError:
+                # Alerts written by other worker processes only reach us through the database
+                read_at = timezone.now()
+                events = await sync_to_async(alert_stream.events_since)(gym_id, checked_at)
+                checked_at = read_at
+
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+
+            for payload in events:
+                yield _sse_message(payload)
+
+            counts = await sync_to_async(alert_stream.alert_counts)(gym_id)
+            # Resume point for Last-Event-ID: nothing from the database is known to be seen after checked_at
+            yield _sse_message({"event": "counts", "cursor": alert_stream.cursor_for(checked_at), **counts})
+
+
+@login_required
+async def alert_stream_view(request, gym_id):
+    """Server-sent events for the gym's alerts (ASGI only - WSGI clients get 204 and poll)"""
+    user = await request.auser()
+    if not await sync_to_async(_user_can_access_gym)(user, gym_id):
+        return JsonResponse({"success": False, "error": "Access denied"}, status=403)
+
+    # A WSGI worker would tie up a thread per open stream; 204 tells EventSource
+    # to stop reconnecting so the page falls back to polling alert_events
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    since = alert_stream.parse_cursor(request.headers.get("Last-Event-ID") or request.GET.get("since"))
+    response = StreamingHttpResponse(
+        _alert_event_stream(gym_id, since), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+def alert_events(request, gym_id):
+    """Polling fallback: alert events after the `since` cursor plus current counts"""
+    if not _user_can_access_gym(request.user, gym_id):
+        return JsonResponse({"success": False, "error": "Access denied"}, status=403)
+
+    now = timezone.now()
+    since = alert_stream.parse_cursor(request.GET.get("since"))
+    events = alert_stream.events_since(gym_id, since) if since else []
+
+    return JsonResponse({
+        "success": True,
+        "cursor": alert_stream.cursor_for(now),
+        "events": events,
+        "counts": alert_stream.alert_counts(gym_id),
+    })
+
+
 @login_required
 def resolve_alert(request, gym_id, alert_id):  # 🔥 FIXED: Added gym_id parameter
     """Mark alert as resolved"""
@@ -1785,27 +2109,8 @@ def resolve_alert(request, gym_id, alert_id):  # 🔥 FIXED: Added gym_id parame
 
     gym = get_object_or_404(Gym, id=gym_id)
 
-    try:
-        alert = get_object_or_404(StockAlert, id=alert_id)
-        print(f"🔍 Debug - Found alert: {alert.id} - {alert.title}")
-    except:
-        print(f"🔍 Debug - Alert with ID {alert_id} not found")
-        messages.error(request, "Alert not found!")
-        return redirect("inventory:alerts_view", gym_id=gym_id)
-
-    # Verify alert belongs to this gym
-    alert_belongs_to_gym = False
-    if alert.equipment and alert.equipment.gym == gym:
-        alert_belongs_to_gym = True
-        print(f"🔍 Debug - Alert belongs to gym via equipment: {alert.equipment.name}")
-    elif alert.inventory_item and alert.inventory_item.gym == gym:
-        alert_belongs_to_gym = True
-        print(
-            f"🔍 Debug - Alert belongs to gym via inventory: {alert.inventory_item.name}"
-        )
-
-    if not alert_belongs_to_gym:
-        print(f"🔍 Debug - Alert does not belong to gym {gym.name}")
+    alert = StockAlert.objects.filter(id=alert_id, gym=gym).first()
+    if alert is None:
         messages.error(request, "Alert not found!")
         return redirect("inventory:alerts_view", gym_id=gym_id)
 
@@ -1813,9 +2118,8 @@ def resolve_alert(request, gym_id, alert_id):  # 🔥 FIXED: Added gym_id parame
     alert.is_resolved = True
     alert.resolved_by = request.user
     alert.resolved_at = timezone.now()
-    alert.save()
+    alert.save(update_fields=["is_resolved", "resolved_by", "resolved_at"])
 
-    print(f"🔍 Debug - Alert {alert.id} marked as resolved")
     messages.success(request, f'Alert "{alert.title}" marked as resolved!')
     return redirect("inventory:alerts_view", gym_id=gym_id)
 
@@ -1829,27 +2133,9 @@ def mark_alert_as_read(request, gym_id, alert_id):
     ]:
         try:
             gym = get_object_or_404(Gym, id=gym_id)
-            alert = get_object_or_404(StockAlert, id=alert_id)
-
-            print(f"🔍 Debug - Marking alert as read: {alert.id} - {alert.title}")
-
-            # Verify alert belongs to this gym
-            alert_belongs_to_gym = False
-            if alert.equipment and alert.equipment.gym == gym:
-                alert_belongs_to_gym = True
-            elif alert.inventory_item and alert.inventory_item.gym == gym:
-                alert_belongs_to_gym = True
-
-            if alert_belongs_to_gym:
-                alert.is_read = True
-                alert.save()
-                print(f"🔍 Debug - Alert {alert.id} marked as read successfully")
+            updated = StockAlert.objects.filter(id=alert_id, gym=gym).update(is_read=True, updated_at=timezone.now())
+            if updated:
                 return JsonResponse({"success": True})
-            else:
-                print(f"🔍 Debug - Alert {alert.id} does not belong to gym {gym.name}")
-                return JsonResponse({"success": False, "error": "Alert not found"})
-        except StockAlert.DoesNotExist:
-            print(f"🔍 Debug - Alert with ID {alert_id} does not exist")
             return JsonResponse({"success": False, "error": "Alert not found"})
         except Exception as e:
             print(f"🔍 Debug - Error marking alert as read: {str(e)}")
@@ -1870,10 +2156,10 @@ def mark_all_alerts_as_read(request, gym_id):
 
             # Mark all unread alerts as read for this gym
             updated_count = StockAlert.objects.filter(
-                Q(equipment__gym=gym) | Q(inventory_item__gym=gym),
-                is_resolved=False,
-                is_read=False,
-            ).update(is_read=True)
+                gym=gym, is_resolved=False, is_read=False
+            ).update(is_read=True, updated_at=timezone.now())
+            if updated_count:
+                alert_stream.publish(gym.id, "refresh")
 
             print(
                 f"🔍 Debug - Marked {updated_count} alerts as read for gym {gym.name}"
@@ -1897,13 +2183,14 @@ def resolve_all_alerts(request, gym_id):
             gym = get_object_or_404(Gym, id=gym_id)
 
             # Resolve all active alerts for this gym
-            alerts = StockAlert.objects.filter(
-                Q(equipment__gym=gym) | Q(inventory_item__gym=gym), is_resolved=False
-            )
+            alerts = StockAlert.objects.filter(gym=gym, is_resolved=False)
 
+            now = timezone.now()
             updated_count = alerts.update(
-                is_resolved=True, resolved_by=request.user, resolved_at=timezone.now()
+                is_resolved=True, resolved_by=request.user, resolved_at=now, updated_at=now
             )
+            if updated_count:
+                alert_stream.publish(gym.id, "refresh")
 
             print(f"🔍 Debug - Resolved {updated_count} alerts for gym {gym.name}")
             return JsonResponse({"success": True, "updated_count": updated_count})
@@ -1958,6 +2245,44 @@ def get_inventory_item_data(request, item_id):
     return JsonResponse(data)
 
 
+@login_required
+def lookup_inventory_code(request, gym_id):
+    """AJAX point-of-sale lookup: resolve a scanned barcode/SKU to item, price and stock"""
+    if request.user.user_type not in ["superadmin", "gymadmin"]:
+        return JsonResponse({"success": False, "error": "Access denied"}, status=403)
+
+    # Single EXISTS query - the scan path must stay in the low milliseconds
+    if request.user.user_type == "gymadmin" and not GymAdmin.objects.filter(
+        user=request.user, gyms__id=gym_id
+    ).exists():
+        return JsonResponse({"success": False, "error": "Access denied"}, status=403)
+
+    code = request.GET.get("code", "").strip()
+    if not code:
+        return JsonResponse({"success": False, "error": "No code given"}, status=400)
+
+    entry = barcode_index.lookup(gym_id, code)
+    if entry is None:
+        return JsonResponse({"success": False, "error": "Item not found"}, status=404)
+
+    data = {
+        "success": True,
+        "item": {
+            "id": entry["id"],
+            "name": entry["name"],
+            "sku": entry["sku"],
+            "barcode": entry["barcode"],
+            "unit": entry["unit"],
+        },
+        "selling_price": float(entry["selling_price"]),
+        "cost_price": float(entry["cost_price"]),
+        "current_stock": float(entry["current_stock"]),
+        "is_low_stock": entry["current_stock"] <= entry["minimum_stock"],
+    }
+
+    return JsonResponse(data)
+
+
 # inventory_management/views.py में add करें:
 
 @login_required
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class MultipleGymConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'multiple_gym'
+
+    def ready(self):
+        from . import thumbnails
+
+        thumbnails.connect_signals()
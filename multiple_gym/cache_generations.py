@@ -0,0 +1,47 @@
+# multiple_gym/cache_generations.py
+"""
+Generation numbers for cached reports and feeds.
+
+A cached value of some scope (a gym's inventory report, a trainer's
+calendar) puts the scope's current generation in its cache key.
+bump_generation() moves the generation on whenever the underlying data
+changes, so every entry cached under the old one is missed from then on
+and simply expires - nothing has to track which keys exist.
+
+New generations are seeded from the clock, so a generation evicted from
+the cache never comes back as a number an old entry (or an ETag handed
+to a browser) was stored under.
+
+Generations live in the default cache. They invalidate across worker
+processes only when CACHES points at a cache the processes share.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def _generation_key(namespace, scope_id):
+    return f"{namespace}:generation:{scope_id}"
+
+
+def _new_generation():
+    return time.time_ns()
+
+
+def current_generation(namespace, scope_id):
+    """The scope's generation, starting one if it has none"""
+    key = _generation_key(namespace, scope_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _new_generation(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(namespace, scope_id):
+    """Make everything cached under the scope's current generation stale"""
+    key = _generation_key(namespace, scope_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_generation(), None)
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from multiple_gym import thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG variants for uploaded images that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate existing variants too')
+        parser.add_argument('--workers', type=int, default=thumbnails.THUMBNAIL_WORKERS,
+                            help='Images processed in parallel')
+
+    def handle(self, *args, **options):
+        pending = []
+        for label, fields in thumbnails.THUMBNAIL_FIELDS.items():
+            model = apps.get_model(label)
+            for field in fields:
+                storage = model._meta.get_field(field).storage
+                names = (
+                    model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                    .values_list(field, flat=True).distinct()
+                )
+                for name in names:
+                    fieldfile = getattr(model(**{field: name}), field)
+                    if options['force'] or not thumbnails.has_variants(fieldfile):
+                        pending.append((storage, name))
+
+        if not pending:
+            self.stdout.write("All images already have their variants.")
+            return
+
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as executor:
+            futures = {
+                executor.submit(thumbnails.generate_variants, storage, name): name
+                for storage, name in pending
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    done += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"❌ {futures[future]}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated variants for {done} image(s)" + (f", {failed} failed." if failed else ".")
+        ))
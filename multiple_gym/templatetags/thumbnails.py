@@ -0,0 +1,42 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from multiple_gym import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail_url(fieldfile, variant="thumb", extension="jpg"):
+    """URL of a resized variant, or of the original until the variant exists"""
+    if not fieldfile:
+        return ""
+    if thumbnails.has_variants(fieldfile):
+        return fieldfile.storage.url(thumbnails.variant_name(fieldfile.name, variant, extension))
+    thumbnails.queue_variants(fieldfile)
+    return fieldfile.url
+
+
+@register.simple_tag
+def thumbnail(fieldfile, variant="thumb", **attrs):
+    """
+    <picture> with the WebP variant and a JPEG <img> fallback. Extra keyword
+    arguments become <img> attributes:
+    {% thumbnail member.photo "thumb" class="rounded-circle" alt=member.full_name %}
+    """
+    if not fieldfile:
+        return ""
+
+    attrs.setdefault("loading", "lazy")
+    if not thumbnails.has_variants(fieldfile):
+        thumbnails.queue_variants(fieldfile)
+        return format_html("<img src=\"{}\"{}>", fieldfile.url, flatatt(attrs))
+
+    storage = fieldfile.storage
+    return format_html(
+        "<picture><source type=\"image/webp\" srcset=\"{}\"><img src=\"{}\"{}></picture>",
+        storage.url(thumbnails.variant_name(fieldfile.name, variant, "webp")),
+        storage.url(thumbnails.variant_name(fieldfile.name, variant, "jpg")),
+        flatatt(attrs),
+    )
@@ -0,0 +1,160 @@
+# multiple_gym/thumbnails.py
+"""
+Resized variants of uploaded images.
+
+Every image field in THUMBNAIL_FIELDS gets, for each size in VARIANTS, a
+WebP and a JPEG copy stored next to the original under a deterministic
+name: member_photos/jane.jpg -> member_photos/jane.thumb.webp and
+member_photos/jane.thumb.jpg. They are generated in a small thread pool
+after the upload is committed, so saving a model never waits on Pillow.
+
+Templates use the `thumbnails` tag library, which renders a <picture>
+with the WebP variant for browsers that accept it and the JPEG otherwise,
+and falls back to the original (queueing the variants) while they don't
+exist yet. `manage.py generate_thumbnails` backfills existing uploads.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps
+
+
+# Longest side in pixels
+VARIANTS = {
+    "thumb": 160,
+    "medium": 480,
+}
+
+FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+THUMBNAIL_FIELDS = {
+    "multiple_gym.Member": ["photo"],
+    "trainer_management.Trainer": ["photo"],
+    "inventory_management.Equipment": ["image"],
+    "inventory_management.EquipmentCategory": ["icon"],
+    "inventory_management.MaintenanceRecord": ["before_images", "after_images"],
+}
+
+THUMBNAIL_WORKERS = getattr(settings, "THUMBNAIL_WORKERS", 2)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Originals whose variants are known to exist, so templates skip the storage check
+_ready = set()
+_queued = set()
+
+
+def variant_name(name, variant, extension):
+    """Storage name of a variant: photos/jane.jpg -> photos/jane.thumb.webp"""
+    root, _ = os.path.splitext(name)
+    return f"{root}.{variant}.{extension}"
+
+
+def variant_names(name):
+    return [
+        variant_name(name, variant, extension)
+        for variant in VARIANTS
+        for extension in FORMATS
+    ]
+
+
+def _executor_instance():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix="thumbnails")
+        return _executor
+
+
+def _save(storage, name, content):
+    # Deterministic names: replace rather than let the storage pick a new one
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content))
+
+
+def generate_variants(storage, name):
+    """Write every variant of the stored image `name`. Returns the number written."""
+    with storage.open(name, "rb") as original:
+        image = Image.open(original)
+        image.load()
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "L"):
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background.paste(image, mask=image.getchannel("A"))
+        else:
+            background.paste(image.convert("RGB"))
+        image = background
+
+    written = 0
+    for variant, size in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+        for extension, options in FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, **options)
+            _save(storage, variant_name(name, variant, extension), buffer.getvalue())
+            written += 1
+
+    _ready.add(name)
+    return written
+
+
+def _generate(storage, name):
+    try:
+        generate_variants(storage, name)
+    except Exception as e:
+        print(f"❌ Error generating thumbnails for {name}: {str(e)}")
+    finally:
+        _queued.discard(name)
+
+
+def queue_variants(fieldfile):
+    """Generate the variants of an uploaded file in the worker pool (once per name at a time)"""
+    if not fieldfile or not fieldfile.name or fieldfile.name in _queued:
+        return
+    _queued.add(fieldfile.name)
+    _executor_instance().submit(_generate, fieldfile.storage, fieldfile.name)
+
+
+def has_variants(fieldfile):
+    """True when the variants of the file exist - checked on storage once per process"""
+    if fieldfile.name in _ready:
+        return True
+    if all(fieldfile.storage.exists(name) for name in variant_names(fieldfile.name)):
+        _ready.add(fieldfile.name)
+        return True
+    return False
+
+
+def _queue_after_upload(sender, instance, update_fields=None, **kwargs):
+    for field in THUMBNAIL_FIELDS[sender._meta.label]:
+        if update_fields is not None and field not in update_fields:
+            continue
+        fieldfile = getattr(instance, field)
+        if fieldfile and not has_variants(fieldfile):
+            transaction.on_commit(lambda fieldfile=fieldfile: queue_variants(fieldfile))
+
+
+def connect_signals():
+    """Queue variant generation whenever a model in THUMBNAIL_FIELDS is saved with a new image"""
+    for label in THUMBNAIL_FIELDS:
+        post_save.connect(
+            _queue_after_upload,
+            sender=apps.get_model(label),
+            dispatch_uid=f"thumbnails:{label}",
+        )
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class TrainerManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'trainer_management'
+
+    def ready(self):
+        try:
+            import trainer_management.signals
+            print("✅ Trainer management signals loaded successfully")
+        except ImportError as e:
+            print(f"❌ Error loading signals: {e}")
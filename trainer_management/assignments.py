@@ -0,0 +1,69 @@
+# trainer_management/assignments.py
+"""
+Assigning members to a trainer as set operations.
+
+assign_members() validates every selected member id against the gym with
+one query and reads the trainer's active assignments of those members
+with another. Members already assigned with the same type, goals and
+notes keep their assignment (and its date). The trainer's other active
+assignments of the selected members are deactivated with one UPDATE, and
+the missing ones are inserted with one bulk_create, so reassigning a
+departing trainer's 150 members is a handful of queries instead of
+several hundred. Assignments to other trainers are left alone.
+"""
+from django.db import transaction
+
+from multiple_gym.models import Member
+
+from .enrollment import parse_member_ids
+from .models import MemberTrainerAssignment
+
+
+def assign_members(trainer, member_ids, assignment_type='fitness', goals='', notes='', created_by=None):
+    """
+    Make each of `member_ids` actively assigned to `trainer` with the
+    given details. Nothing is written when any id is not a member of the
+    trainer's gym. Returns a report dict: created, unchanged and
+    deactivated (counts) and invalid (the rejected ids).
+    """
+    member_ids = parse_member_ids(member_ids)
+    report = {'created': 0, 'unchanged': 0, 'deactivated': 0, 'invalid': []}
+
+    valid_ids = set(Member.objects.filter(id__in=member_ids, gym_id=trainer.gym_id).values_list('id', flat=True))
+    report['invalid'] = [member_id for member_id in member_ids if member_id not in valid_ids]
+    if report['invalid'] or not member_ids:
+        return report
+
+    wanted = (assignment_type, goals, notes)
+    with transaction.atomic():
+        current = MemberTrainerAssignment.objects.filter(
+            trainer=trainer, member_id__in=member_ids, is_active=True
+        ).values_list('id', 'member_id', 'assignment_type', 'goals', 'notes')
+
+        # Keep one matching assignment per member; every other active one is replaced
+        kept_members, to_deactivate = set(), []
+        for assignment_id, member_id, *details in current:
+            if tuple(details) == wanted and member_id not in kept_members:
+                kept_members.add(member_id)
+            else:
+                to_deactivate.append(assignment_id)
+
+        if to_deactivate:
+            report['deactivated'] = MemberTrainerAssignment.objects.filter(id__in=to_deactivate).update(is_active=False)
+
+        new_assignments = MemberTrainerAssignment.objects.bulk_create([
+            MemberTrainerAssignment(
+                member_id=member_id,
+                trainer=trainer,
+                assignment_type=assignment_type,
+                goals=goals,
+                notes=notes,
+                created_by=created_by,
+            )
+            for member_id in member_ids
+            if member_id not in kept_members
+        ])
+
+    report['created'] = len(new_assignments)
+    report['unchanged'] = len(kept_members)
+    return report
@@ -0,0 +1,119 @@
+# trainer_management/attendance.py
+"""
+Session attendance in bulk.
+
+A group class has 30-40 participants; marking them used to cost a
+get_or_create plus two saves each. Here the enrolled participants (with
+their members) and the session's existing SessionAttendance rows are read
+with one query each, the form is applied in memory, and both tables are
+written with one bulk_create/bulk_update each inside a single transaction.
+
+The form fields are per member id: present_<id> ("on" when present) and,
+for present members, exercises_, sets_, reps_, weight_, energy_,
+satisfaction_ and notes_. As before, absent members only lose their
+present mark - their performance data is kept.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SessionAttendance, SessionParticipant
+
+
+ATTENDANCE_UPDATE_FIELDS = [
+    "trainer",
+    "marked_present",
+    "check_in_time",
+    "exercises_completed",
+    "sets_completed",
+    "reps_completed",
+    "weight_lifted",
+    "member_energy_level",
+    "trainer_notes",
+    "member_satisfaction",
+    "updated_at",
+]
+
+
+def enrolled_participants(session):
+    return list(
+        session.participants.filter(is_enrolled=True)
+        .select_related("member__user")
+    )
+
+
+def attendance_by_member(session):
+    """The session's SessionAttendance rows keyed by member id"""
+    return {
+        attendance.member_id: attendance
+        for attendance in SessionAttendance.objects.filter(session=session)
+    }
+
+
+def _apply_performance(attendance, data, member_id):
+    attendance.exercises_completed = data.get(f"exercises_{member_id}", "")
+    attendance.sets_completed = int(data.get(f"sets_{member_id}", 0) or 0)
+    attendance.reps_completed = int(data.get(f"reps_{member_id}", 0) or 0)
+
+    weight_lifted = data.get(f"weight_{member_id}")
+    if weight_lifted:
+        attendance.weight_lifted = Decimal(str(weight_lifted))
+
+    attendance.member_energy_level = data.get(f"energy_{member_id}", "")
+    attendance.trainer_notes = data.get(f"notes_{member_id}", "")
+
+    satisfaction = data.get(f"satisfaction_{member_id}")
+    if satisfaction:
+        attendance.member_satisfaction = int(satisfaction)
+
+
+def save_attendance(session, data, session_notes=None):
+    """
+    Mark attendance of every enrolled participant from the form `data` and
+    complete the session, all in one transaction. Invalid numbers raise
+    ValueError (or decimal.InvalidOperation) before anything is written.
+    Returns the number of participants marked present.
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        participants = enrolled_participants(session)
+        existing = attendance_by_member(session)
+
+        to_create, to_update = [], []
+        present_count = 0
+        for participant in participants:
+            member_id = participant.member_id
+            was_present = data.get(f"present_{member_id}") == "on"
+
+            attendance = existing.get(member_id)
+            if attendance is None:
+                attendance = SessionAttendance(session=session, member_id=member_id)
+                to_create.append(attendance)
+            else:
+                to_update.append(attendance)
+
+            attendance.trainer_id = session.trainer_id
+            attendance.marked_present = was_present
+            attendance.updated_at = now
+            if was_present:
+                present_count += 1
+                if not attendance.check_in_time:
+                    attendance.check_in_time = now
+                _apply_performance(attendance, data, member_id)
+
+            participant.attended = was_present
+            participant.attendance_marked_at = now
+
+        SessionAttendance.objects.bulk_create(to_create)
+        SessionAttendance.objects.bulk_update(to_update, ATTENDANCE_UPDATE_FIELDS)
+        SessionParticipant.objects.bulk_update(participants, ["attended", "attendance_marked_at"])
+
+        # Update session status if not already completed
+        if session.status != "completed":
+            session.status = "completed"
+            session.post_session_notes = session_notes or ""
+            session.save(update_fields=["status", "post_session_notes", "updated_at"])
+
+    return present_count
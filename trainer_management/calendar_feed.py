@@ -0,0 +1,120 @@
+# trainer_management/calendar_feed.py
+"""
+The trainer's session calendar as a cached JSON feed.
+
+A calendar view asks for one date range at a time (start/end query
+parameters, dates or ISO datetimes) and asks again on every navigation.
+The events of a range come from one query on the (trainer, session_date)
+index with the enrolled participant count annotated, and the serialized
+feed is cached per trainer and range. Saving or deleting any of the
+trainer's sessions, or changing an enrollment, bumps the trainer's cache
+generation; the generation is also the feed's ETag, so a browser holding
+the current feed gets a 304 without the feed being read at all.
+"""
+import json
+from datetime import date
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Q
+from django.urls import reverse
+
+from multiple_gym.cache_generations import bump_generation, current_generation
+from .models import TrainingSession
+
+
+CALENDAR_CACHE_TTL = 15 * 60
+
+# Longest range one request may ask for (a year view)
+MAX_CALENDAR_DAYS = 366
+
+STATUS_COLORS = {
+    'scheduled': '#007bff',
+    'active': '#28a745',
+    'completed': '#6c757d',
+    'cancelled': '#dc3545',
+    'rescheduled': '#ffc107',
+}
+DEFAULT_COLOR = '#007bff'
+
+
+def invalidate_session_calendar(trainer_id):
+    """Make every cached calendar range of the trainer stale"""
+    bump_generation("session_calendar", trainer_id)
+
+
+def parse_calendar_range(start, end):
+    """
+    The (start, end) dates of the start/end query parameters, both inclusive.
+    Raises ValueError when either is missing or invalid, or the range is
+    reversed or longer than MAX_CALENDAR_DAYS.
+    """
+    if not start or not end:
+        raise ValueError("start and end are required")
+
+    # Calendar widgets send ISO datetimes ("2024-05-01T00:00:00+05:30"); only the date counts
+    start_date = date.fromisoformat(start[:10])
+    end_date = date.fromisoformat(end[:10])
+
+    if end_date < start_date:
+        raise ValueError("end is before start")
+    if (end_date - start_date).days > MAX_CALENDAR_DAYS:
+        raise ValueError(f"ranges are limited to {MAX_CALENDAR_DAYS} days")
+    return start_date, end_date
+
+
+def _feed_tag(trainer_id, start_date, end_date):
+    generation = current_generation("session_calendar", trainer_id)
+    return f"{trainer_id}-{generation}-{start_date:%Y%m%d}-{end_date:%Y%m%d}"
+
+
+def calendar_etag(trainer_id, start_date, end_date):
+    return f'"{_feed_tag(trainer_id, start_date, end_date)}"'
+
+
+def calendar_events(trainer_id, start_date, end_date):
+    """The trainer's sessions dated in the range, as calendar events"""
+    sessions = (
+        TrainingSession.objects.filter(trainer_id=trainer_id, session_date__range=(start_date, end_date))
+        .order_by('session_date', 'start_time')
+        .annotate(participant_count=Count('participants', filter=Q(participants__is_enrolled=True)))
+        .values(
+            'id', 'title', 'session_date', 'start_time', 'end_time',
+            'status', 'location', 'participant_count',
+        )
+    )
+
+    events = []
+    for session in sessions:
+        color = STATUS_COLORS.get(session['status'], DEFAULT_COLOR)
+        events.append({
+            'id': session['id'],
+            'title': session['title'],
+            'start': f"{session['session_date']}T{session['start_time']}",
+            'end': f"{session['session_date']}T{session['end_time']}",
+            'backgroundColor': color,
+            'borderColor': color,
+            'url': reverse('trainer_management:session_detail', args=[session['id']]),
+            'extendedProps': {
+                'status': session['status'],
+                'participants': session['participant_count'],
+                'location': session['location'],
+            },
+        })
+    return events
+
+
+def calendar_feed(trainer_id, start_date, end_date):
+    """
+    (etag, body) of the trainer's feed for the range; body is the JSON
+    document, built and cached on the first request of each generation.
+    """
+    tag = _feed_tag(trainer_id, start_date, end_date)
+    cache_key = f"session_calendar:feed:{tag}"
+
+    body = cache.get(cache_key)
+    if body is None:
+        events = calendar_events(trainer_id, start_date, end_date)
+        body = json.dumps(events, cls=DjangoJSONEncoder)
+        cache.set(cache_key, body, CALENDAR_CACHE_TTL)
+    return f'"{tag}"', body
@@ -0,0 +1,210 @@
+# trainer_management/conflicts.py
+"""
+Scheduling conflicts between training sessions.
+
+A proposed session conflicts with a session of the same gym on the same
+day whose time overlaps it and that:
+
+- is run by the same trainer,
+- uses the same room (location, compared case- and space-insensitively;
+  online/Zoom sessions and sessions without a location use no room), or
+- has any of the proposed participants enrolled.
+
+Cancelled sessions book nothing. Times are half-open, so back-to-back
+sessions (10:00-11:00 then 11:00-12:00) do not conflict.
+
+ScheduleIndex loads the sessions of the dates involved with one query and
+their enrolled participants with another, and files each session in an
+IntervalIndex per (date, trainer), (date, room) and (date, member). An
+IntervalIndex keeps its intervals sorted by start together with a running
+maximum of their ends, so a check is one bisect: of the intervals starting
+before the proposed end, the one reaching furthest overlaps the proposed
+start or none does. Accepted sessions can be added to the index, so a
+batch of new sessions is checked against the existing ones and each other
+without further queries.
+
+A check is only good until someone else books: callers take
+lock_schedule() in the transaction that checks and then saves, so the
+bookings of a gym are checked and written one transaction at a time.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+from multiple_gym.models import Gym, Member
+
+from .models import SessionParticipant, TrainingSession
+
+
+# Sessions in these states book neither the trainer, the room nor the members
+NON_BOOKING_STATUSES = ['cancelled']
+
+
+class IntervalIndex:
+    """Half-open [start, end) intervals answering "what overlaps [start, end)?" in O(log n)"""
+
+    def __init__(self):
+        self._starts = []
+        self._entries = []
+        self._reach = None
+
+    def add(self, start, end, item):
+        position = bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._entries.insert(position, (end, item))
+        # The running maximum is rebuilt on the next lookup
+        self._reach = None
+
+    def _build_reach(self):
+        reach, furthest = [], None
+        for end, item in self._entries:
+            if furthest is None or end > furthest[0]:
+                furthest = (end, item)
+            reach.append(furthest)
+        self._reach = reach
+
+    def overlap(self, start, end):
+        """An item whose interval overlaps [start, end), or None"""
+        before_end = bisect_left(self._starts, end)
+        if not before_end:
+            return None
+        if self._reach is None:
+            self._build_reach()
+        reach_end, item = self._reach[before_end - 1]
+        return item if reach_end > start else None
+
+
+def room_key(location, session_type='', is_zoom_session=False):
+    """The room a session occupies, or None for online sessions and blank locations"""
+    if session_type == 'online' or is_zoom_session:
+        return None
+    room = ' '.join((location or '').split()).casefold()
+    return room or None
+
+
+def _session_item(session):
+    return {
+        'id': session.id,
+        'title': session.title,
+        'session_date': session.session_date,
+        'start_time': session.start_time,
+        'end_time': session.end_time,
+    }
+
+
+class ScheduleIndex:
+    """The bookings of a gym's trainers, rooms and members on a set of dates"""
+
+    def __init__(self):
+        self._indexes = defaultdict(IntervalIndex)
+
+    @classmethod
+    def for_dates(cls, gym_id, dates, exclude_session_ids=()):
+        """
+        Index the gym's sessions on `dates`, leaving out
+        `exclude_session_ids` (a session being edited must not conflict
+        with itself).
+        """
+        schedule = cls()
+        dates = set(dates)
+        if not dates:
+            return schedule
+
+        sessions = list(
+            TrainingSession.objects.filter(trainer__gym_id=gym_id, session_date__in=dates)
+            .exclude(status__in=NON_BOOKING_STATUSES)
+            .exclude(id__in=exclude_session_ids)
+            .order_by()
+            .only(
+                'id', 'title', 'trainer_id', 'session_date', 'start_time', 'end_time',
+                'location', 'session_type', 'is_zoom_session',
+            )
+        )
+        members_by_session = defaultdict(list)
+        if sessions:
+            for session_id, member_id in SessionParticipant.objects.filter(
+                session__in=[session.id for session in sessions], is_enrolled=True
+            ).values_list('session_id', 'member_id'):
+                members_by_session[session_id].append(member_id)
+
+        for session in sessions:
+            schedule.add(session, members_by_session[session.id])
+        return schedule
+
+    def add(self, session, member_ids=()):
+        """Book a (possibly unsaved) session and its participants"""
+        item = _session_item(session)
+        interval = (session.start_time, session.end_time, item)
+        day = session.session_date
+
+        self._indexes[(day, 'trainer', session.trainer_id)].add(*interval)
+        room = room_key(session.location, session.session_type, session.is_zoom_session)
+        if room:
+            self._indexes[(day, 'location', room)].add(*interval)
+        for member_id in set(member_ids):
+            self._indexes[(day, 'member', member_id)].add(*interval)
+
+    def _overlap(self, day, kind, subject, start_time, end_time):
+        index = self._indexes.get((day, kind, subject))
+        return index.overlap(start_time, end_time) if index else None
+
+    def conflicts(self, session, member_ids=()):
+        """
+        The bookings a (possibly unsaved) session would clash with, as
+        dicts of kind ('trainer', 'location' or 'member'), subject (the
+        trainer id, location or member id) and session (id, title, date
+        and times of the booked session).
+        """
+        day, start_time, end_time = session.session_date, session.start_time, session.end_time
+        checks = [('trainer', session.trainer_id, session.trainer_id)]
+        room = room_key(session.location, session.session_type, session.is_zoom_session)
+        if room:
+            checks.append(('location', room, session.location.strip()))
+        checks.extend(('member', member_id, member_id) for member_id in sorted(set(member_ids)))
+
+        found = []
+        for kind, key, subject in checks:
+            booked = self._overlap(day, kind, key, start_time, end_time)
+            if booked is not None:
+                found.append({'kind': kind, 'subject': subject, 'session': booked})
+        return found
+
+
+def lock_schedule(gym_id):
+    """
+    Lock the gym's row until the transaction ends. Rooms and members are
+    shared by all of a gym's trainers, so the gym is the one row every
+    booking of it goes through. Must be called inside transaction.atomic().
+    """
+    Gym.objects.select_for_update().filter(id=gym_id).values_list('id', flat=True).first()
+
+
+def find_conflicts(session, member_ids=(), gym_id=None):
+    """Conflicts of one proposed or edited session with the rest of its gym's schedule"""
+    gym_id = gym_id or session.trainer.gym_id
+    exclude = [session.id] if session.id else []
+    schedule = ScheduleIndex.for_dates(gym_id, [session.session_date], exclude_session_ids=exclude)
+    return schedule.conflicts(session, member_ids)
+
+
+def describe_conflicts(conflicts):
+    """One message per conflict; member names are read with one query"""
+    member_ids = [conflict['subject'] for conflict in conflicts if conflict['kind'] == 'member']
+    member_names = {}
+    if member_ids:
+        member_names = {
+            member.id: member.user.get_full_name() or member.user.username
+            for member in Member.objects.filter(id__in=member_ids).select_related('user')
+        }
+
+    descriptions = []
+    for conflict in conflicts:
+        booked = conflict['session']
+        when = f"{booked['start_time']:%H:%M}-{booked['end_time']:%H:%M} on {booked['session_date']}"
+        if conflict['kind'] == 'trainer':
+            descriptions.append(f'The trainer is already running "{booked["title"]}" ({when}).')
+        elif conflict['kind'] == 'location':
+            descriptions.append(f'{conflict["subject"]} is already booked for "{booked["title"]}" ({when}).')
+        else:
+            name = member_names.get(conflict['subject'], f"Member #{conflict['subject']}")
+            descriptions.append(f'{name} is already enrolled in "{booked["title"]}" ({when}).')
+    return descriptions
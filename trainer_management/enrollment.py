@@ -0,0 +1,87 @@
+# trainer_management/enrollment.py
+"""
+Enrolling members in a training session in bulk.
+
+enroll_members() takes any number of member ids and, in one transaction,
+resolves them against the gym with one query, reads the session's
+participants with another, and inserts the new ones with a single
+bulk_create(ignore_conflicts=True) - the (session, member) unique
+constraint absorbs a concurrent enrollment of the same member. Members
+who had left the session are re-enrolled with one UPDATE. Capacity is
+enforced in the same transaction with the session row locked, so two
+trainers filling the last places cannot overbook it. Enrolling a full
+class is therefore a constant number of queries.
+"""
+from django.db import transaction
+
+from multiple_gym.models import Member
+
+from . import calendar_feed
+from .models import SessionParticipant, TrainingSession
+
+
+def parse_member_ids(values):
+    """Integer member ids of form values, ignoring blanks and junk, in order and without duplicates"""
+    member_ids = []
+    for value in values:
+        value = str(value).strip()
+        if value.isdigit() and int(value) not in member_ids:
+            member_ids.append(int(value))
+    return member_ids
+
+
+def enroll_members(session, member_ids, gym_id):
+    """
+    Enroll the members of the gym among `member_ids` in `session`, in the
+    given order, up to its max_participants. Returns a report dict of
+    Member lists (with their users): enrolled, already_enrolled and
+    over_capacity, plus not_found (ids of no member of the gym).
+    """
+    member_ids = parse_member_ids(member_ids)
+    report = {'enrolled': [], 'already_enrolled': [], 'over_capacity': [], 'not_found': []}
+    if not member_ids:
+        return report
+
+    with transaction.atomic():
+        # Serializes enrollments of the session so the capacity check holds
+        capacity = (
+            TrainingSession.objects.select_for_update()
+            .values_list('max_participants', flat=True)
+            .get(pk=session.pk)
+        )
+
+        members = {
+            member.id: member
+            for member in Member.objects.filter(id__in=member_ids, gym_id=gym_id).select_related('user')
+        }
+        participants = dict(
+            SessionParticipant.objects.filter(session=session).values_list('member_id', 'is_enrolled')
+        )
+        places = capacity - sum(participants.values())
+
+        to_create, to_rejoin = [], []
+        for member_id in member_ids:
+            member = members.get(member_id)
+            if member is None:
+                report['not_found'].append(member_id)
+            elif participants.get(member_id):
+                report['already_enrolled'].append(member)
+            elif places <= 0:
+                report['over_capacity'].append(member)
+            else:
+                places -= 1
+                report['enrolled'].append(member)
+                if member_id in participants:
+                    to_rejoin.append(member_id)
+                else:
+                    to_create.append(SessionParticipant(session=session, member=member))
+
+        SessionParticipant.objects.bulk_create(to_create, ignore_conflicts=True)
+        if to_rejoin:
+            SessionParticipant.objects.filter(session=session, member_id__in=to_rejoin).update(is_enrolled=True)
+
+        if report['enrolled']:
+            trainer_id = session.trainer_id
+            transaction.on_commit(lambda: calendar_feed.invalidate_session_calendar(trainer_id))
+
+    return report
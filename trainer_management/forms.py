@@ -123,7 +123,8 @@ class MemberAssignmentForm(forms.ModelForm):
 from django import forms
 from django.core.exceptions import ValidationError
 from datetime import datetime, timedelta, date
-from .models import TrainingSession, SessionParticipant
+from .models import TrainingSession, SessionParticipant, SessionSeries
+from .enrollment import enroll_members
 from multiple_gym.models import Member
 
 class TrainingSessionForm(forms.ModelForm):
@@ -294,13 +295,8 @@ class TrainingSessionForm(forms.ModelForm):
                 session.setup_zoom_meeting()
             
             # Add selected participants
-            participants_data = self.cleaned_data.get('participants', [])
-            for member in participants_data:
-                SessionParticipant.objects.get_or_create(
-                    session=session,
-                    member=member,
-                    defaults={'is_enrolled': True}
-                )
+            participants_data = self.cleaned_data.get('participants') or []
+            enroll_members(session, [member.id for member in participants_data], session.trainer.gym_id)
         
         return session
 
@@ -508,4 +504,170 @@ class AttendanceForm(forms.Form):
                         'rows': '2',
                         'placeholder': 'Notes about member performance...'
                     })
-                )
\ No newline at end of file
+                )
+
+
+def _session_duration(cleaned_data):
+    """Validate the start/end times and fill in duration_minutes, as TrainingSessionForm does"""
+    start_time = cleaned_data.get('start_time')
+    end_time = cleaned_data.get('end_time')
+    if start_time and end_time:
+        if start_time >= end_time:
+            raise ValidationError("End time must be after start time.")
+
+        duration = (datetime.combine(date.today(), end_time) - datetime.combine(date.today(), start_time)).total_seconds() / 60
+        if duration < 15:
+            raise ValidationError("Session duration must be at least 15 minutes.")
+        if duration > 480:  # 8 hours
+            raise ValidationError("Session duration cannot exceed 8 hours.")
+
+        cleaned_data['duration_minutes'] = int(duration)
+
+
+SERIES_TEMPLATE_WIDGETS = {
+    'title': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'e.g., Monday Evening HIIT'}),
+    'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
+    'session_type': forms.Select(attrs={'class': 'form-control'}),
+    'start_time': forms.TimeInput(attrs={'type': 'time', 'class': 'form-control'}),
+    'end_time': forms.TimeInput(attrs={'type': 'time', 'class': 'form-control'}),
+    'location': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Room number or area'}),
+    'max_participants': forms.NumberInput(attrs={'class': 'form-control', 'min': '1', 'max': '50'}),
+    'difficulty_level': forms.Select(attrs={'class': 'form-control'}),
+    'workout_plan': forms.Textarea(attrs={'class': 'form-control', 'rows': 4}),
+    'equipment_needed': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'e.g., Dumbbells, Yoga Mat'}),
+}
+
+
+class SessionSeriesForm(forms.ModelForm):
+    """Form for creating a recurring session series"""
+
+    weekday_choices = forms.TypedMultipleChoiceField(
+        choices=SessionSeries.WEEKDAY_CHOICES,
+        coerce=int,
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+        label="Repeat on",
+        help_text="Leave empty to repeat on the weekday of the first date"
+    )
+
+    excluded_dates_text = forms.CharField(
+        required=False,
+        label="Skip dates",
+        widget=forms.Textarea(attrs={
+            'class': 'form-control',
+            'rows': 2,
+            'placeholder': 'YYYY-MM-DD, one per line (holidays, gym closures)'
+        })
+    )
+
+    roster = forms.ModelMultipleChoiceField(
+        queryset=None,
+        widget=forms.CheckboxSelectMultiple,
+        required=False,
+        help_text="Members enrolled in every occurrence (optional)"
+    )
+
+    class Meta:
+        model = SessionSeries
+        fields = [
+            'title', 'description', 'session_type', 'start_time', 'end_time',
+            'location', 'max_participants', 'difficulty_level', 'workout_plan',
+            'equipment_needed', 'frequency', 'interval', 'starts_on', 'ends_on', 'roster',
+        ]
+        widgets = dict(SERIES_TEMPLATE_WIDGETS, **{
+            'frequency': forms.Select(attrs={'class': 'form-control'}),
+            'interval': forms.NumberInput(attrs={'class': 'form-control', 'min': '1', 'max': '12'}),
+            'starts_on': forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+            'ends_on': forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+        })
+
+    def __init__(self, *args, **kwargs):
+        trainer = kwargs.pop('trainer', None)
+        super().__init__(*args, **kwargs)
+
+        self.fields['starts_on'].widget.attrs['min'] = date.today().isoformat()
+
+        if trainer:
+            # Only the trainer's assigned members
+            self.fields['roster'].queryset = Member.objects.filter(
+                trainer_assignments__trainer=trainer,
+                trainer_assignments__is_active=True,
+                is_active=True
+            ).distinct().order_by('user__first_name', 'user__last_name')
+        else:
+            self.fields['roster'].queryset = Member.objects.none()
+
+    def clean_excluded_dates_text(self):
+        excluded = []
+        for value in self.cleaned_data.get('excluded_dates_text', '').replace(',', '\n').split():
+            try:
+                excluded.append(date.fromisoformat(value).isoformat())
+            except ValueError:
+                raise ValidationError(f"{value} is not a date (YYYY-MM-DD).")
+        return sorted(set(excluded))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        starts_on = cleaned_data.get('starts_on')
+        ends_on = cleaned_data.get('ends_on')
+
+        if starts_on and starts_on < date.today():
+            raise ValidationError("The series cannot start in the past.")
+        if starts_on and ends_on and ends_on < starts_on:
+            raise ValidationError("The series cannot end before it starts.")
+
+        _session_duration(cleaned_data)
+
+        roster = cleaned_data.get('roster')
+        max_participants = cleaned_data.get('max_participants')
+        if roster and max_participants and len(roster) > max_participants:
+            raise ValidationError(f"The roster has {len(roster)} members but the class holds {max_participants}.")
+
+        return cleaned_data
+
+    def save(self, commit=True):
+        series = super().save(commit=False)
+        series.weekdays = ','.join(str(day) for day in sorted(self.cleaned_data.get('weekday_choices') or []))
+        series.excluded_dates = self.cleaned_data.get('excluded_dates_text', [])
+        series.duration_minutes = self.cleaned_data.get('duration_minutes', series.duration_minutes)
+        if commit:
+            series.save()
+            self.save_m2m()
+        return series
+
+
+class SeriesFollowingForm(forms.ModelForm):
+    """Changes to a series' template from one occurrence on ("this and following")"""
+
+    from_date = forms.DateField(
+        label="Apply from",
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+
+    class Meta:
+        model = SessionSeries
+        fields = [
+            'title', 'description', 'start_time', 'end_time', 'location',
+            'max_participants', 'difficulty_level', 'workout_plan', 'equipment_needed',
+        ]
+        widgets = SERIES_TEMPLATE_WIDGETS
+
+    def clean_from_date(self):
+        from_date = self.cleaned_data['from_date']
+        if from_date < date.today():
+            raise ValidationError("Past occurrences cannot be changed.")
+        if from_date < self.instance.starts_on:
+            raise ValidationError("The series has not started by then.")
+        return from_date
+
+    def clean(self):
+        cleaned_data = super().clean()
+        _session_duration(cleaned_data)
+        return cleaned_data
+
+    def changes(self):
+        """The changed template fields, for series.update_following()"""
+        changes = {field: self.cleaned_data[field] for field in self.changed_data if field in self.Meta.fields}
+        if {'start_time', 'end_time'} & changes.keys():
+            changes['duration_minutes'] = self.cleaned_data['duration_minutes']
+        return changes
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from trainer_management.series import SERIES_HORIZON_DAYS, extend_series
+
+
+class Command(BaseCommand):
+    help = f'Materialize recurring session series {SERIES_HORIZON_DAYS} days ahead (run daily)'
+
+    def handle(self, *args, **options):
+        extended, created = extend_series()
+        self.stdout.write(self.style.SUCCESS(f"Extended {extended} series, created {created} sessions"))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainer_management', '0004_sessionparticipant_zoom_join_time_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trainingsession',
+            index=models.Index(fields=['trainer', 'session_date'], name='session_trainer_date_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multiple_gym', '0002_alter_user_user_type'),
+        ('trainer_management', '0005_trainingsession_trainer_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('session_type', models.CharField(choices=[('individual', 'Individual'), ('group', 'Group'), ('class', 'Class'), ('online', 'Online'), ('assessment', 'Assessment')], default='group', max_length=20)),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('duration_minutes', models.IntegerField(default=60, help_text='Duration in minutes')),
+                ('location', models.CharField(blank=True, help_text='Room/Area or Online platform', max_length=200)),
+                ('max_participants', models.IntegerField(default=1, help_text='Maximum number of participants')),
+                ('difficulty_level', models.CharField(choices=[('beginner', 'Beginner'), ('intermediate', 'Intermediate'), ('advanced', 'Advanced'), ('expert', 'Expert')], default='beginner', max_length=20)),
+                ('workout_plan', models.TextField(blank=True)),
+                ('equipment_needed', models.TextField(blank=True)),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly')], default='weekly', max_length=10)),
+                ('interval', models.PositiveSmallIntegerField(default=1, help_text='Every N days or weeks')),
+                ('weekdays', models.CharField(blank=True, help_text='Comma-separated weekdays (0=Monday); blank repeats on the weekday of the first date', max_length=20)),
+                ('starts_on', models.DateField()),
+                ('ends_on', models.DateField(blank=True, help_text='Last possible occurrence; blank repeats indefinitely', null=True)),
+                ('excluded_dates', models.JSONField(blank=True, default=list, help_text='ISO dates without an occurrence')),
+                ('generated_until', models.DateField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('roster', models.ManyToManyField(blank=True, help_text='Members enrolled in every occurrence', related_name='session_series', to='multiple_gym.member')),
+                ('trainer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_series', to='trainer_management.trainer')),
+            ],
+            options={
+                'verbose_name': 'Session Series',
+                'verbose_name_plural': 'Session Series',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='trainingsession',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='trainer_management.sessionseries'),
+        ),
+        migrations.AddConstraint(
+            model_name='trainingsession',
+            constraint=models.UniqueConstraint(fields=('series', 'session_date'), name='unique_series_occurrence'),
+        ),
+    ]
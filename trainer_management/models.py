@@ -266,6 +266,11 @@ class TrainingSession(models.Model):
     post_session_notes = models.TextField(blank=True, help_text="Notes after session")
     trainer_feedback = models.TextField(blank=True, help_text="Trainer's feedback")
     
+    # Occurrence of a recurring series (None for one-off sessions)
+    series = models.ForeignKey(
+        'SessionSeries', on_delete=models.SET_NULL, null=True, blank=True, related_name='occurrences'
+    )
+    
     # 🔥 REQUIRED TRACKING FIELDS - Add these missing fields
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -274,6 +279,14 @@ class TrainingSession(models.Model):
         ordering = ['-session_date', '-start_time']
         verbose_name = "Training Session"
         verbose_name_plural = "Training Sessions"
+        indexes = [
+            # The calendar feed reads one trainer's sessions over a date range
+            models.Index(fields=['trainer', 'session_date'], name='session_trainer_date_idx'),
+        ]
+        constraints = [
+            # A series has at most one occurrence per day, however often it is extended
+            models.UniqueConstraint(fields=['series', 'session_date'], name='unique_series_occurrence'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.session_date} by {self.trainer.user.username}"
@@ -318,7 +331,7 @@ class TrainingSession(models.Model):
             return f"{base_url}{meeting_id}"
         return ""
     
-    def setup_zoom_meeting(self):
+    def setup_zoom_meeting(self, save=True):
         """Setup Zoom meeting details when creating online session"""
         if self.session_type == 'online' or self.is_zoom_session:
             if not self.zoom_meeting_id:
@@ -328,7 +341,8 @@ class TrainingSession(models.Model):
             if not self.zoom_meeting_url:
                 self.zoom_meeting_url = f"https://zoom.us/j/{self.zoom_meeting_id.replace('-', '')}"
             self.is_zoom_session = True
-            self.save()
+            if save:
+                self.save()
     
     @property
     def zoom_participants_notified(self):
@@ -529,4 +543,81 @@ class SessionAttendance(models.Model):
         if self.check_in_time and self.check_out_time:
             duration = self.check_out_time - self.check_in_time
             return duration.total_seconds() / 60  # Return in minutes
-        return None
\ No newline at end of file
+        return None
+
+
+class SessionSeries(models.Model):
+    """A recurring training session, materialized ahead as TrainingSession occurrences"""
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+    ]
+
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+
+    trainer = models.ForeignKey('Trainer', on_delete=models.CASCADE, related_name='session_series')
+
+    # Template of every occurrence
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    session_type = models.CharField(max_length=20, choices=TrainingSession.SESSION_TYPE_CHOICES, default='group')
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    duration_minutes = models.IntegerField(default=60, help_text="Duration in minutes")
+    location = models.CharField(max_length=200, blank=True, help_text="Room/Area or Online platform")
+    max_participants = models.IntegerField(default=1, help_text="Maximum number of participants")
+    difficulty_level = models.CharField(max_length=20, choices=[
+        ('beginner', 'Beginner'),
+        ('intermediate', 'Intermediate'),
+        ('advanced', 'Advanced'),
+        ('expert', 'Expert')
+    ], default='beginner')
+    workout_plan = models.TextField(blank=True)
+    equipment_needed = models.TextField(blank=True)
+    roster = models.ManyToManyField(
+        'multiple_gym.Member', blank=True, related_name='session_series',
+        help_text="Members enrolled in every occurrence"
+    )
+
+    # Recurrence rule
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default='weekly')
+    interval = models.PositiveSmallIntegerField(default=1, help_text="Every N days or weeks")
+    weekdays = models.CharField(
+        max_length=20, blank=True,
+        help_text="Comma-separated weekdays (0=Monday); blank repeats on the weekday of the first date"
+    )
+    starts_on = models.DateField()
+    ends_on = models.DateField(null=True, blank=True, help_text="Last possible occurrence; blank repeats indefinitely")
+    excluded_dates = models.JSONField(default=list, blank=True, help_text="ISO dates without an occurrence")
+
+    # Occurrences exist up to this date
+    generated_until = models.DateField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Session Series"
+        verbose_name_plural = "Session Series"
+
+    def __str__(self):
+        return f"{self.title} ({self.get_frequency_display()}) by {self.trainer.user.username}"
+
+    @property
+    def weekday_list(self):
+        return [int(day) for day in self.weekdays.split(',') if day.strip().isdigit()]
+
+    @property
+    def weekday_names(self):
+        names = dict(self.WEEKDAY_CHOICES)
+        return [names[day] for day in self.weekday_list if day in names]
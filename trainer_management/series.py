@@ -0,0 +1,307 @@
+# trainer_management/series.py
+"""
+Recurring session series.
+
+A SessionSeries holds the template of a class (title, times, room,
+capacity, roster) and an RRULE-style recurrence: daily or weekly, every
+`interval` days/weeks, optionally on chosen weekdays, from starts_on to an
+optional ends_on, minus excluded dates. Occurrences are materialized as
+ordinary TrainingSessions SERIES_HORIZON_DAYS ahead:
+
+- materialize_series() locks the series row, reads the dates still
+  missing from the recurrence, checks every new occurrence against the
+  gym's schedule (and the batch itself) with one ScheduleIndex, then
+  inserts the sessions and their roster participants with one
+  bulk_create each. Occurrences that would double-book the trainer, the
+  room or a roster member are skipped and reported.
+- extend_series() moves every active series' horizon forward; the
+  extend_session_series management command runs it daily.
+- update_following() edits "this and following" occurrences: the series
+  is split at the chosen date and the scheduled occurrences from there on
+  are changed with a single UPDATE, after the new times and room have been
+  checked for conflicts.
+- skip_occurrence() and end_series() add exceptions and cut the series
+  short, cancelling or deleting the affected occurrences set-wise.
+
+Bulk writes send no signals, so each of these invalidates the trainer's
+cached calendar itself once the transaction commits.
+"""
+from datetime import datetime, time, timedelta
+
+from dateutil.rrule import DAILY, WEEKLY, rrule, rruleset
+from django.db import transaction
+from django.utils import timezone
+
+from . import calendar_feed
+from .conflicts import ScheduleIndex, describe_conflicts, lock_schedule
+from .models import SessionParticipant, SessionSeries, TrainingSession
+
+
+# Occurrences are materialized this far ahead
+SERIES_HORIZON_DAYS = 8 * 7
+
+# Template fields copied onto every occurrence
+OCCURRENCE_FIELDS = [
+    'title', 'description', 'session_type', 'start_time', 'end_time', 'duration_minutes',
+    'location', 'max_participants', 'difficulty_level', 'workout_plan', 'equipment_needed',
+]
+
+# Template fields "this and following" edits may change
+FOLLOWING_FIELDS = [
+    'title', 'description', 'start_time', 'end_time', 'duration_minutes',
+    'location', 'max_participants', 'difficulty_level', 'workout_plan', 'equipment_needed',
+]
+
+FREQUENCIES = {'daily': DAILY, 'weekly': WEEKLY}
+
+
+def recurrence(series):
+    """The series' recurrence as a dateutil rruleset (datetimes at midnight)"""
+    rules = rruleset()
+    rules.rrule(rrule(
+        FREQUENCIES[series.frequency],
+        interval=series.interval or 1,
+        byweekday=series.weekday_list or None,
+        dtstart=datetime.combine(series.starts_on, time.min),
+        until=datetime.combine(series.ends_on, time.min) if series.ends_on else None,
+    ))
+    for excluded in series.excluded_dates:
+        rules.exdate(datetime.combine(datetime.fromisoformat(excluded).date(), time.min))
+    return rules
+
+
+def occurrence_dates(series, first, last):
+    """Dates of the series' occurrences from `first` to `last`, inclusive"""
+    if first > last:
+        return []
+    return [
+        occurrence.date()
+        for occurrence in recurrence(series).between(
+            datetime.combine(first, time.min), datetime.combine(last, time.min), inc=True
+        )
+    ]
+
+
+def roster_ids(series):
+    """The members enrolled in new occurrences, at most max_participants of them"""
+    member_ids = series.roster.filter(is_active=True).order_by('id').values_list('id', flat=True)
+    return list(member_ids[:max(series.max_participants, 0)])
+
+
+def build_occurrence(series, session_date):
+    session = TrainingSession(
+        trainer_id=series.trainer_id,
+        series=series,
+        session_date=session_date,
+        **{field: getattr(series, field) for field in OCCURRENCE_FIELDS}
+    )
+    if session.session_type == 'online':
+        session.setup_zoom_meeting(save=False)
+    return session
+
+
+def _invalidate_calendar_on_commit(trainer_id):
+    transaction.on_commit(lambda: calendar_feed.invalidate_session_calendar(trainer_id))
+
+
+def materialize_series(series, until=None, today=None):
+    """
+    Create the series' missing occurrences up to `until` (default: the
+    horizon). Returns a report dict: created (count), skipped (list of
+    (date, conflict descriptions)) and generated_until.
+    """
+    today = today or timezone.localdate()
+    until = until or today + timedelta(days=SERIES_HORIZON_DAYS)
+
+    with transaction.atomic():
+        # Serializes runs of the series (the daily command, a page view) so the
+        # later one starts where the earlier one stopped
+        series.generated_until, series.ends_on, series.is_active = (
+            SessionSeries.objects.select_for_update()
+            .values_list('generated_until', 'ends_on', 'is_active')
+            .get(pk=series.pk)
+        )
+        if series.ends_on:
+            until = min(until, series.ends_on)
+
+        first = max(series.starts_on, today)
+        if series.generated_until:
+            first = max(first, series.generated_until + timedelta(days=1))
+
+        report = {'created': 0, 'skipped': [], 'generated_until': series.generated_until}
+        if not series.is_active or first > until:
+            return report
+
+        dates = occurrence_dates(series, first, until)
+        existing = set(
+            series.occurrences.filter(session_date__in=dates).values_list('session_date', flat=True)
+        )
+        dates = [session_date for session_date in dates if session_date not in existing]
+
+        member_ids = roster_ids(series)
+        lock_schedule(series.trainer.gym_id)
+        schedule = ScheduleIndex.for_dates(series.trainer.gym_id, dates)
+
+        sessions, skipped = [], []
+        for session_date in dates:
+            session = build_occurrence(series, session_date)
+            conflicts = schedule.conflicts(session, member_ids)
+            if conflicts:
+                skipped.extend((session_date, conflict) for conflict in conflicts)
+                continue
+            schedule.add(session, member_ids)
+            sessions.append(session)
+
+        TrainingSession.objects.bulk_create(sessions)
+        SessionParticipant.objects.bulk_create([
+            SessionParticipant(session=session, member_id=member_id)
+            for session in sessions
+            for member_id in member_ids
+        ])
+
+        series.generated_until = until
+        series.save(update_fields=['generated_until', 'updated_at'])
+        _invalidate_calendar_on_commit(series.trainer_id)
+
+    report['created'] = len(sessions)
+    report['generated_until'] = until
+    if skipped:
+        report['skipped'] = list(zip(
+            [session_date for session_date, _ in skipped],
+            describe_conflicts([conflict for _, conflict in skipped]),
+        ))
+    return report
+
+
+def extend_series(today=None):
+    """Materialize every active series up to the horizon; returns (series extended, occurrences created)"""
+    today = today or timezone.localdate()
+    horizon = today + timedelta(days=SERIES_HORIZON_DAYS)
+
+    due = (
+        SessionSeries.objects.filter(is_active=True, trainer__is_active=True)
+        .exclude(generated_until__gte=horizon)
+        .exclude(ends_on__lt=today)
+        .select_related('trainer')
+    )
+    extended = created = 0
+    for series in due:
+        report = materialize_series(series, until=horizon, today=today)
+        extended += 1
+        created += report['created']
+        for session_date, description in report['skipped']:
+            print(f"⚠️ {series.title}: skipped {session_date} - {description}")
+    return extended, created
+
+
+def following_occurrences(series, from_date):
+    """Scheduled occurrences on or after `from_date` - the ones series edits touch"""
+    return TrainingSession.objects.filter(series=series, session_date__gte=from_date, status='scheduled')
+
+
+def update_following(series, from_date, changes):
+    """
+    Apply template `changes` (a dict of FOLLOWING_FIELDS) to the series
+    from `from_date` on. Earlier occurrences keep the old template: unless
+    `from_date` is the start of the series, the series ends the day before
+    and a copy with the changes takes over. Returns a report dict: updated
+    (count), series (the series now covering from_date) and conflicts
+    (descriptions; when any, nothing was changed).
+    """
+    changes = {field: value for field, value in changes.items() if field in FOLLOWING_FIELDS}
+    report = {'updated': 0, 'series': series, 'conflicts': []}
+
+    with transaction.atomic():
+        occurrences = list(following_occurrences(series, from_date).only(
+            'id', 'title', 'trainer_id', 'session_date', 'start_time', 'end_time',
+            'location', 'session_type', 'is_zoom_session',
+        ))
+
+        # New times or a new room must not double-book anyone on any of the dates
+        if {'start_time', 'end_time', 'location'} & changes.keys() and occurrences:
+            lock_schedule(series.trainer.gym_id)
+            schedule = ScheduleIndex.for_dates(
+                series.trainer.gym_id,
+                [occurrence.session_date for occurrence in occurrences],
+                exclude_session_ids=[occurrence.id for occurrence in occurrences],
+            )
+            members_by_session = {}
+            for session_id, member_id in SessionParticipant.objects.filter(
+                session__in=occurrences, is_enrolled=True
+            ).values_list('session_id', 'member_id'):
+                members_by_session.setdefault(session_id, []).append(member_id)
+
+            conflicts = []
+            for occurrence in occurrences:
+                for field, value in changes.items():
+                    setattr(occurrence, field, value)
+                member_ids = members_by_session.get(occurrence.id, [])
+                conflicts.extend(schedule.conflicts(occurrence, member_ids))
+                schedule.add(occurrence, member_ids)
+            if conflicts:
+                report['conflicts'] = describe_conflicts(conflicts)
+                return report
+
+        if from_date > series.starts_on:
+            roster = list(series.roster.all())
+            following = SessionSeries.objects.get(pk=series.pk)
+            following.pk = None
+            # The recurrence is anchored on starts_on: pin the weekdays and start on a
+            # real occurrence so the copy keeps both the days and the every-N phase
+            if series.frequency == 'weekly':
+                weekdays = series.weekday_list or [series.starts_on.weekday()]
+                following.weekdays = ','.join(str(weekday) for weekday in weekdays)
+            next_dates = recurrence(series).after(datetime.combine(from_date, time.min), inc=True)
+            following.starts_on = next_dates.date() if next_dates else from_date
+            for field, value in changes.items():
+                setattr(following, field, value)
+            following.save()
+            following.roster.set(roster)
+
+            series.ends_on = from_date - timedelta(days=1)
+            series.generated_until = min(series.generated_until or series.ends_on, series.ends_on)
+            series.save(update_fields=['ends_on', 'generated_until', 'updated_at'])
+            report['series'] = following
+        else:
+            for field, value in changes.items():
+                setattr(series, field, value)
+            series.save()
+
+        report['updated'] = following_occurrences(series, from_date).update(
+            series=report['series'], updated_at=timezone.now(), **changes
+        )
+        _invalidate_calendar_on_commit(series.trainer_id)
+    return report
+
+
+def skip_occurrence(series, session_date):
+    """Add an exception date; a scheduled occurrence on it is cancelled. Returns True if one was"""
+    with transaction.atomic():
+        if session_date.isoformat() not in series.excluded_dates:
+            series.excluded_dates = sorted(series.excluded_dates + [session_date.isoformat()])
+            series.save(update_fields=['excluded_dates', 'updated_at'])
+        cancelled = series.occurrences.filter(session_date=session_date, status='scheduled').update(
+            status='cancelled', updated_at=timezone.now()
+        )
+        _invalidate_calendar_on_commit(series.trainer_id)
+    return bool(cancelled)
+
+
+def end_series(series, from_date):
+    """
+    Stop the series from `from_date` on: its scheduled occurrences from
+    that date are deleted and no more are generated. Returns the number of
+    occurrences deleted.
+    """
+    with transaction.atomic():
+        _, deleted = following_occurrences(series, from_date).delete()
+        deleted = deleted.get(TrainingSession._meta.label, 0)
+
+        if from_date <= series.starts_on:
+            series.is_active = False
+        series.ends_on = from_date - timedelta(days=1)
+        if series.generated_until:
+            series.generated_until = min(series.generated_until, series.ends_on)
+        series.save(update_fields=['is_active', 'ends_on', 'generated_until', 'updated_at'])
+        _invalidate_calendar_on_commit(series.trainer_id)
+    return deleted
@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import TrainingSession, SessionParticipant
+from . import calendar_feed
+
+
+@receiver(post_save, sender=TrainingSession)
+@receiver(post_delete, sender=TrainingSession)
+def invalidate_session_calendar(sender, instance, **kwargs):
+    """The trainer's cached calendar ranges are stale once a session changes"""
+    trainer_id = instance.trainer_id
+    transaction.on_commit(lambda: calendar_feed.invalidate_session_calendar(trainer_id))
+
+
+@receiver(post_save, sender=SessionParticipant)
+@receiver(post_delete, sender=SessionParticipant)
+def invalidate_participant_calendar(sender, instance, update_fields=None, origin=None, **kwargs):
+    """Calendar events show the enrolled count - only enrollment changes matter"""
+    if update_fields is not None and 'is_enrolled' not in update_fields:
+        return
+    if origin is not None and origin is not instance:
+        # Cascades from sessions and bulk deletes invalidate on their own
+        return
+    try:
+        trainer_id = instance.session.trainer_id
+    except TrainingSession.DoesNotExist:
+        # Deleted along with its session, which invalidates on its own
+        return
+    transaction.on_commit(lambda: calendar_feed.invalidate_session_calendar(trainer_id))
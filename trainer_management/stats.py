@@ -0,0 +1,60 @@
+# trainer_management/stats.py
+"""
+Per-trainer workload figures as queryset annotations.
+
+with_trainer_stats() adds, to any Trainer queryset:
+
+- active_member_count: active member assignments
+- session_count: all sessions
+- sessions_this_month: sessions dated in the current calendar month
+- attendance_rate: % of enrolled participants of completed sessions who attended
+  (None while the trainer has none)
+
+Each figure is a correlated subquery on the trainer foreign key instead of
+a join, so a trainer with many assignments, sessions and participants
+still produces one row, and the Trainer.*_count properties (one COUNT per
+trainer) are not needed for lists.
+"""
+from dateutil.relativedelta import relativedelta
+from django.db.models import Avg, Count, FloatField, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from .models import MemberTrainerAssignment, SessionParticipant, TrainingSession
+
+
+def _per_trainer(queryset, trainer_field, aggregate, output_field):
+    """Correlated subquery of one aggregate over `queryset` rows of the outer trainer"""
+    return Subquery(
+        queryset.filter(**{trainer_field: OuterRef("pk")})
+        .order_by()
+        .values(trainer_field)
+        .annotate(value=aggregate)
+        .values("value"),
+        output_field=output_field,
+    )
+
+
+def _count(queryset, trainer_field="trainer"):
+    return Coalesce(_per_trainer(queryset, trainer_field, Count("pk"), IntegerField()), Value(0))
+
+
+def with_trainer_stats(trainers, today=None):
+    """Annotate a Trainer queryset with the workload figures of the module docstring"""
+    today = today or timezone.localdate()
+    month_start = today.replace(day=1)
+    next_month = month_start + relativedelta(months=1)
+
+    return trainers.annotate(
+        active_member_count=_count(MemberTrainerAssignment.objects.filter(is_active=True)),
+        session_count=_count(TrainingSession.objects.all()),
+        sessions_this_month=_count(
+            TrainingSession.objects.filter(session_date__gte=month_start, session_date__lt=next_month)
+        ),
+        attendance_rate=_per_trainer(
+            SessionParticipant.objects.filter(is_enrolled=True, session__status="completed"),
+            "session__trainer",
+            Avg(Cast("attended", FloatField())) * 100,
+            FloatField(),
+        ),
+    )
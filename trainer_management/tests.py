@@ -1,3 +1,430 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from multiple_gym.models import Gym, Member
+from .assignments import assign_members
+from .attendance import attendance_by_member, save_attendance
+from .conflicts import IntervalIndex, describe_conflicts, find_conflicts
+from .enrollment import enroll_members
+from .models import MemberTrainerAssignment, SessionAttendance, SessionSeries, Trainer, TrainingSession
+from .series import end_series, materialize_series, occurrence_dates, skip_occurrence, update_following
+
+User = get_user_model()
+
+# Never the file cache the worker processes share
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# A Monday, far enough ahead that nothing in the tests is in the past
+MONDAY = date(2030, 1, 7)
+TODAY = date(2030, 1, 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TrainerTestCase(TestCase):
+    """A gym with two trainers and a handful of members"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('root', password='x', user_type='superadmin')
+        cls.gym = Gym.objects.create(name='Main', address='a', phone='1', email='main@example.com', created_by=cls.admin)
+        cls.trainer = cls.make_trainer('coach')
+        cls.other_trainer = cls.make_trainer('assistant')
+        cls.members = [cls.make_member(f'member{number}') for number in range(4)]
+
+    def setUp(self):
+        cache.clear()
+
+    @classmethod
+    def make_trainer(cls, username):
+        user = User.objects.create_user(username, password='x', user_type='trainer')
+        return Trainer.objects.create(user=user, gym=cls.gym, phone=f'9{user.id:09d}')
+
+    @classmethod
+    def make_member(cls, username):
+        user = User.objects.create_user(username, password='x', user_type='member')
+        return Member.objects.create(
+            user=user, gym=cls.gym, date_of_birth=date(1990, 1, 1), gender='M', phone=f'8{user.id:09d}',
+            address_line1='a', city='c', state='s', pin_code='1',
+            emergency_contact_name='e', emergency_contact_phone='1', emergency_contact_relation='father',
+        )
+
+    def make_session(self, trainer=None, session_date=MONDAY, start=time(9), end=time(10), **fields):
+        fields.setdefault('title', 'Session')
+        fields.setdefault('max_participants', 10)
+        return TrainingSession.objects.create(
+            trainer=trainer or self.trainer, session_date=session_date, start_time=start, end_time=end, **fields
+        )
+
+    def make_series(self, **fields):
+        defaults = {
+            'trainer': self.trainer,
+            'title': 'Spin',
+            'start_time': time(18),
+            'end_time': time(19),
+            'max_participants': 10,
+            'starts_on': MONDAY,
+        }
+        defaults.update(fields)
+        return SessionSeries.objects.create(**defaults)
+
+
+class SeriesSplitTests(TrainerTestCase):
+
+    def test_split_midweek_keeps_the_original_weekday(self):
+        # Blank weekdays repeat on the weekday of starts_on (Monday)
+        series = self.make_series()
+        materialize_series(series, until=MONDAY + timedelta(weeks=4), today=TODAY)
+
+        wednesday = MONDAY + timedelta(days=9)
+        report = update_following(series, wednesday, {'title': 'Spin & Core'})
+
+        following = report['series']
+        self.assertNotEqual(following.pk, series.pk)
+        self.assertEqual(following.starts_on, MONDAY + timedelta(weeks=2))
+        self.assertEqual(following.weekday_list, [0])
+        dates = occurrence_dates(following, following.starts_on, MONDAY + timedelta(weeks=10))
+        self.assertTrue(dates)
+        self.assertEqual({session_date.weekday() for session_date in dates}, {0})
+        self.assertEqual(
+            set(following.occurrences.values_list('title', flat=True)), {'Spin & Core'}
+        )
+
+    def test_split_keeps_the_fortnightly_phase(self):
+        series = self.make_series(interval=2)
+        horizon = MONDAY + timedelta(weeks=12)
+        original_dates = occurrence_dates(series, MONDAY, horizon)
+
+        # A Monday between two occurrences
+        report = update_following(series, MONDAY + timedelta(weeks=1), {'title': 'Spin & Core'})
+
+        series.refresh_from_db()
+        following = report['series']
+        self.assertEqual(following.starts_on, MONDAY + timedelta(weeks=2))
+        self.assertEqual(
+            occurrence_dates(series, MONDAY, horizon) + occurrence_dates(following, MONDAY, horizon),
+            original_dates,
+        )
+
+
+class AddParticipantTests(TrainerTestCase):
+
+    def test_member_booked_elsewhere_is_not_added(self):
+        member = self.members[0]
+        elsewhere = self.make_session(trainer=self.other_trainer, title='Yoga', start=time(9, 30), end=time(10, 30))
+        elsewhere.participants.create(member=member)
+        session = self.make_session(title='Spin')
+
+        self.client.force_login(self.trainer.user)
+        response = self.client.post(
+            reverse('trainer_management:add_participant', args=[session.id]), {'member_id': member.id}
+        )
+
+        self.assertRedirects(response, reverse('trainer_management:session_detail', args=[session.id]), fetch_redirect_response=False)
+        self.assertFalse(session.participants.exists())
+        self.assertIn('Scheduling conflict', ' '.join(str(message) for message in get_messages(response.wsgi_request)))
+
+    def test_free_member_is_added(self):
+        session = self.make_session(title='Spin')
+
+        self.client.force_login(self.trainer.user)
+        self.client.post(reverse('trainer_management:add_participant', args=[session.id]), {'member_id': self.members[1].id})
+
+        self.assertTrue(session.participants.filter(member=self.members[1], is_enrolled=True).exists())
+
+
+class AttendanceTests(TrainerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.session = self.make_session(session_date=TODAY)
+        for member in self.members[:3]:
+            self.session.participants.create(member=member)
+        # Left the class - not marked
+        self.session.participants.create(member=self.members[3], is_enrolled=False)
+
+    def test_marks_every_enrolled_participant_and_completes_the_session(self):
+        first, second, third = self.members[:3]
+        SessionAttendance.objects.create(
+            session=self.session, member=third, trainer=self.trainer, marked_present=True, sets_completed=4
+        )
+
+        present = save_attendance(self.session, {
+            f'present_{first.id}': 'on', f'sets_{first.id}': '3', f'weight_{first.id}': '42.5',
+            f'present_{second.id}': 'on',
+        }, session_notes='Good class')
+
+        self.assertEqual(present, 2)
+        records = attendance_by_member(self.session)
+        self.assertEqual(set(records), {first.id, second.id, third.id})
+        self.assertEqual((records[first.id].sets_completed, records[first.id].weight_lifted), (3, Decimal('42.5')))
+        self.assertTrue(records[second.id].marked_present)
+        # Absent members only lose their present mark
+        self.assertFalse(records[third.id].marked_present)
+        self.assertEqual(records[third.id].sets_completed, 4)
+        self.assertEqual(
+            set(self.session.participants.filter(attended=True).values_list('member_id', flat=True)), {first.id, second.id}
+        )
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.status, self.session.post_session_notes), ('completed', 'Good class'))
+
+    def test_invalid_numbers_write_nothing(self):
+        first = self.members[0]
+
+        with self.assertRaises(ValueError):
+            save_attendance(self.session, {f'present_{first.id}': 'on', f'sets_{first.id}': 'three'})
+
+        self.assertFalse(SessionAttendance.objects.exists())
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, 'scheduled')
+
+
+class ConflictTests(TrainerTestCase):
+
+    def proposed(self, trainer=None, start=time(9), end=time(10), **fields):
+        fields.setdefault('title', 'Proposed')
+        return TrainingSession(
+            trainer=trainer or self.trainer, session_date=MONDAY, start_time=start, end_time=end, **fields
+        )
+
+    def kinds(self, session, member_ids=()):
+        return {conflict['kind'] for conflict in find_conflicts(session, member_ids, gym_id=self.gym.id)}
+
+    def test_interval_index_is_half_open(self):
+        index = IntervalIndex()
+        index.add(time(9), time(12), 'long')
+        index.add(time(10), time(10, 30), 'short')
+
+        self.assertEqual(index.overlap(time(11), time(13)), 'long')
+        self.assertIsNone(index.overlap(time(12), time(13)))
+        self.assertIsNone(index.overlap(time(8), time(9)))
+
+    def test_trainer_room_and_member_clashes(self):
+        booked = self.make_session(location='Studio  A', start=time(9, 30), end=time(10, 30))
+        booked.participants.create(member=self.members[0])
+
+        self.assertEqual(self.kinds(self.proposed()), {'trainer'})
+        self.assertEqual(self.kinds(self.proposed(trainer=self.other_trainer, location='studio a')), {'location'})
+        self.assertEqual(self.kinds(self.proposed(trainer=self.other_trainer), [self.members[0].id]), {'member'})
+        # Back to back is fine
+        self.assertEqual(self.kinds(self.proposed(start=time(10, 30), end=time(11, 30), location='Studio A')), set())
+
+    def test_online_cancelled_and_edited_sessions_book_nothing(self):
+        online = self.make_session(trainer=self.other_trainer, location='Studio A', session_type='online')
+        self.make_session(location='Studio A', status='cancelled')
+
+        self.assertEqual(self.kinds(self.proposed(trainer=self.make_trainer('third'), location='Studio A')), set())
+        self.assertEqual(self.kinds(self.proposed(location='Studio A')), set())
+        # A session being edited does not clash with itself
+        self.assertEqual(self.kinds(online), set())
+
+    def test_descriptions_name_the_member(self):
+        booked = self.make_session(title='Yoga')
+        booked.participants.create(member=self.members[0])
+        self.members[0].user.first_name = 'Asha'
+        self.members[0].user.save()
+
+        [description] = describe_conflicts(find_conflicts(self.proposed(trainer=self.other_trainer), [self.members[0].id]))
+        self.assertIn('Asha', description)
+        self.assertIn('"Yoga"', description)
+
+
+class SeriesTests(TrainerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Mondays and Thursdays for three weeks
+        self.series = self.make_series(weekdays='0,3', ends_on=MONDAY + timedelta(days=18), max_participants=2)
+        self.series.roster.set(self.members[:3])
+
+    def dates(self, **filters):
+        return sorted(self.series.occurrences.filter(**filters).values_list('session_date', flat=True))
+
+    def test_materialize_creates_occurrences_with_the_roster(self):
+        report = materialize_series(self.series, today=TODAY)
+
+        self.assertEqual(report['created'], 6)
+        self.assertEqual(report['generated_until'], self.series.ends_on)
+        self.assertEqual({session_date.weekday() for session_date in self.dates()}, {0, 3})
+        # The roster is capped at max_participants
+        session = self.series.occurrences.first()
+        self.assertEqual(
+            set(session.participants.values_list('member_id', flat=True)), {self.members[0].id, self.members[1].id}
+        )
+
+    def test_materialize_skips_conflicting_dates_and_runs_once(self):
+        self.make_session(session_date=MONDAY + timedelta(days=3), start=time(18, 30), end=time(19, 30))
+        stale = SessionSeries.objects.get(pk=self.series.pk)
+
+        report = materialize_series(self.series, today=TODAY)
+        self.assertEqual(report['created'], 5)
+        self.assertEqual([session_date for session_date, _ in report['skipped']], [MONDAY + timedelta(days=3)])
+
+        # A second run, even from an out-of-date copy, adds nothing
+        self.assertEqual(materialize_series(stale, today=TODAY)['created'], 0)
+        self.assertEqual(self.series.occurrences.count(), 5)
+
+    def test_skip_cancels_the_occurrence_and_excludes_the_date(self):
+        materialize_series(self.series, today=TODAY)
+        thursday = MONDAY + timedelta(days=3)
+
+        self.assertTrue(skip_occurrence(self.series, thursday))
+
+        self.assertEqual(self.dates(status='cancelled'), [thursday])
+        self.assertNotIn(thursday, occurrence_dates(self.series, MONDAY, self.series.ends_on))
+
+    def test_end_deletes_the_following_occurrences(self):
+        materialize_series(self.series, today=TODAY)
+        second_monday = MONDAY + timedelta(weeks=1)
+
+        deleted = end_series(self.series, second_monday)
+
+        self.assertEqual(deleted, 4)
+        self.assertEqual(self.dates(), [MONDAY, MONDAY + timedelta(days=3)])
+        self.assertTrue(self.series.is_active)
+        self.assertEqual(materialize_series(self.series, until=MONDAY + timedelta(weeks=8), today=TODAY)['created'], 0)
+
+    def test_end_from_the_start_deactivates_the_series(self):
+        end_series(self.series, MONDAY)
+
+        self.series.refresh_from_db()
+        self.assertFalse(self.series.is_active)
+        self.assertEqual(materialize_series(self.series, today=TODAY)['created'], 0)
+
+
+class EnrollmentTests(TrainerTestCase):
+
+    def test_capacity_is_filled_in_the_given_order(self):
+        session = self.make_session(max_participants=2)
+        first, second, third = self.members[:3]
+
+        report = enroll_members(session, [first.id, 'junk', third.id, first.id, second.id, 999999], self.gym.id)
+
+        self.assertEqual(report['enrolled'], [first, third])
+        self.assertEqual(report['over_capacity'], [second])
+        self.assertEqual(report['not_found'], [999999])
+        self.assertEqual(session.participants.filter(is_enrolled=True).count(), 2)
+
+    def test_already_enrolled_and_returning_members(self):
+        session = self.make_session(max_participants=2)
+        first, second, third = self.members[:3]
+        session.participants.create(member=first)
+        session.participants.create(member=second, is_enrolled=False)
+
+        report = enroll_members(session, [first.id, second.id, third.id], self.gym.id)
+
+        self.assertEqual(report['already_enrolled'], [first])
+        self.assertEqual(report['enrolled'], [second])
+        self.assertEqual(report['over_capacity'], [third])
+        self.assertEqual(session.participants.count(), 2)
+        self.assertTrue(session.participants.get(member=second).is_enrolled)
+
+    def test_members_of_other_gyms_are_not_found(self):
+        other_gym = Gym.objects.create(name='Branch', address='a', phone='1', email='branch@example.com', created_by=self.admin)
+        outsider = self.make_member('outsider')
+        outsider.gym = other_gym
+        outsider.save()
+
+        report = enroll_members(self.make_session(), [outsider.id], self.gym.id)
+
+        self.assertEqual(report['not_found'], [outsider.id])
+
+
+class CalendarFeedTests(TrainerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.trainer.user)
+        self.session = self.make_session(title='Spin')
+
+    def fetch(self, start=MONDAY, end=MONDAY + timedelta(days=6), **headers):
+        return self.client.get(
+            reverse('trainer_management:session_calendar_data'),
+            {'start': start.isoformat(), 'end': end.isoformat()},
+            headers=headers,
+        )
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.fetch()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([event['title'] for event in response.json()], ['Spin'])
+
+        revalidated = self.fetch(if_none_match=response['ETag'])
+
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+
+    def test_session_saves_change_the_etag(self):
+        etag = self.fetch()['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.session.title = 'Spin & Core'
+            self.session.save()
+
+        response = self.fetch(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([event['title'] for event in response.json()], ['Spin & Core'])
+
+    def test_enrollment_changes_change_the_etag(self):
+        etag = self.fetch()['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            participant = self.session.participants.create(member=self.members[0])
+        response = self.fetch(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['extendedProps']['participants'], 1)
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            participant.is_enrolled = False
+            participant.save(update_fields=['is_enrolled'])
+        response = self.fetch(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['extendedProps']['participants'], 0)
+
+    def test_reversed_and_oversized_ranges_are_rejected(self):
+        self.assertEqual(self.fetch(start=MONDAY, end=MONDAY - timedelta(days=1)).status_code, 400)
+        self.assertEqual(self.fetch(start=MONDAY, end=MONDAY + timedelta(days=400)).status_code, 400)
+        self.assertEqual(self.client.get(reverse('trainer_management:session_calendar_data')).status_code, 400)
+
+
+class AssignmentTests(TrainerTestCase):
+
+    def active_assignments(self, trainer=None):
+        return MemberTrainerAssignment.objects.filter(trainer=trainer or self.trainer, is_active=True)
+
+    def test_matching_assignments_are_kept_and_the_rest_replaced(self):
+        kept, changed, new = self.members[:3]
+        original = MemberTrainerAssignment.objects.create(member=kept, trainer=self.trainer, goals='Run 5k')
+        MemberTrainerAssignment.objects.create(member=changed, trainer=self.trainer, assignment_type='cardio')
+        elsewhere = MemberTrainerAssignment.objects.create(member=new, trainer=self.other_trainer)
+
+        report = assign_members(self.trainer, [kept.id, changed.id, new.id], goals='Run 5k')
+
+        self.assertEqual(report, {'created': 2, 'unchanged': 1, 'deactivated': 1, 'invalid': []})
+        self.assertEqual(
+            set(self.active_assignments().values_list('member_id', 'assignment_type', 'goals')),
+            {(kept.id, 'fitness', 'Run 5k'), (changed.id, 'fitness', 'Run 5k'), (new.id, 'fitness', 'Run 5k')},
+        )
+        self.assertTrue(self.active_assignments().filter(id=original.id).exists())
+        # Assignments to other trainers are left alone
+        self.assertTrue(self.active_assignments(self.other_trainer).filter(id=elsewhere.id).exists())
+
+    def test_invalid_ids_write_nothing(self):
+        member = self.members[0]
+        MemberTrainerAssignment.objects.create(member=member, trainer=self.trainer, assignment_type='cardio')
+
+        report = assign_members(self.trainer, [member.id, self.members[1].id, 999999])
+
+        self.assertEqual(report['invalid'], [999999])
+        self.assertEqual((report['created'], report['deactivated']), (0, 0))
+        self.assertEqual(
+            list(MemberTrainerAssignment.objects.values_list('member_id', 'assignment_type', 'is_active')),
+            [(member.id, 'cardio', True)],
+        )
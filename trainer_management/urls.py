@@ -29,6 +29,14 @@ urlpatterns = [
     path('sessions/<int:session_id>/attendance/', views.mark_attendance, name='mark_attendance'),
     path('sessions/<int:session_id>/add-participant/', views.add_participant, name='add_participant'),
     
+    # Recurring Session Series
+    path('series/', views.series_list, name='series_list'),
+    path('series/create/', views.create_series, name='create_series'),
+    path('series/<int:series_id>/', views.series_detail, name='series_detail'),
+    path('series/<int:series_id>/edit/', views.edit_series_following, name='edit_series_following'),
+    path('series/<int:series_id>/skip/', views.skip_series_occurrence, name='skip_series_occurrence'),
+    path('series/<int:series_id>/end/', views.end_session_series, name='end_session_series'),
+    
     # Regular Session Management URLs
     path('sessions/<int:session_id>/start/', views.start_session, name='start_session'),
     path('sessions/<int:session_id>/complete/', views.complete_session, name='complete_session'),
@@ -6,11 +6,13 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
 from django.contrib import messages
+from django.core.paginator import Paginator
 from django.db import transaction
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.db.models import Q, Count, Sum
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils import timezone
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
 import secrets
 import string
@@ -18,12 +20,22 @@ import string
 # Import models
 from .models import (
     Trainer, TrainerPermission, MemberTrainerAssignment,
-    TrainingSession, SessionParticipant, SessionContent, SessionAttendance
+    TrainingSession, SessionParticipant, SessionContent, SessionAttendance, SessionSeries
 )
+from .forms import SeriesFollowingForm, SessionSeriesForm
+from .series import end_series, materialize_series, skip_occurrence, update_following
+from .conflicts import describe_conflicts, find_conflicts, lock_schedule
+from .enrollment import enroll_members, parse_member_ids
+from .assignments import assign_members
+from .calendar_feed import calendar_etag, calendar_feed, parse_calendar_range
+from .attendance import attendance_by_member, enrolled_participants, save_attendance
+from .stats import with_trainer_stats
 from multiple_gym.models import Gym, GymAdmin, Member
 
 User = get_user_model()
 
+TRAINER_PAGE_SIZE = 12
+
 
 # TRAINER MANAGEMENT VIEWS (for Gym Admins)
 
@@ -48,7 +60,12 @@ def trainer_list(request, gym_id):
             return redirect("login")
 
     # Get trainers for this gym
-    trainers = Trainer.objects.filter(gym=gym, is_active=True).order_by('-created_at')
+    status_filter = request.GET.get('status', 'active')
+    trainers = Trainer.objects.filter(gym=gym)
+    if status_filter == 'active':
+        trainers = trainers.filter(is_active=True)
+    elif status_filter == 'inactive':
+        trainers = trainers.filter(is_active=False)
     
     # Search functionality
     search_query = request.GET.get('search')
@@ -61,19 +78,34 @@ def trainer_list(request, gym_id):
             Q(specialization__icontains=search_query)
         )
 
-    # Calculate statistics
-    total_trainers = trainers.count()
-    total_assigned_members = sum(t.assigned_members_count for t in trainers)
-    total_sessions = sum(t.total_sessions_count for t in trainers)
+    trainers = with_trainer_stats(trainers)
+
+    # Calculate statistics - one aggregate over the annotated rows
+    totals = trainers.aggregate(
+        total_trainers=Count('id'),
+        total_assigned_members=Sum('active_member_count'),
+        total_sessions=Sum('session_count'),
+        total_sessions_this_month=Sum('sessions_this_month'),
+    )
+
+    # The aggregate already counted the trainers - no separate COUNT for the paginator
+    paginator = Paginator(
+        trainers.select_related('user').order_by('-created_at'), TRAINER_PAGE_SIZE
+    )
+    paginator.count = totals['total_trainers']
+    page_obj = paginator.get_page(request.GET.get('page'))
 
     context = {
         'gym': gym,
         'gym_id': gym_id,
-        'trainers': trainers,
+        'trainers': page_obj,
+        'page_obj': page_obj,
         'search_query': search_query,
-        'total_trainers': total_trainers,
-        'total_assigned_members': total_assigned_members,
-        'total_sessions': total_sessions,
+        'status_filter': status_filter,
+        'total_trainers': totals['total_trainers'],
+        'total_assigned_members': totals['total_assigned_members'] or 0,
+        'total_sessions': totals['total_sessions'] or 0,
+        'sessions_this_month': totals['total_sessions_this_month'] or 0,
     }
 
     return render(request, 'trainer_management/trainer_list.html', context)
@@ -420,39 +452,18 @@ def assign_members_to_trainer(request, gym_id, trainer_id):
         notes = request.POST.get('notes', '')
 
         try:
-            with transaction.atomic():
-                # Only clear existing assignments between THIS trainer and selected members
-                existing_assignments = MemberTrainerAssignment.objects.filter(
-                    member_id__in=selected_members,
-                    trainer=trainer,  # Only for this specific trainer
-                    is_active=True
-                )
-                existing_assignments.update(is_active=False)
-
-                # Create new assignments
-                new_assignments_count = 0
-                for member_id in selected_members:
-                    member = get_object_or_404(Member, id=member_id, gym=gym)
-                    
-                    # Check if this exact assignment already exists
-                    existing = MemberTrainerAssignment.objects.filter(
-                        member=member,
-                        trainer=trainer,
-                        is_active=True
-                    ).exists()
-                    
-                    if not existing:
-                        MemberTrainerAssignment.objects.create(
-                            member=member,
-                            trainer=trainer,
-                            assignment_type=assignment_type,
-                            goals=goals,
-                            notes=notes,
-                            created_by=request.user
-                        )
-                        new_assignments_count += 1
-
-                messages.success(request, f'{new_assignments_count} new members assigned to {trainer.user.get_full_name()}')
+            # Only assignments between THIS trainer and the selected members change
+            report = assign_members(
+                trainer, selected_members,
+                assignment_type=assignment_type, goals=goals, notes=notes, created_by=request.user
+            )
+            if report['invalid']:
+                messages.error(request, f"{len(report['invalid'])} selected member(s) do not belong to {gym.name}.")
+            else:
+                success_msg = f'{report["created"]} new members assigned to {trainer.user.get_full_name()}'
+                if report['unchanged']:
+                    success_msg += f' ({report["unchanged"]} already assigned)'
+                messages.success(request, success_msg)
                 return redirect('trainer_management:trainer_detail', gym_id=gym_id, trainer_id=trainer_id)
 
         except Exception as e:
@@ -754,6 +765,18 @@ def create_session(request):
                     messages.error(request, "End time is required!")
                     raise ValueError("Missing end time")
 
+                try:
+                    session_date = date.fromisoformat(session_date)
+                    start_time = time.fromisoformat(start_time)
+                    end_time = time.fromisoformat(end_time)
+                except ValueError:
+                    messages.error(request, "Invalid session date or time!")
+                    raise
+
+                if end_time <= start_time:
+                    messages.error(request, "End time must be after start time!")
+                    raise ValueError("End time before start time")
+
                 # Safe integer conversion for duration_minutes
                 duration_raw = request.POST.get('duration_minutes', '').strip()
                 if duration_raw:
@@ -779,7 +802,7 @@ def create_session(request):
                     max_participants = 1
 
                 # Create session
-                session = TrainingSession.objects.create(
+                session = TrainingSession(
                     title=title,
                     description=request.POST.get('description', '').strip(),
                     trainer=trainer,
@@ -803,6 +826,18 @@ def create_session(request):
                     zoom_recording_enabled=request.POST.get('zoom_recording_enabled', 'on') == 'on',
                 )
 
+                # Reject double bookings of the trainer, the room or a participant before saving;
+                # the lock keeps another booking from landing between the check and the save
+                selected_member_ids = parse_member_ids(request.POST.getlist('participants'))
+                lock_schedule(trainer.gym_id)
+                conflicts = find_conflicts(session, selected_member_ids, gym_id=trainer.gym_id)
+                if conflicts:
+                    for description in describe_conflicts(conflicts):
+                        messages.error(request, f"Scheduling conflict: {description}")
+                    raise ValueError("Scheduling conflict")
+
+                session.save()
+
                 print(f"Session created: {session.title}, type: {session.session_type}, is_zoom: {session.is_zoom_session}")
 
                 # 🔥 AUTO SETUP ZOOM FOR ONLINE SESSIONS - ADD THIS LOGIC
@@ -811,25 +846,10 @@ def create_session(request):
                     print(f"✅ Zoom setup complete: ID={session.zoom_meeting_id}, Password={session.zoom_meeting_password}")
 
                 # Add participants if selected
-                selected_members = request.POST.getlist('participants')
-                participants_added = 0
-                
-                for member_id in selected_members:
-                    member_id = member_id.strip()
-                    if member_id:
-                        try:
-                            member_id_int = int(member_id)
-                            member = Member.objects.get(id=member_id_int, gym=trainer.gym)
-                            SessionParticipant.objects.create(
-                                session=session,
-                                member=member
-                            )
-                            participants_added += 1
-                            print(f"Participant added: {member.user.get_full_name()}")
-                        except (ValueError, TypeError):
-                            continue
-                        except Member.DoesNotExist:
-                            continue
+                enrollment = enroll_members(session, selected_member_ids, trainer.gym_id)
+                participants_added = len(enrollment['enrolled'])
+                for member in enrollment['enrolled']:
+                    print(f"Participant added: {member.user.get_full_name()}")
 
                 success_msg = f'Session "{session.title}" created successfully!'
                 # 🔥 ADD ZOOM SUCCESS MESSAGE
@@ -839,6 +859,11 @@ def create_session(request):
                     success_msg += f' {participants_added} participant(s) added.'
                 
                 messages.success(request, success_msg)
+                if enrollment['over_capacity']:
+                    messages.warning(
+                        request,
+                        f"Session is full - {len(enrollment['over_capacity'])} selected member(s) were not added."
+                    )
                 return redirect('trainer_management:session_detail', session_id=session.id)
 
         except ValueError:
@@ -880,24 +905,30 @@ def add_participant(request, session_id):
     if request.method == 'POST':
         member_id = request.POST.get('member_id')
         if member_id:
-            try:
-                member = get_object_or_404(Member, id=member_id, gym=trainer.gym)
-                
-                # Check if participant already exists
-                if SessionParticipant.objects.filter(session=session, member=member).exists():
-                    messages.warning(request, f'{member.user.get_full_name()} is already enrolled in this session.')
-                else:
-                    # Check session capacity
-                    if session.participants_count >= session.max_participants:
-                        messages.error(request, 'Session is already at maximum capacity.')
-                    else:
-                        SessionParticipant.objects.create(
-                            session=session,
-                            member=member
-                        )
-                        messages.success(request, f'{member.user.get_full_name()} added to session successfully!')
-                        
-            except Member.DoesNotExist:
+            with transaction.atomic():
+                # The member must not be in another session at the same time; the lock
+                # keeps another booking from landing between the check and the enrollment
+                lock_schedule(trainer.gym_id)
+                conflicts = [
+                    conflict
+                    for conflict in find_conflicts(session, parse_member_ids([member_id]), gym_id=trainer.gym_id)
+                    if conflict['kind'] == 'member'
+                ]
+                if conflicts:
+                    for description in describe_conflicts(conflicts):
+                        messages.error(request, f"Scheduling conflict: {description}")
+                    return redirect('trainer_management:session_detail', session_id=session_id)
+
+                enrollment = enroll_members(session, [member_id], trainer.gym_id)
+            if enrollment['enrolled']:
+                member = enrollment['enrolled'][0]
+                messages.success(request, f'{member.user.get_full_name()} added to session successfully!')
+            elif enrollment['already_enrolled']:
+                member = enrollment['already_enrolled'][0]
+                messages.warning(request, f'{member.user.get_full_name()} is already enrolled in this session.')
+            elif enrollment['over_capacity']:
+                messages.error(request, 'Session is already at maximum capacity.')
+            else:
                 messages.error(request, 'Selected member not found.')
         else:
             messages.error(request, 'Please select a member.')
@@ -1124,79 +1155,23 @@ def mark_attendance(request, session_id):
 
     if request.method == 'POST':
         try:
-            with transaction.atomic():
-                # Process attendance for each participant
-                for participant in session.participants.filter(is_enrolled=True):
-                    member = participant.member
-                    present_key = f'present_{member.id}'
-                    
-                    # Get or create attendance record
-                    attendance, created = SessionAttendance.objects.get_or_create(
-                        session=session,
-                        member=member,
-                        trainer=session.trainer,
-                        defaults={'marked_present': False}
-                    )
-                    
-                    # Update attendance
-                    was_present = request.POST.get(present_key) == 'on'
-                    attendance.marked_present = was_present
-                    
-                    if was_present:
-                        if not attendance.check_in_time:
-                            attendance.check_in_time = timezone.now()
-                        
-                        # Optional performance data
-                        attendance.exercises_completed = request.POST.get(f'exercises_{member.id}', '')
-                        attendance.sets_completed = int(request.POST.get(f'sets_{member.id}', 0) or 0)
-                        attendance.reps_completed = int(request.POST.get(f'reps_{member.id}', 0) or 0)
-                        
-                        weight_lifted = request.POST.get(f'weight_{member.id}')
-                        if weight_lifted:
-                            attendance.weight_lifted = Decimal(str(weight_lifted))
-                        
-                        attendance.member_energy_level = request.POST.get(f'energy_{member.id}', '')
-                        attendance.trainer_notes = request.POST.get(f'notes_{member.id}', '')
-                        
-                        satisfaction = request.POST.get(f'satisfaction_{member.id}')
-                        if satisfaction:
-                            attendance.member_satisfaction = int(satisfaction)
-                    
-                    attendance.save()
-                    
-                    # Update session participant attendance
-                    participant.attended = was_present
-                    participant.attendance_marked_at = timezone.now()
-                    participant.save()
-
-                # Update session status if not already completed
-                if session.status != 'completed':
-                    session.status = 'completed'
-                    session.post_session_notes = request.POST.get('session_notes', '')
-                    session.save()
-
-                messages.success(request, 'Attendance marked successfully!')
-                return redirect('trainer_management:session_detail', session_id=session_id)
+            save_attendance(session, request.POST, session_notes=request.POST.get('session_notes', ''))
+            messages.success(request, 'Attendance marked successfully!')
+            return redirect('trainer_management:session_detail', session_id=session_id)
 
         except Exception as e:
             messages.error(request, f"Error marking attendance: {str(e)}")
 
     # Get participants with existing attendance data
-    participants_data = []
-    for participant in session.participants.filter(is_enrolled=True):
-        try:
-            attendance = SessionAttendance.objects.get(
-                session=session,
-                member=participant.member
-            )
-        except SessionAttendance.DoesNotExist:
-            attendance = None
-            
-        participants_data.append({
+    attendance = attendance_by_member(session)
+    participants_data = [
+        {
             'participant': participant,
             'member': participant.member,
-            'attendance': attendance
-        })
+            'attendance': attendance.get(participant.member_id),
+        }
+        for participant in enrolled_participants(session)
+    ]
 
     context = {
         'session': session,
@@ -1242,40 +1217,240 @@ def session_calendar_data(request):
     except Trainer.DoesNotExist:
         return JsonResponse({'error': 'Trainer not found'}, status=404)
     
-    start_date = request.GET.get('start')
-    end_date = request.GET.get('end')
-    
-    sessions = trainer.sessions.filter(
-        session_date__range=[start_date, end_date]
-    ).select_related('trainer')
-    
-    events = []
-    for session in sessions:
-        color = {
-            'scheduled': '#007bff',
-            'active': '#28a745',
-            'completed': '#6c757d',
-            'cancelled': '#dc3545',
-            'rescheduled': '#ffc107'
-        }.get(session.status, '#007bff')
-        
-        events.append({
-            'id': session.id,
-            'title': session.title,
-            'start': f"{session.session_date}T{session.start_time}",
-            'end': f"{session.session_date}T{session.end_time}",
-            'backgroundColor': color,
-            'borderColor': color,
-            'url': f'/trainer/session/{session.id}/',
-            'extendedProps': {
-                'status': session.status,
-                'participants': session.participants_count,
-                'location': session.location
-            }
-        })
-    
-    return JsonResponse(events, safe=False)
+    try:
+        start_date, end_date = parse_calendar_range(request.GET.get('start'), request.GET.get('end'))
+    except ValueError as e:
+        return JsonResponse({'error': f'Invalid date range: {e}'}, status=400)
+
+    # Revalidated on every navigation: an unchanged range costs no feed lookup at all
+    etag = calendar_etag(trainer.id, start_date, end_date)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        patch_cache_control(not_modified, private=True, no_cache=True)
+        return not_modified
+
+    etag, body = calendar_feed(trainer.id, start_date, end_date)
+    response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+
+# Recurring session series
+
+@login_required
+def series_list(request):
+    """The trainer's recurring session series"""
+    if request.user.user_type != "trainer":
+        messages.error(request, "Access denied!")
+        return redirect("multiple_gym:login")
+
+    try:
+        trainer = Trainer.objects.get(user=request.user, is_active=True)
+    except Trainer.DoesNotExist:
+        messages.error(request, "Trainer profile not found!")
+        return redirect("multiple_gym:login")
+
+    today = timezone.localdate()
+    series = trainer.session_series.annotate(
+        upcoming_count=Count(
+            'occurrences',
+            filter=Q(occurrences__session_date__gte=today, occurrences__status='scheduled')
+        ),
+        roster_count=Count('roster', distinct=True),
+    ).order_by('-is_active', 'title')
+
+    context = {
+        'trainer': trainer,
+        'series_list': series,
+    }
+    return render(request, 'trainer_management/series_list.html', context)
+
+
+@login_required
+def create_series(request):
+    """Create a recurring session series and its first occurrences"""
+    if request.user.user_type != "trainer":
+        messages.error(request, "Access denied!")
+        return redirect("multiple_gym:login")
+
+    try:
+        trainer = Trainer.objects.get(user=request.user, is_active=True)
+        if not trainer.permissions.can_create_sessions:
+            messages.error(request, "You don't have permission to create sessions!")
+            return redirect("trainer_management:trainer_dashboard")
+    except Trainer.DoesNotExist:
+        messages.error(request, "Trainer profile not found!")
+        return redirect("multiple_gym:login")
+
+    if request.method == 'POST':
+        form = SessionSeriesForm(request.POST, trainer=trainer)
+        if form.is_valid():
+            with transaction.atomic():
+                series = form.save(commit=False)
+                series.trainer = trainer
+                series.save()
+                form.save_m2m()
+                report = materialize_series(series)
+
+            messages.success(
+                request,
+                f'Series "{series.title}" created with {report["created"]} session(s) '
+                f'scheduled until {report["generated_until"]:%b %d, %Y}.'
+            )
+            for session_date, description in report['skipped']:
+                messages.warning(request, f"Skipped {session_date:%b %d}: {description}")
+            return redirect('trainer_management:series_detail', series_id=series.id)
+    else:
+        form = SessionSeriesForm(trainer=trainer, initial={'starts_on': timezone.localdate()})
+
+    context = {
+        'trainer': trainer,
+        'form': form,
+    }
+    return render(request, 'trainer_management/create_series.html', context)
+
+
+def _series_detail_context(trainer, series, following_form):
+    today = timezone.localdate()
+    occurrences = series.occurrences.filter(session_date__gte=today).annotate(
+        participant_count=Count('participants', filter=Q(participants__is_enrolled=True))
+    ).order_by('session_date')
+
+    return {
+        'trainer': trainer,
+        'series': series,
+        'occurrences': occurrences,
+        'roster': series.roster.select_related('user'),
+        'following_form': following_form,
+        'today': today,
+    }
+
+
+@login_required
+def series_detail(request, series_id):
+    """A series' template, roster and upcoming occurrences"""
+    if request.user.user_type != "trainer":
+        messages.error(request, "Access denied!")
+        return redirect("multiple_gym:login")
+
+    try:
+        trainer = Trainer.objects.get(user=request.user, is_active=True)
+    except Trainer.DoesNotExist:
+        messages.error(request, "Trainer profile not found!")
+        return redirect("multiple_gym:login")
+
+    series = get_object_or_404(SessionSeries, id=series_id, trainer=trainer)
+
+    # Extends the series to the horizon if the nightly job has not yet
+    report = materialize_series(series)
+    for session_date, description in report['skipped']:
+        messages.warning(request, f"Skipped {session_date:%b %d}: {description}")
+
+    from_date = request.GET.get('from') or timezone.localdate().isoformat()
+    following_form = SeriesFollowingForm(instance=series, initial={'from_date': from_date})
+
+    context = _series_detail_context(trainer, series, following_form)
+    return render(request, 'trainer_management/series_detail.html', context)
+
+
+@login_required
+def edit_series_following(request, series_id):
+    """Change a series' template for one occurrence and all following ones"""
+    if request.user.user_type != "trainer":
+        messages.error(request, "Access denied!")
+        return redirect("multiple_gym:login")
+
+    try:
+        trainer = Trainer.objects.get(user=request.user, is_active=True)
+    except Trainer.DoesNotExist:
+        messages.error(request, "Trainer profile not found!")
+        return redirect("multiple_gym:login")
+
+    series = get_object_or_404(SessionSeries, id=series_id, trainer=trainer, is_active=True)
+    if request.method != 'POST':
+        return redirect('trainer_management:series_detail', series_id=series.id)
+
+    form = SeriesFollowingForm(request.POST, instance=series)
+    if not form.is_valid():
+        series.refresh_from_db()
+        context = _series_detail_context(trainer, series, form)
+        return render(request, 'trainer_management/series_detail.html', context)
+
+    changes = form.changes()
+    if not changes:
+        messages.info(request, "Nothing was changed.")
+        return redirect('trainer_management:series_detail', series_id=series.id)
+
+    report = update_following(series, form.cleaned_data['from_date'], changes)
+    if report['conflicts']:
+        for description in report['conflicts']:
+            messages.error(request, f"Scheduling conflict: {description}")
+        return redirect('trainer_management:series_detail', series_id=series.id)
+
+    messages.success(
+        request,
+        f'{report["updated"]} session(s) from {form.cleaned_data["from_date"]:%b %d, %Y} updated.'
+    )
+    return redirect('trainer_management:series_detail', series_id=report['series'].id)
+
+
+@login_required
+def skip_series_occurrence(request, series_id):
+    """Add an exception date to a series, cancelling its occurrence"""
+    if request.user.user_type != "trainer":
+        messages.error(request, "Access denied!")
+        return redirect("multiple_gym:login")
+
+    try:
+        trainer = Trainer.objects.get(user=request.user, is_active=True)
+    except Trainer.DoesNotExist:
+        messages.error(request, "Trainer profile not found!")
+        return redirect("multiple_gym:login")
+
+    series = get_object_or_404(SessionSeries, id=series_id, trainer=trainer)
+    if request.method == 'POST':
+        try:
+            session_date = date.fromisoformat(request.POST.get('session_date', ''))
+        except ValueError:
+            messages.error(request, "Invalid date!")
+        else:
+            skip_occurrence(series, session_date)
+            messages.success(request, f'"{series.title}" will not take place on {session_date:%b %d, %Y}.')
+
+    return redirect('trainer_management:series_detail', series_id=series.id)
+
+
+@login_required
+def end_session_series(request, series_id):
+    """Stop a series from a date on, deleting its scheduled occurrences from then"""
+    if request.user.user_type != "trainer":
+        messages.error(request, "Access denied!")
+        return redirect("multiple_gym:login")
+
+    try:
+        trainer = Trainer.objects.get(user=request.user, is_active=True)
+    except Trainer.DoesNotExist:
+        messages.error(request, "Trainer profile not found!")
+        return redirect("multiple_gym:login")
+
+    series = get_object_or_404(SessionSeries, id=series_id, trainer=trainer, is_active=True)
+    if request.method == 'POST':
+        try:
+            from_date = date.fromisoformat(request.POST.get('from_date', ''))
+        except ValueError:
+            messages.error(request, "Invalid date!")
+        else:
+            from_date = max(from_date, timezone.localdate())
+            deleted = end_series(series, from_date)
+            messages.success(
+                request,
+                f'"{series.title}" ends before {from_date:%b %d, %Y}; {deleted} upcoming session(s) removed.'
+            )
 
+    return redirect('trainer_management:series_detail', series_id=series.id)
 
 
 # trainer_management/views.py - FIXED login redirects